@@ -1,97 +1,374 @@
 import os
 import json
+import time
+import bisect
+import sqlite3
+import hashlib
 import logging
+import threading
+from backend.config import PLAYLISTS_DB, PLAYLISTS_BUSY_TIMEOUT_S
+from backend.utils.metrics import timed_stage
 
 logger = logging.getLogger(__name__)
 
-# Path to the playlists file
+# Path to the playlists file used before the SQLite store; imported once
 PLAYLISTS_FILE = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'uploads', 'playlists.json')
 
-def _load_playlists():
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS playlist_tracks (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    genre TEXT NOT NULL,
+    filename TEXT NOT NULL,
+    added_at REAL NOT NULL
+);
+CREATE UNIQUE INDEX IF NOT EXISTS playlist_tracks_genre_filename ON playlist_tracks (genre, filename);
+CREATE TABLE IF NOT EXISTS playlist_meta (
+    key TEXT PRIMARY KEY,
+    value TEXT NOT NULL
+);
+"""
+
+# Rendered response bodies kept per snapshot (one per page/encoding combination)
+SNAPSHOT_BODY_CACHE_ENTRIES = 64
+
+class PlaylistSnapshot:
+    """
+    Immutable in-memory copy of every playlist at one point in time
+
+    Holds each genre's songs with their row ids so that pages can be cut
+    with a per-genre cursor (the id of the last song returned), an ETag
+    derived from the content and the time of the last addition. Rendered
+    response bodies are memoized on the snapshot, so polling an unchanged
+    library serializes nothing.
+    """
+    def __init__(self, rows):
+        """
+        Args:
+            rows (list): (id, genre, filename, added_at) tuples ordered by id
+        """
+        self.playlists = {}
+        self._ids = {}
+        digest = hashlib.sha256()
+        last_added = None
+        for track_id, genre, filename, added_at in rows:
+            self.playlists.setdefault(genre, []).append(filename)
+            self._ids.setdefault(genre, []).append(track_id)
+            digest.update(f"{track_id}\0{genre}\0{filename}\n".encode('utf-8'))
+            last_added = added_at if last_added is None else max(last_added, added_at)
+
+        self.etag = digest.hexdigest()[:32]
+        self.last_modified = last_added
+        self._bodies = {}
+        self._bodies_lock = threading.Lock()
+
+    def page(self, genre, cursor=None, limit=100):
+        """
+        One page of a playlist
+
+        Args:
+            genre (str): Playlist ID (genre name)
+            cursor (str, optional): next_cursor of the previous page
+            limit (int): Maximum number of songs
+
+        Returns:
+            dict: songs, total and next_cursor (None on the last page)
+
+        Raises:
+            ValueError: If the cursor is not one this store produced
+        """
+        ids = self._ids.get(genre, [])
+        start = 0
+        if cursor is not None:
+            try:
+                start = bisect.bisect_right(ids, int(cursor))
+            except ValueError:
+                raise ValueError(f"Invalid cursor: {cursor}")
+        end = start + limit
+        songs = self.playlists.get(genre, [])[start:end]
+        return {
+            'songs': songs,
+            'total': len(ids),
+            'next_cursor': str(ids[end - 1]) if end < len(ids) else None,
+        }
+
+    def cached(self, key, build):
+        """
+        Memoize a value derived from this snapshot
+
+        Args:
+            key: Hashable key, e.g. the page and content encoding of a body
+            build (callable): Computes the value on a miss
+
+        Returns:
+            The cached or newly built value
+        """
+        with self._bodies_lock:
+            if key in self._bodies:
+                return self._bodies[key]
+        value = build()
+        with self._bodies_lock:
+            if len(self._bodies) >= SNAPSHOT_BODY_CACHE_ENTRIES:
+                self._bodies.pop(next(iter(self._bodies)))
+            self._bodies[key] = value
+        return value
+
+class PlaylistStore:
     """
-    Load playlists from file
-    
+    Genre playlists stored in SQLite
+
+    Each (genre, filename) pair is a row under a unique index, so adding a
+    song is one indexed insert instead of rewriting every playlist. The
+    database runs in WAL mode: readers never block the writer, and
+    concurrent uploads (threads or processes) serialize on SQLite's write
+    lock rather than overwriting each other. Songs keep their insertion
+    order, and playlists the order of their first song, as in the JSON file
+    this store replaces.
+
+    Reads go through snapshot(), which is rebuilt only after a write
+    through this store or a change to the database files by another process.
+    """
+    def __init__(self, db_path, legacy_json_path=None, busy_timeout_s=30.0):
+        self.db_path = db_path
+        self.busy_timeout_s = busy_timeout_s
+        self._local = threading.local()
+        self._generation = 0
+        self._snapshot = None
+        self._snapshot_signature = None
+        self._snapshot_lock = threading.Lock()
+
+        os.makedirs(os.path.dirname(os.path.abspath(db_path)), exist_ok=True)
+        conn = self._connection()
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.executescript(SCHEMA)
+        if legacy_json_path:
+            self._migrate_json(legacy_json_path)
+
+    def _connection(self):
+        # sqlite3 connections may not be shared between threads
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(self.db_path, timeout=self.busy_timeout_s, isolation_level=None)
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    def _write(self, statements):
+        """
+        Run (sql, params) statements in one write transaction
+
+        Returns:
+            list: Cursors of the executed statements
+        """
+        conn = self._connection()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            cursors = [conn.execute(sql, params) for sql, params in statements]
+            conn.execute("COMMIT")
+            return cursors
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+
+    def _migrate_json(self, json_path):
+        """Import the JSON playlists file once; later opens skip it."""
+        conn = self._connection()
+        if conn.execute("SELECT 1 FROM playlist_meta WHERE key = 'json_migrated'").fetchone():
+            return
+        if not os.path.exists(json_path):
+            # Nothing to import, and a JSON file appearing later is not ours to import
+            self._write([("INSERT OR IGNORE INTO playlist_meta (key, value) VALUES ('json_migrated', '')", ())])
+            return
+
+        try:
+            with open(json_path, 'r') as f:
+                playlists = json.load(f)
+        except Exception as e:
+            logger.error(f"Error loading playlists for migration from {json_path}: {e}")
+            return
+
+        now = time.time()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            # Another process may have migrated while we were reading the file
+            if conn.execute("SELECT 1 FROM playlist_meta WHERE key = 'json_migrated'").fetchone():
+                conn.execute("ROLLBACK")
+                return
+            rows = [(genre, filename, now) for genre, songs in playlists.items() for filename in songs]
+            conn.executemany(
+                "INSERT OR IGNORE INTO playlist_tracks (genre, filename, added_at) VALUES (?, ?, ?)", rows
+            )
+            conn.execute("INSERT INTO playlist_meta (key, value) VALUES ('json_migrated', ?)", (json_path,))
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+        logger.info(f"Migrated {len(rows)} songs in {len(playlists)} playlists from {json_path} to {self.db_path}")
+
+    @timed_stage('playlist_write')
+    def add(self, genre, filename):
+        """
+        Add a song to a genre playlist unless it is already in it
+
+        Args:
+            genre (str): Playlist ID (genre name)
+            filename (str): Song file name
+
+        Returns:
+            bool: True if the song was added
+        """
+        # Re-classified uploads are common; skip the write transaction (which
+        # appends to the WAL even when the insert is ignored) for them
+        if self._connection().execute(
+            "SELECT 1 FROM playlist_tracks WHERE genre = ? AND filename = ?", (genre, filename)
+        ).fetchone():
+            return False
+
+        cursor, = self._write([(
+            "INSERT OR IGNORE INTO playlist_tracks (genre, filename, added_at) VALUES (?, ?, ?)",
+            (genre, filename, time.time())
+        )])
+        added = cursor.rowcount > 0
+        if added:
+            with self._snapshot_lock:
+                self._generation += 1
+        return added
+
+    def _file_signature(self):
+        # Commits by other processes append to the WAL file (or, after a
+        # checkpoint, rewrite the database file)
+        signature = []
+        for path in (self.db_path, f"{self.db_path}-wal"):
+            try:
+                stat = os.stat(path)
+                signature.append((stat.st_mtime_ns, stat.st_size))
+            except FileNotFoundError:
+                signature.append(None)
+        return tuple(signature)
+
+    def snapshot(self):
+        """
+        Current snapshot of every playlist
+
+        Returns:
+            PlaylistSnapshot: Snapshot, shared between callers until the
+            store changes
+        """
+        with self._snapshot_lock:
+            # Taken before reading, so a write that lands during the read
+            # changes the signature and triggers another rebuild later
+            signature = (self._generation, self._file_signature())
+            if self._snapshot is not None and signature == self._snapshot_signature:
+                return self._snapshot
+
+        rows = self._connection().execute(
+            "SELECT id, genre, filename, added_at FROM playlist_tracks ORDER BY id"
+        ).fetchall()
+        snapshot = PlaylistSnapshot(rows)
+        with self._snapshot_lock:
+            self._snapshot = snapshot
+            self._snapshot_signature = signature
+        return snapshot
+
+    def all(self):
+        """
+        Get every playlist
+
+        Returns:
+            dict: Genre -> list of song file names
+        """
+        return {genre: list(songs) for genre, songs in self.snapshot().playlists.items()}
+
+    def songs(self, genre):
+        """
+        Get the songs of one playlist
+
+        Args:
+            genre (str): Playlist ID (genre name)
+
+        Returns:
+            list: Song file names in the order they were added
+        """
+        return list(self.snapshot().playlists.get(genre, []))
+
+    def close(self):
+        """Close this thread's connection."""
+        conn = getattr(self._local, 'conn', None)
+        if conn is not None:
+            conn.close()
+            self._local.conn = None
+
+_store = None
+_store_lock = threading.Lock()
+
+def get_playlist_store():
+    """
+    Returns the shared playlist store, opening (and migrating) it on first use
+
     Returns:
-        dict: Playlists data
+        PlaylistStore: Store backed by PLAYLISTS_DB
     """
-    # Create playlists directory if it doesn't exist
-    os.makedirs(os.path.dirname(PLAYLISTS_FILE), exist_ok=True)
-    
-    # Create playlists file if it doesn't exist
-    if not os.path.exists(PLAYLISTS_FILE):
-        with open(PLAYLISTS_FILE, 'w') as f:
-            json.dump({}, f)
-        return {}
-    
-    # Load playlists from file
-    try:
-        with open(PLAYLISTS_FILE, 'r') as f:
-            return json.load(f)
-    except Exception as e:
-        logger.error(f"Error loading playlists: {e}")
-        return {}
+    global _store
+    with _store_lock:
+        if _store is None:
+            _store = PlaylistStore(PLAYLISTS_DB, legacy_json_path=PLAYLISTS_FILE, busy_timeout_s=PLAYLISTS_BUSY_TIMEOUT_S)
+        return _store
 
-def _save_playlists(playlists):
+def get_playlist_snapshot():
     """
-    Save playlists to file
-    
-    Args:
-        playlists (dict): Playlists data
+    Get the current in-memory snapshot of every playlist
+
+    Returns:
+        PlaylistSnapshot: Snapshot of the shared store
     """
-    try:
-        with open(PLAYLISTS_FILE, 'w') as f:
-            json.dump(playlists, f, indent=2)
-    except Exception as e:
-        logger.error(f"Error saving playlists: {e}")
+    return get_playlist_store().snapshot()
 
 def add_to_playlist(file_path, genre):
     """
     Add a song to a playlist
-    
+
     Args:
         file_path (str): Path to the audio file
         genre (str): Predicted genre
-        
+
     Returns:
         str: Playlist ID (genre name)
     """
-    # Load playlists
-    playlists = _load_playlists()
-    
-    # Create playlist if it doesn't exist
-    if genre not in playlists:
-        playlists[genre] = []
-    
     # Get filename from path
     filename = os.path.basename(file_path)
-    
+
     # Add song to playlist if not already in it
-    if filename not in playlists[genre]:
-        playlists[genre].append(filename)
-    
-    # Save playlists
-    _save_playlists(playlists)
-    
+    try:
+        get_playlist_store().add(genre, filename)
+    except Exception as e:
+        logger.error(f"Error saving playlists: {e}")
+
     return genre
 
 def get_playlists():
     """
     Get all playlists
-    
+
     Returns:
         dict: Playlists data
     """
-    return _load_playlists()
+    try:
+        return get_playlist_store().all()
+    except Exception as e:
+        logger.error(f"Error loading playlists: {e}")
+        return {}
 
 def get_playlist(playlist_id):
     """
     Get a specific playlist
-    
+
     Args:
         playlist_id (str): Playlist ID (genre name)
-        
+
     Returns:
         list: List of songs in the playlist
     """
-    playlists = _load_playlists()
-    return playlists.get(playlist_id, [])
+    try:
+        return get_playlist_store().songs(playlist_id)
+    except Exception as e:
+        logger.error(f"Error loading playlists: {e}")
+        return []
@@ -1,7 +1,18 @@
-from flask import Flask, request, jsonify, send_from_directory
+from flask import (
+    Flask, Request, Response, request, jsonify, send_from_directory, redirect, stream_with_context,
+    json as flask_json
+)
 from flask_cors import CORS
+import io
 import os
+import gzip
+import time
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
 from werkzeug.utils import secure_filename
+from werkzeug.security import safe_join
+from werkzeug.http import is_resource_modified
 import logging
 
 # Configure logging
@@ -9,18 +20,50 @@ logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
 # Import configuration
-from backend.config import UPLOAD_FOLDER, ALLOWED_EXTENSIONS, MODEL_PATH
+from backend.config import (
+    UPLOAD_FOLDER, ALLOWED_EXTENSIONS, MODEL_PATH, SPECTROGRAM_FOLDER, UPLOAD_IN_MEMORY, UPLOAD_WRITER_WORKERS,
+    PREDICTION_CACHE_DIR, PREDICTION_CACHE_MEMORY_ENTRIES, PREDICTION_CACHE_DISK_ENTRIES,
+    JOB_WORKERS, JOB_MAX_PENDING, JOB_TIMEOUT_S, JOB_RETENTION_S,
+    BULK_WORKERS, BULK_MAX_FILES, BULK_MAX_CONTENT_LENGTH, BULK_MAX_UNCOMPRESSED_BYTES,
+    INFERENCE_BATCHING, INFERENCE_MAX_BATCH_SIZE, INFERENCE_MAX_DELAY_MS,
+    STAGED_PIPELINE, PIPELINE_DECODE_WORKERS, PIPELINE_MEL_WORKERS, PIPELINE_MAX_IN_FLIGHT,
+    PIPELINE_START_METHOD, EARLY_EXIT, WARMUP_ON_STARTUP, STARTUP_REQUEST_WAIT_S,
+    PLAYLISTS_PAGE_SIZE, PLAYLISTS_MAX_PAGE_SIZE, GZIP_MIN_BYTES,
+    AUDIO_CACHE_MAX_AGE_S, AUDIO_PREVIEWS, PREVIEW_FOLDER, PREVIEW_WORKERS, PREVIEW_SAMPLE_RATE,
+    PREVIEW_COMPRESSION_LEVEL, METRICS_ENABLED
+)
 
 # Import utility modules
-from backend.utils.audio_processor import process_audio
-from backend.utils.spectrogram_generator import generate_spectrogram
-from backend.models.model_loader import load_model, predict_genre
-from backend.api.playlist import add_to_playlist, get_playlists
+from backend.utils.audio_processor import process_audio, can_decode_in_memory
+from backend.utils.spectrogram_generator import compute_track_mel_power, save_spectrogram_data, render_spectrogram
+from backend.models.model_loader import load_model, predict_genre, predict_genre_adaptive, serving_model_path
+from backend.models.inference_dispatcher import InferenceDispatcher
+from backend.utils.prediction_cache import (
+    PredictionCache, compute_model_fingerprint, save_upload_with_hash, read_upload_with_hash, write_upload
+)
+from backend.utils.job_manager import JobManager, JobQueueFull
+from backend.utils.staged_pipeline import StagedPipeline
+from backend.utils.warmup import warm_up
+from backend.utils.audio_delivery import ContentHashIndex, PreviewGenerator, URL_VERSION_LENGTH
+from backend.utils.bulk_upload import BulkUploadRejected, save_bulk_upload, iter_bulk_results
+from backend.utils.metrics import (
+    REGISTRY, CONTENT_TYPE, UPLOADS, REQUESTS_IN_FLIGHT, MODEL_LOAD_SECONDS, reset_serving_metrics
+)
+from backend.api.playlist import add_to_playlist, get_playlist_snapshot
+
+class UploadRequest(Request):
+    """Request that allows bulk uploads a larger body than MAX_CONTENT_LENGTH."""
+    @property
+    def max_content_length(self):
+        if self.endpoint == 'bulk_upload':
+            return BULK_MAX_CONTENT_LENGTH
+        return super().max_content_length
 
 # Initialize Flask app
 app = Flask(__name__)
+app.request_class = UploadRequest
 # Enable CORS for all routes
-CORS(app, resources={r"/*": {"origins": "*", "methods": ["GET", "POST", "OPTIONS"], "allow_headers": ["Content-Type", "Authorization"]}})
+CORS(app, resources={r"/*": {"origins": "*", "methods": ["GET", "POST", "DELETE", "OPTIONS"], "allow_headers": ["Content-Type", "Authorization"]}})
 
 # Configure app
 app.config['UPLOAD_FOLDER'] = UPLOAD_FOLDER
@@ -28,24 +71,299 @@ app.config['MAX_CONTENT_LENGTH'] = 16 * 1024 * 1024  # 16MB max upload size
 
 # Create upload folder and spectrograms folder if they don't exist
 os.makedirs(UPLOAD_FOLDER, exist_ok=True)
-os.makedirs(os.path.join(UPLOAD_FOLDER, 'spectrograms'), exist_ok=True)
+os.makedirs(SPECTROGRAM_FOLDER, exist_ok=True)
+
+class BackendStarting(RuntimeError):
+    """Raised when a request needs the model before startup has finished."""
 
-# Load the model
+# Model and inference helpers, set up in the background by initialize_backend()
+# so that the server can bind and answer /healthz straight away
 model = None
+inference_dispatcher = None
+staged_pipeline = None
+startup_state = {'status': 'starting', 'error': None, 'model_load_s': None, 'warmup_s': None}
+backend_ready = threading.Event()
+
+def initialize_backend():
+    """
+    Load the model, start the inference helpers and warm up the serving path
+
+    Sets backend_ready when done, whether or not it succeeded; startup_state
+    records the outcome for /readyz.
+    """
+    global model, inference_dispatcher, staged_pipeline
+
+    try:
+        start = time.perf_counter()
+        model = load_model(MODEL_PATH)
+        startup_state['model_load_s'] = time.perf_counter() - start
+        MODEL_LOAD_SECONDS.set(startup_state['model_load_s'])
+        logger.info(f"Model loaded successfully in {startup_state['model_load_s']:.2f}s")
+
+        # Share forward passes between concurrent requests
+        if INFERENCE_BATCHING:
+            inference_dispatcher = InferenceDispatcher(
+                model,
+                max_batch_size=INFERENCE_MAX_BATCH_SIZE,
+                max_delay_ms=INFERENCE_MAX_DELAY_MS
+            )
+
+        # Run decoding and mel work in worker processes instead of on the request thread
+        if STAGED_PIPELINE:
+            try:
+                staged_pipeline = StagedPipeline(
+                    inference_dispatcher or model,
+                    decode_workers=PIPELINE_DECODE_WORKERS,
+                    mel_workers=PIPELINE_MEL_WORKERS,
+                    max_in_flight=PIPELINE_MAX_IN_FLIGHT,
+                    start_method=PIPELINE_START_METHOD,
+                    early_exit=EARLY_EXIT
+                )
+                logger.info("Staged pipeline started")
+            except Exception as e:
+                logger.error(f"Error starting staged pipeline: {e}")
+
+        if WARMUP_ON_STARTUP:
+            start = time.perf_counter()
+            warm_up(inference_dispatcher or model, staged_pipeline)
+            startup_state['warmup_s'] = time.perf_counter() - start
+            # Warm-up calls are not traffic; keep them out of the histograms
+            reset_serving_metrics()
+
+        startup_state['status'] = 'ready'
+    except Exception as e:
+        logger.error(f"Error initializing backend: {e}")
+        startup_state['status'] = 'failed'
+        startup_state['error'] = str(e)
+    finally:
+        backend_ready.set()
+
+threading.Thread(target=initialize_backend, name='backend-startup', daemon=True).start()
+
+# Cache of classification results keyed by upload content and model/config fingerprint
+prediction_cache = None
 try:
-    model = load_model(MODEL_PATH)
-    logger.info("Model loaded successfully")
+    prediction_cache = PredictionCache(
+        PREDICTION_CACHE_DIR,
+        compute_model_fingerprint(serving_model_path(MODEL_PATH)),
+        max_memory_entries=PREDICTION_CACHE_MEMORY_ENTRIES,
+        max_disk_entries=PREDICTION_CACHE_DISK_ENTRIES
+    )
 except Exception as e:
-    logger.error(f"Error loading model: {e}")
+    logger.error(f"Error initializing prediction cache: {e}")
+
+# Background workers for asynchronous uploads
+job_manager = JobManager(
+    max_workers=JOB_WORKERS,
+    max_pending=JOB_MAX_PENDING,
+    timeout_s=JOB_TIMEOUT_S,
+    retention_s=JOB_RETENTION_S
+)
+
+# Shared pool classifying bulk upload items; concurrent items share forward
+# passes through the inference dispatcher
+bulk_executor = ThreadPoolExecutor(max_workers=BULK_WORKERS, thread_name_prefix='bulk-worker')
+
+# Writes uploads to the upload folder off the request's critical path
+upload_writer = ThreadPoolExecutor(max_workers=UPLOAD_WRITER_WORKERS, thread_name_prefix='upload-writer')
+
+# Content hashes of uploads, used as strong ETags and URL versions
+content_hash_index = ContentHashIndex()
+
+# Background encoder of low-bitrate upload previews
+preview_generator = None
+if AUDIO_PREVIEWS:
+    try:
+        preview_generator = PreviewGenerator(
+            PREVIEW_FOLDER,
+            workers=PREVIEW_WORKERS,
+            sample_rate=PREVIEW_SAMPLE_RATE,
+            compression_level=PREVIEW_COMPRESSION_LEVEL
+        )
+    except Exception as e:
+        logger.error(f"Error initializing preview generator: {e}")
+
+@app.before_request
+def track_request_start():
+    REQUESTS_IN_FLIGHT.inc()
+
+@app.teardown_request
+def track_request_end(exc):
+    # Streamed responses tear down once the stream is finished
+    REQUESTS_IN_FLIGHT.dec()
 
 # Helper function to check allowed file extensions
 def allowed_file(filename):
     return '.' in filename and filename.rsplit('.', 1)[1].lower() in ALLOWED_EXTENSIONS
 
+def audio_urls(filename, content_hash):
+    """
+    Versioned URLs of an upload and of its preview
+
+    Args:
+        filename (str): Sanitized upload filename
+        content_hash (str): SHA-256 hex digest of the upload
+
+    Returns:
+        dict: audio_url and preview_url
+    """
+    version = content_hash[:URL_VERSION_LENGTH]
+    return {
+        'audio_url': f"/api/audio/{filename}?v={version}",
+        'preview_url': f"/api/audio/{filename}/preview?v={version}",
+    }
+
+def register_upload(filepath, content_hash):
+    """
+    Record a saved upload's content hash and queue its preview
+
+    Args:
+        filepath (str): Path of the saved upload
+        content_hash (str): SHA-256 hex digest of the upload
+    """
+    content_hash_index.record(filepath, content_hash)
+    if preview_generator is not None:
+        preview_generator.submit(filepath, content_hash)
+
+def persist_upload(data, filepath, content_hash):
+    """
+    Write an upload to the upload folder in the background
+
+    The file is registered (content hash, preview) once it is on disk.
+
+    Args:
+        data (bytes): Upload content
+        filepath (str): Destination path
+        content_hash (str): SHA-256 hex digest of the upload
+
+    Returns:
+        concurrent.futures.Future: Resolves once the file is written
+    """
+    def write():
+        write_upload(data, filepath)
+        register_upload(filepath, content_hash)
+    return upload_writer.submit(write)
+
+def classify_upload(filepath, filename, content_hash, checkpoint=None, upload_data=None, persisted=None):
+    """
+    Classify an upload and add it to its genre playlist
+
+    Args:
+        filepath (str): Path of the saved upload
+        filename (str): Sanitized upload filename
+        content_hash (str): SHA-256 hex digest of the upload
+        checkpoint (callable, optional): Called between stages by background
+            jobs; raises to stop a cancelled or timed-out job
+        upload_data (bytes, optional): Upload content to decode from memory
+            instead of reading filepath back
+        persisted (concurrent.futures.Future, optional): Background write of
+            filepath; awaited before the file is read and before returning,
+            so the result's audio URLs are valid
+
+    Returns:
+        dict: Classification result for the API response
+    """
+    checkpoint = checkpoint or (lambda: None)
+
+    def saved_path():
+        if persisted is not None:
+            persisted.result()
+        return filepath
+
+    # Return the stored result if this exact content was classified before
+    cached = prediction_cache.get(content_hash) if prediction_cache is not None else None
+    if cached is not None:
+        logger.info(f"Prediction cache hit for: {filename}, genre: {cached['genre']}")
+        playlist_id = add_to_playlist(filepath, cached['genre'])
+        saved_path()
+        return {
+            'filename': filename,
+            'genre': cached['genre'],
+            'confidence': cached['confidence'],
+            'spectrogram': cached['spectrogram'],
+            'spectrogram_url': f"/api/spectrogram/{cached['spectrogram']}",
+            **audio_urls(filename, content_hash),
+            'playlist_id': playlist_id,
+            'cached': True
+        }
+
+    if not backend_ready.wait(timeout=STARTUP_REQUEST_WAIT_S):
+        raise BackendStarting('Backend is still starting, retry shortly')
+
+    if model is None:
+        logger.error("Model not loaded")
+        raise RuntimeError('Model not loaded')
+
+    # Spectrograms are named by content, so a cached result keeps pointing at
+    # this track's spectrogram when another file is uploaded under its name
+    spectrogram_name = content_hash
+
+    if staged_pipeline is not None:
+        # Decode, spectrogram data and mel work happen in worker processes
+        logger.info(f"Classifying through staged pipeline: {filepath}")
+        source = upload_data if upload_data is not None else saved_path()
+        result = staged_pipeline.classify(source, spectrogram_name=spectrogram_name)
+        genre, confidence, spectrogram_path = result['genre'], result['confidence'], result['spectrogram']
+        chunks_used = result['chunks']
+        checkpoint()
+    else:
+        # Process audio file
+        logger.info(f"Processing audio file: {filepath}")
+        processed_audio = process_audio(io.BytesIO(upload_data) if upload_data is not None else saved_path())
+        checkpoint()
+
+        # Store the spectrogram data; the image is rendered on first request
+        logger.info(f"Computing spectrogram for: {filename}")
+        track_mel_power = compute_track_mel_power(processed_audio)
+        spectrogram_path = save_spectrogram_data(track_mel_power, spectrogram_name)
+        checkpoint()
+
+        # Predict genre
+        logger.info(f"Predicting genre for: {filename}")
+        if EARLY_EXIT:
+            genre, confidence, details = predict_genre_adaptive(
+                inference_dispatcher or model, processed_audio, track_mel_power=track_mel_power
+            )
+            chunks_used = details['chunks_used']
+        else:
+            genre, confidence = predict_genre(
+                inference_dispatcher or model, audio_data=processed_audio, track_mel_power=track_mel_power
+            )
+            chunks_used = None
+        checkpoint()
+
+    if prediction_cache is not None:
+        prediction_cache.put(content_hash, {
+            'genre': genre,
+            'confidence': confidence,
+            'spectrogram': spectrogram_path
+        })
+
+    # Add to playlist
+    logger.info(f"Adding to playlist: {genre}")
+    playlist_id = add_to_playlist(filepath, genre)
+
+    saved_path()
+    logger.info(f"Successfully processed file: {filename}, genre: {genre}")
+    return {
+        'filename': filename,
+        'genre': genre,
+        'confidence': confidence,
+        'spectrogram': spectrogram_path,
+        'spectrogram_url': f"/api/spectrogram/{spectrogram_path}",
+        **audio_urls(filename, content_hash),
+        'playlist_id': playlist_id,
+        'cached': False,
+        'chunks_used': chunks_used
+    }
+
 @app.route('/api/upload', methods=['POST'])
 def upload_file():
     """
     API endpoint for uploading audio files
+
+    With ?async=1 the file is classified by a background job and the
+    response is a job ID to poll at /api/jobs/<job_id>.
     """
     logger.info(f"Received upload request: {request.files}")
 
@@ -66,39 +384,39 @@ def upload_file():
     if file and allowed_file(file.filename):
         filename = secure_filename(file.filename)
         filepath = os.path.join(app.config['UPLOAD_FOLDER'], filename)
-        logger.info(f"Saving file to: {filepath}")
-        file.save(filepath)
+        upload_data, persisted = None, None
+        if UPLOAD_IN_MEMORY:
+            # Decode from memory while the original is written in the background
+            upload_data, content_hash = read_upload_with_hash(file.stream)
+            logger.info(f"Saving file in the background to: {filepath}")
+            persisted = persist_upload(upload_data, filepath, content_hash)
+            if not can_decode_in_memory(upload_data):
+                upload_data = None
+        else:
+            logger.info(f"Saving file to: {filepath}")
+            content_hash = save_upload_with_hash(file.stream, filepath)
+            register_upload(filepath, content_hash)
+        classify_kwargs = {'upload_data': upload_data, 'persisted': persisted}
 
-        try:
-            # Process audio file
-            logger.info(f"Processing audio file: {filepath}")
-            processed_audio = process_audio(filepath)
-
-            # Generate spectrogram
-            logger.info(f"Generating spectrogram for: {filename}")
-            spectrogram_path = generate_spectrogram(processed_audio, filename)
-
-            # Predict genre
-            if model is not None:
-                logger.info(f"Predicting genre for: {filename}")
-                genre, confidence = predict_genre(model, audio_data=processed_audio)
-
-                # Add to playlist
-                logger.info(f"Adding to playlist: {genre}")
-                playlist_id = add_to_playlist(filepath, genre)
-
-                logger.info(f"Successfully processed file: {filename}, genre: {genre}")
-                return jsonify({
-                    'filename': filename,
-                    'genre': genre,
-                    'confidence': confidence,
-                    'spectrogram': spectrogram_path,
-                    'playlist_id': playlist_id
-                }), 200
-            else:
-                logger.error("Model not loaded")
-                return jsonify({'error': 'Model not loaded'}), 500
+        run_async = request.args.get('async', '').lower() in ('1', 'true', 'yes')
+        UPLOADS.labels('async' if run_async else 'sync').inc()
+        if run_async:
+            try:
+                job_id = job_manager.submit(classify_upload, filepath, filename, content_hash, **classify_kwargs)
+            except JobQueueFull as e:
+                logger.error(f"Rejected upload job: {e}")
+                return jsonify({'error': str(e)}), 503
+            return jsonify({
+                'job_id': job_id,
+                'status': 'queued',
+                'status_url': f"/api/jobs/{job_id}"
+            }), 202
 
+        try:
+            return jsonify(classify_upload(filepath, filename, content_hash, **classify_kwargs)), 200
+        except BackendStarting as e:
+            logger.warning(f"Upload arrived before startup finished: {filename}")
+            return jsonify({'error': str(e)}), 503
         except Exception as e:
             logger.error(f"Error processing file: {e}")
             import traceback
@@ -108,28 +426,287 @@ def upload_file():
     logger.error(f"File type not allowed: {file.filename}")
     return jsonify({'error': 'File type not allowed'}), 400
 
+@app.route('/api/upload/bulk', methods=['POST'])
+def bulk_upload():
+    """
+    API endpoint for uploading many audio files in one request
+
+    Accepts any number of file parts (named 'files' or 'file'), each an
+    audio file or a zip archive of audio files. Tracks are classified in
+    parallel and the response streams one NDJSON line per track as it
+    finishes: {index, filename, status: 'ok', result} with the same result
+    as /api/upload, or {index, filename, status: 'error', error}. A final
+    {status: 'done', total, succeeded, failed} line ends the stream.
+    """
+    parts = request.files.getlist('files') + request.files.getlist('file')
+    if not parts:
+        logger.error("No file parts in the bulk request")
+        return jsonify({'error': 'No file part'}), 400
+
+    try:
+        items = save_bulk_upload(
+            [(part.filename, part.stream) for part in parts],
+            app.config['UPLOAD_FOLDER'],
+            ALLOWED_EXTENSIONS,
+            max_files=BULK_MAX_FILES,
+            max_uncompressed_bytes=BULK_MAX_UNCOMPRESSED_BYTES
+        )
+    except BulkUploadRejected as e:
+        logger.error(f"Rejected bulk upload: {e}")
+        return jsonify({'error': str(e)}), 413
+
+    for item in items:
+        if 'error' not in item:
+            register_upload(item['path'], item['content_hash'])
+            UPLOADS.labels('bulk').inc()
+    logger.info(f"Bulk upload saved: {len(items)} items")
+
+    def generate():
+        succeeded = 0
+        for line in iter_bulk_results(items, classify_upload, bulk_executor):
+            succeeded += line['status'] == 'ok'
+            yield flask_json.dumps(line) + '\n'
+        yield flask_json.dumps({
+            'status': 'done', 'total': len(items), 'succeeded': succeeded, 'failed': len(items) - succeeded
+        }) + '\n'
+
+    return Response(stream_with_context(generate()), status=200, mimetype='application/x-ndjson')
+
+@app.route('/api/jobs/<job_id>', methods=['GET'])
+def get_job(job_id):
+    """
+    API endpoint for retrieving the status and result of an upload job
+    """
+    job = job_manager.get(job_id)
+    if job is None:
+        return jsonify({'error': 'Job not found'}), 404
+    return jsonify(job), 200
+
+@app.route('/api/jobs/<job_id>', methods=['DELETE'])
+def cancel_job(job_id):
+    """
+    API endpoint for cancelling a queued or running upload job
+    """
+    job = job_manager.cancel(job_id)
+    if job is None:
+        return jsonify({'error': 'Job not found'}), 404
+    return jsonify(job), 200
+
+def _send_audio(directory, name, content_hash, etag, mimetype=None):
+    """
+    Send an audio file with Range support and a strong ETag
+
+    Requests whose ?v= matches the upload's content hash are cacheable for
+    AUDIO_CACHE_MAX_AGE_S and marked immutable; others must revalidate.
+    """
+    version = request.args.get('v', '')
+    immutable = len(version) >= URL_VERSION_LENGTH and content_hash.startswith(version)
+    response = send_from_directory(
+        directory, name, mimetype=mimetype, conditional=True, etag=etag,
+        max_age=AUDIO_CACHE_MAX_AGE_S if immutable else 0
+    )
+    if immutable:
+        response.cache_control.immutable = True
+    else:
+        response.cache_control.no_cache = True
+    # Advertised on full responses too, so players seek with Range requests
+    response.accept_ranges = 'bytes'
+    return response
+
+def _upload_path(filename):
+    """Path of an uploaded audio file, or None if there is no such upload."""
+    if not allowed_file(filename):
+        return None
+    path = safe_join(app.config['UPLOAD_FOLDER'], filename)
+    if path is None or not os.path.isfile(path):
+        return None
+    return path
+
 @app.route('/api/audio/<filename>', methods=['GET'])
 def get_audio(filename):
     """
     API endpoint for retrieving uploaded audio files
+
+    Supports Range requests (206 Partial Content), so seeking fetches only
+    the bytes needed, and If-None-Match / If-Range against the
+    content-hash ETag.
+    """
+    path = _upload_path(filename)
+    if path is None:
+        return jsonify({'error': 'Audio file not found'}), 404
+    content_hash = content_hash_index.get(path)
+    return _send_audio(app.config['UPLOAD_FOLDER'], filename, content_hash, etag=content_hash)
+
+@app.route('/api/audio/<filename>/preview', methods=['GET'])
+def get_audio_preview(filename):
+    """
+    API endpoint for retrieving the low-bitrate preview of an upload
+
+    Redirects to the original file while the preview is not ready yet, so
+    players can always request the preview.
     """
-    return send_from_directory(app.config['UPLOAD_FOLDER'], filename)
+    path = _upload_path(filename)
+    if path is None:
+        return jsonify({'error': 'Audio file not found'}), 404
+
+    content_hash = content_hash_index.get(path)
+    if preview_generator is None or not preview_generator.is_ready(content_hash):
+        if preview_generator is not None:
+            preview_generator.submit(path, content_hash)
+        query = f"?v={content_hash[:URL_VERSION_LENGTH]}"
+        response = redirect(f"/api/audio/{filename}{query}", code=307)
+        response.cache_control.no_store = True
+        return response
+
+    preview_name = os.path.basename(preview_generator.path(content_hash))
+    return _send_audio(PREVIEW_FOLDER, preview_name, content_hash, etag=f"{content_hash}-preview", mimetype='audio/mpeg')
 
 @app.route('/api/spectrogram/<filename>', methods=['GET'])
 def get_spectrogram(filename):
     """
-    API endpoint for retrieving generated spectrograms
+    API endpoint for retrieving spectrogram images
+
+    The image is rendered from the stored spectrogram data on the first
+    request and served from disk afterwards.
+    """
+    if secure_filename(filename) != filename:
+        return jsonify({'error': 'Invalid filename'}), 400
+    try:
+        render_spectrogram(filename)
+    except FileNotFoundError:
+        return jsonify({'error': 'Spectrogram not found'}), 404
+    except Exception as e:
+        logger.error(f"Error rendering spectrogram: {e}")
+        return jsonify({'error': str(e)}), 500
+    return send_from_directory(SPECTROGRAM_FOLDER, filename)
+
+def _parse_playlist_page_args(args):
+    """
+    Validate the /api/playlists pagination arguments
+
+    Returns:
+        tuple: (genre, cursor, limit), or None when no page was asked for
+
+    Raises:
+        ValueError: If an argument is invalid
     """
-    spectrogram_dir = os.path.join(app.config['UPLOAD_FOLDER'], 'spectrograms')
-    return send_from_directory(spectrogram_dir, filename)
+    genre = args.get('genre')
+    cursor = args.get('cursor')
+    if args.get('limit') is None and genre is None and cursor is None:
+        return None
+
+    limit = args.get('limit', str(PLAYLISTS_PAGE_SIZE))
+    if not limit.isdigit() or not 1 <= int(limit) <= PLAYLISTS_MAX_PAGE_SIZE:
+        raise ValueError(f"limit must be between 1 and {PLAYLISTS_MAX_PAGE_SIZE}")
+    if cursor is not None:
+        if genre is None:
+            raise ValueError("cursor needs the genre it was returned for")
+        if not cursor.isdigit():
+            raise ValueError(f"Invalid cursor: {cursor}")
+    return genre, cursor, int(limit)
 
 @app.route('/api/playlists', methods=['GET'])
 def get_all_playlists():
     """
-    API endpoint for retrieving all playlists
+    API endpoint for retrieving playlists
+
+    Without arguments this returns every playlist as a genre -> songs dict.
+    With limit, genre or cursor it returns one page per genre (or of the
+    given genre) as {'playlists': {genre: {'songs', 'total', 'next_cursor'}}};
+    pass a genre's next_cursor back with genre=<genre> for its next page.
+
+    Responses come from the in-memory playlist snapshot with an ETag and
+    Last-Modified, so polling clients get 304 Not Modified until a song is
+    added. Bodies are gzip-compressed when the client accepts it and are
+    rendered once per snapshot.
+    """
+    try:
+        page_args = _parse_playlist_page_args(request.args)
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+
+    try:
+        snapshot = get_playlist_snapshot()
+    except Exception as e:
+        logger.error(f"Error loading playlists: {e}")
+        return jsonify({'error': str(e)}), 500
+
+    use_gzip = request.accept_encodings['gzip'] > 0
+    etag = f"{snapshot.etag}-gzip" if use_gzip else snapshot.etag
+    last_modified = None
+    if snapshot.last_modified is not None:
+        last_modified = datetime.fromtimestamp(int(snapshot.last_modified), timezone.utc)
+
+    if not is_resource_modified(request.environ, etag=etag, last_modified=last_modified):
+        response = app.response_class(status=304)
+    else:
+        def render():
+            if page_args is None:
+                data = snapshot.playlists
+            else:
+                genre, cursor, limit = page_args
+                genres = [genre] if genre is not None else list(snapshot.playlists)
+                data = {'playlists': {g: snapshot.page(g, cursor, limit) for g in genres}}
+            body = (flask_json.dumps(data) + '\n').encode('utf-8')
+            if use_gzip and len(body) >= GZIP_MIN_BYTES:
+                return gzip.compress(body, compresslevel=6), 'gzip'
+            return body, None
+
+        body, content_encoding = snapshot.cached((page_args, use_gzip), render)
+        response = app.response_class(body, status=200, mimetype='application/json')
+        if content_encoding:
+            response.headers['Content-Encoding'] = content_encoding
+
+    response.set_etag(etag)
+    if last_modified is not None:
+        response.last_modified = last_modified
+    response.headers['Cache-Control'] = 'no-cache'
+    response.vary.add('Accept-Encoding')
+    return response
+
+@app.route('/api/cache/stats', methods=['GET'])
+def get_cache_stats():
+    """
+    API endpoint for retrieving prediction cache hit/miss counters
+    """
+    if prediction_cache is None:
+        return jsonify({'error': 'Prediction cache not available'}), 503
+    return jsonify(prediction_cache.stats()), 200
+
+@app.route('/api/inference/stats', methods=['GET'])
+def get_inference_stats():
+    """
+    API endpoint for retrieving batch-size and queue-wait statistics
+    """
+    if inference_dispatcher is None:
+        return jsonify({'error': 'Inference batching not enabled'}), 503
+    return jsonify(inference_dispatcher.stats()), 200
+
+@app.route('/metrics', methods=['GET'])
+def metrics():
+    """
+    Prometheus scrape endpoint: stage latency histograms, upload, stage error
+    and chunk counters, in-flight requests and model load time
+    """
+    if not METRICS_ENABLED:
+        return jsonify({'error': 'Metrics not enabled'}), 404
+    return Response(REGISTRY.exposition(), status=200, content_type=CONTENT_TYPE)
+
+@app.route('/healthz', methods=['GET'])
+def healthz():
+    """
+    Liveness probe: the process is up and answering requests
+    """
+    return jsonify({'status': 'alive'}), 200
+
+@app.route('/readyz', methods=['GET'])
+def readyz():
+    """
+    Readiness probe: 200 once the model is loaded and warm-up has finished,
+    503 while starting or after a failed startup
     """
-    playlists = get_playlists()
-    return jsonify(playlists), 200
+    status_code = 200 if startup_state['status'] == 'ready' else 503
+    return jsonify(startup_state), status_code
 
 @app.route('/test', methods=['GET'])
 def test():
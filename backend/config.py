@@ -3,11 +3,93 @@ import os
 # File upload settings
 UPLOAD_FOLDER = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'uploads')
 ALLOWED_EXTENSIONS = {'wav', 'mp3'}
+# Decode uploads from memory and write the original to UPLOAD_FOLDER in the
+# background, instead of saving it and reading it back before decoding
+UPLOAD_IN_MEMORY = True
+UPLOAD_WRITER_WORKERS = 2
+# Spectrogram data (.npy) is stored per upload; images are rendered on first request
+SPECTROGRAM_FOLDER = os.path.join(UPLOAD_FOLDER, 'spectrograms')
+
+# Playlist store (SQLite, WAL mode); an existing playlists.json is imported once
+PLAYLISTS_DB = os.path.join(UPLOAD_FOLDER, 'playlists.db')
+PLAYLISTS_BUSY_TIMEOUT_S = 30  # How long a write waits for another writer's lock
+PLAYLISTS_PAGE_SIZE = 100      # Songs per genre in a page when ?limit is not given
+PLAYLISTS_MAX_PAGE_SIZE = 1000
+GZIP_MIN_BYTES = 1024          # Smaller JSON responses are sent uncompressed
+
+# Audio delivery: uploads are served with Range support and content-hash
+# ETags; URLs carrying the current ?v=<hash> are cacheable for a year
+AUDIO_CACHE_MAX_AGE_S = 365 * 24 * 3600
+# Low-bitrate previews (mono MP3) encoded in the background after each upload
+AUDIO_PREVIEWS = True
+PREVIEW_FOLDER = os.path.join(UPLOAD_FOLDER, 'previews')
+PREVIEW_WORKERS = 1
+PREVIEW_SAMPLE_RATE = 22050
+PREVIEW_COMPRESSION_LEVEL = 0.8  # libsndfile MP3 level; 0.8 is about 40 kbps at 22050 Hz
+
+# Prediction cache settings (results keyed by upload content hash)
+PREDICTION_CACHE_DIR = os.path.join(UPLOAD_FOLDER, 'cache')
+PREDICTION_CACHE_MEMORY_ENTRIES = 256
+PREDICTION_CACHE_DISK_ENTRIES = 10000
+
+# Asynchronous upload job settings
+JOB_WORKERS = 2          # Worker threads classifying uploads
+JOB_MAX_PENDING = 32     # Queued plus running jobs before uploads are rejected
+JOB_TIMEOUT_S = 120      # Seconds a job may run before it is timed out
+JOB_RETENTION_S = 600    # Seconds finished job results are kept
+
+# Bulk uploads (/api/upload/bulk): many files or zip archives in one request
+BULK_WORKERS = 4                                # Tracks classified at once across bulk uploads
+BULK_MAX_FILES = 500                            # Audio files per request
+BULK_MAX_CONTENT_LENGTH = 1024 * 1024 * 1024    # Request body size (single uploads stay at 16MB)
+BULK_MAX_UNCOMPRESSED_BYTES = 2 * 1024 ** 3     # Total size zip archives may expand to
+
+# Prometheus metrics (stage latency histograms, upload/error/chunk counters)
+# served at /metrics in the text exposition format
+METRICS_ENABLED = True
 
 # Model settings
 MODEL_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'model')
 MODEL_PATH = os.path.join(MODEL_DIR, 'best_chunked_custom_cnn_model.keras')
 
+# Inference graph for the Keras backend: strip training-only layers, fold
+# BatchNorm into Conv2D and run fixed-signature graphs per batch-size bucket
+OPTIMIZE_INFERENCE_GRAPH = True
+INFERENCE_BATCH_BUCKETS = (1, 2, 4, 8, 14, 16, 32, 64)  # 14 = chunks of a 30 s track
+INFERENCE_GRAPH_TOLERANCE = 1e-4   # Largest output difference accepted when verifying
+INFERENCE_JIT_COMPILE = False      # XLA; slower than the plain graph on the CPUs measured
+
+# Inference backend: 'keras' runs MODEL_PATH with model.predict, 'tflite' runs
+# a variant converted by scripts/convert_tflite.py through the TFLite interpreter
+INFERENCE_BACKEND = 'keras'
+TFLITE_VARIANT = 'dynamic'     # 'float32', 'float16', 'dynamic' or 'int8'
+TFLITE_NUM_THREADS = None      # Interpreter threads (None lets TFLite decide)
+
+# Startup: the model is loaded and warmed up in the background; /readyz
+# reports ready once that has finished
+WARMUP_ON_STARTUP = True       # Run decode -> mel -> resize -> predict on synthetic audio
+STARTUP_REQUEST_WAIT_S = 60    # How long an upload waits for a starting backend before a 503
+
+# Cross-request inference batching
+INFERENCE_BATCHING = True
+INFERENCE_MAX_BATCH_SIZE = 64  # Chunk inputs per forward pass (a 30 s track has 14)
+INFERENCE_MAX_DELAY_MS = 5     # How long a request may wait for others to join its batch
+
+# Adaptive chunk evaluation: stop once the running average prediction is stable
+EARLY_EXIT = False
+EARLY_EXIT_MIN_CHUNKS = 4        # Chunks evaluated before the first stability check
+EARLY_EXIT_STEP = 2              # Chunks added per forward pass after that
+EARLY_EXIT_TEST = 'margin'       # 'margin' or 'entropy'
+EARLY_EXIT_MARGIN = 0.3          # Minimum top-1 minus top-2 probability
+EARLY_EXIT_MAX_ENTROPY = 0.7     # Maximum entropy of the average, in nats
+
+# Staged multi-process pipeline (decode and mel work in process pools)
+STAGED_PIPELINE = False
+PIPELINE_DECODE_WORKERS = 2       # Processes decoding audio files
+PIPELINE_MEL_WORKERS = 2          # Processes computing model input spectrograms
+PIPELINE_MAX_IN_FLIGHT = 8        # Tracks between stages at once (shared memory slots)
+PIPELINE_START_METHOD = 'forkserver'  # multiprocessing start method for the worker pools ('fork' is unsafe in the threaded server)
+
 # No global scaler is used - instance-based normalization is applied instead
 
 # Audio processing settings
@@ -26,6 +108,12 @@ N_MELS = 128
 N_FFT = 2048
 HOP_LENGTH = 512
 
+# Compute the power mel spectrogram once per track and slice each chunk's
+# frames out of it instead of running a separate STFT for every overlapping
+# chunk. See compute_track_mel_power() for the tolerance against the
+# per-chunk pipeline.
+TRACK_LEVEL_MEL = True
+
 # Resizing parameters
 RESIZE_DIM = 128  # Target height and width (128x128)
 TARGET_SHAPE = (RESIZE_DIM, RESIZE_DIM)
@@ -0,0 +1,134 @@
+import tensorflow as tf
+from tensorflow.keras import layers, models
+from tensorflow.keras.regularizers import l2
+from tensorflow.keras.saving import register_keras_serializable
+from backend.config import GENRES, TARGET_SHAPE
+
+# Define custom layers for model loading
+@register_keras_serializable(package="Custom", name="FrequencyMasking")
+class FrequencyMasking(layers.Layer):
+    """Applies Frequency Masking augmentation."""
+    def __init__(self, freq_mask_param, name="frequency_masking", **kwargs):
+        super().__init__(name=name, **kwargs)
+        self.freq_mask_param = freq_mask_param
+
+    def call(self, inputs, training=None):
+        if training is None: training = False
+        def apply_augmentation():
+            n_mels = tf.shape(inputs)[1]
+            f = tf.random.uniform(shape=(), minval=0, maxval=self.freq_mask_param + 1, dtype=tf.int32)
+            def perform_mask():
+                f0 = tf.random.uniform(shape=(), minval=0, maxval=n_mels - f, dtype=tf.int32)
+                mask_value = 0.0
+                mask = tf.concat([tf.ones(shape=(1, f0, 1, 1), dtype=inputs.dtype),
+                                  tf.fill(dims=(1, f, 1, 1), value=mask_value),
+                                  tf.ones(shape=(1, n_mels - f0 - f, 1, 1), dtype=inputs.dtype)], axis=1)
+                batch_size = tf.shape(inputs)[0]
+                mask_repeated = tf.tile(mask, [batch_size, 1, tf.shape(inputs)[2], 1])
+                return inputs * mask_repeated
+            return tf.cond(tf.greater(f, 0), true_fn=perform_mask, false_fn=lambda: inputs)
+        return tf.cond(tf.cast(training, tf.bool), true_fn=apply_augmentation, false_fn=lambda: inputs)
+
+    def get_config(self):
+        config = super().get_config()
+        config.update({"freq_mask_param": self.freq_mask_param})
+        return config
+
+@register_keras_serializable(package="Custom", name="TimeMasking")
+class TimeMasking(layers.Layer):
+    """Applies Time Masking augmentation."""
+    def __init__(self, time_mask_param, name="time_masking", **kwargs):
+        super().__init__(name=name, **kwargs)
+        self.time_mask_param = time_mask_param
+
+    def call(self, inputs, training=None):
+        if training is None: training = False
+        def apply_augmentation():
+            time_steps = tf.shape(inputs)[2]
+            t = tf.random.uniform(shape=(), minval=0, maxval=self.time_mask_param + 1, dtype=tf.int32)
+            def perform_mask():
+                t0 = tf.random.uniform(shape=(), minval=0, maxval=time_steps - t, dtype=tf.int32)
+                mask_value = 0.0
+                mask = tf.concat([tf.ones(shape=(1, 1, t0, 1), dtype=inputs.dtype),
+                                  tf.fill(dims=(1, 1, t, 1), value=mask_value),
+                                  tf.ones(shape=(1, 1, time_steps - t0 - t, 1), dtype=inputs.dtype)], axis=2)
+                batch_size = tf.shape(inputs)[0]
+                mask_repeated = tf.tile(mask, [batch_size, tf.shape(inputs)[1], 1, 1])
+                return inputs * mask_repeated
+            return tf.cond(tf.greater(t, 0), true_fn=perform_mask, false_fn=lambda: inputs)
+        return tf.cond(tf.cast(training, tf.bool), true_fn=apply_augmentation, false_fn=lambda: inputs)
+
+    def get_config(self):
+        config = super().get_config()
+        config.update({"time_mask_param": self.time_mask_param})
+        return config
+
+def create_placeholder_model():
+    """
+    Create a placeholder model for development that matches the architecture of the trained model
+
+    Returns:
+        tf.keras.Model: Placeholder model
+    """
+    # Define input shape (mel spectrogram dimensions)
+    input_shape = (TARGET_SHAPE[0], TARGET_SHAPE[1], 1)  # (height, width, channels)
+
+    # Create a model with the same architecture as the trained model
+    model = models.Sequential(name="Refined_CNN_Genre_Classifier")
+    model.add(layers.Input(shape=input_shape, name="Input_Spectrogram"))
+
+    # Augmentation layers
+    model.add(FrequencyMasking(25, name="FreqMask"))
+    model.add(TimeMasking(30, name="TimeMask"))
+
+    # Block 1
+    model.add(layers.Conv2D(32, (3, 3), padding='same', kernel_regularizer=l2(0.001), name="Conv1_1"))
+    model.add(layers.BatchNormalization(name="BN1_1"))
+    model.add(layers.Activation('relu', name="Relu1_1"))
+    model.add(layers.Conv2D(32, (3, 3), padding='same', kernel_regularizer=l2(0.001), name="Conv1_2"))
+    model.add(layers.BatchNormalization(name="BN1_2"))
+    model.add(layers.Activation('relu', name="Relu1_2"))
+    model.add(layers.MaxPooling2D((2, 2), strides=(2, 2), name="Pool1"))
+    model.add(layers.Dropout(0.25, name="Drop1"))
+
+    # Block 2
+    model.add(layers.Conv2D(64, (3, 3), padding='same', kernel_regularizer=l2(0.001), name="Conv2_1"))
+    model.add(layers.BatchNormalization(name="BN2_1"))
+    model.add(layers.Activation('relu', name="Relu2_1"))
+    model.add(layers.Conv2D(64, (3, 3), padding='same', kernel_regularizer=l2(0.001), name="Conv2_2"))
+    model.add(layers.BatchNormalization(name="BN2_2"))
+    model.add(layers.Activation('relu', name="Relu2_2"))
+    model.add(layers.MaxPooling2D((2, 2), strides=(2, 2), name="Pool2"))
+    model.add(layers.Dropout(0.25, name="Drop2"))
+
+    # Block 3
+    model.add(layers.Conv2D(128, (3, 3), padding='same', kernel_regularizer=l2(0.001), name="Conv3_1"))
+    model.add(layers.BatchNormalization(name="BN3_1"))
+    model.add(layers.Activation('relu', name="Relu3_1"))
+    model.add(layers.Conv2D(128, (3, 3), padding='same', kernel_regularizer=l2(0.001), name="Conv3_2"))
+    model.add(layers.BatchNormalization(name="BN3_2"))
+    model.add(layers.Activation('relu', name="Relu3_2"))
+    model.add(layers.MaxPooling2D((2, 2), strides=(2, 2), name="Pool3"))
+    model.add(layers.Dropout(0.3, name="Drop3"))
+
+    # Block 4
+    model.add(layers.Conv2D(256, (3, 3), padding='same', kernel_regularizer=l2(0.001), name="Conv4_1"))
+    model.add(layers.BatchNormalization(name="BN4_1"))
+    model.add(layers.Activation('relu', name="Relu4_1"))
+    model.add(layers.MaxPooling2D((2, 2), strides=(2, 2), name="Pool4"))
+    model.add(layers.Dropout(0.3, name="Drop4"))
+
+    # Classification Head
+    model.add(layers.GlobalAveragePooling2D(name="GAP"))
+    model.add(layers.Dense(128, activation='relu', kernel_regularizer=l2(0.001), name="Dense1"))
+    model.add(layers.Dropout(0.5, name="Drop_Dense"))
+    model.add(layers.Dense(len(GENRES), activation='softmax', name="Output_Softmax"))
+
+    # Compile the model
+    model.compile(
+        optimizer=tf.keras.optimizers.Adam(learning_rate=1e-4),
+        loss='categorical_crossentropy',
+        metrics=['accuracy']
+    )
+
+    return model
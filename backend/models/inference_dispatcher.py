@@ -0,0 +1,169 @@
+import time
+import logging
+import threading
+from collections import deque
+from concurrent.futures import Future
+import numpy as np
+from backend.utils.metrics import stage_timer, INFERENCE_QUEUE_WAIT
+
+logger = logging.getLogger(__name__)
+
+class _PendingRequest:
+    """Inputs from one caller waiting to be batched."""
+    def __init__(self, inputs):
+        self.inputs = inputs
+        self.future = Future()
+        self.enqueued_at = time.perf_counter()
+
+class InferenceDispatcher:
+    """
+    Batches model inputs from concurrent requests into shared forward passes
+
+    Callers use predict() like tf.keras.Model.predict. A single worker
+    thread collects pending inputs until max_batch_size rows are queued or
+    the oldest request has waited max_delay_ms, runs one forward pass and
+    hands each caller its own rows back. Running every forward pass on one
+    thread also stops concurrent requests from contending for TF's
+    intra-op thread pool.
+
+    The 'inference' stage metric times the shared forward pass only; the
+    time each request spends queued is recorded separately, in
+    genre_inference_queue_wait_seconds.
+    """
+    # Callers must not time predict() as 'inference' themselves
+    records_inference_metrics = True
+
+    def __init__(self, model, max_batch_size=64, max_delay_ms=5):
+        self.model = model
+        self.max_batch_size = max_batch_size
+        self.max_delay_s = max_delay_ms / 1000.0
+        self._queue = deque()
+        self._condition = threading.Condition()
+        self._stopped = False
+        self._stats_lock = threading.Lock()
+        self._batches = 0
+        self._rows = 0
+        self._requests = 0
+        self._max_batch_rows = 0
+        self._total_wait_s = 0.0
+        self._max_wait_s = 0.0
+        self._batch_size_counts = {}
+        self._worker = threading.Thread(target=self._run, name='inference-dispatcher', daemon=True)
+        self._worker.start()
+
+    @property
+    def input_shape(self):
+        return self.model.input_shape
+
+    @property
+    def output_shape(self):
+        return self.model.output_shape
+
+    def predict(self, inputs, batch_size=None, verbose=0):
+        """
+        Run inputs through the model as part of a shared batch
+
+        Args:
+            inputs (numpy.ndarray): Model input batch of shape (N, H, W, 1)
+            batch_size, verbose: Accepted for compatibility with Model.predict
+
+        Returns:
+            numpy.ndarray: Model outputs for the N inputs
+        """
+        request = _PendingRequest(np.asarray(inputs, dtype=np.float32))
+        with self._condition:
+            if self._stopped:
+                raise RuntimeError("Inference dispatcher has been stopped")
+            self._queue.append(request)
+            self._condition.notify()
+        return request.future.result()
+
+    def stop(self):
+        """Stop the worker thread after the queued requests are served."""
+        with self._condition:
+            self._stopped = True
+            self._condition.notify()
+        self._worker.join()
+
+    def _collect_batch(self):
+        with self._condition:
+            while not self._queue:
+                if self._stopped:
+                    return None
+                self._condition.wait()
+
+            batch = [self._queue.popleft()]
+            rows = len(batch[0].inputs)
+            deadline = batch[0].enqueued_at + self.max_delay_s
+            while rows < self.max_batch_size:
+                if self._queue:
+                    # Requests that would overflow the batch wait for the next one
+                    if rows + len(self._queue[0].inputs) > self.max_batch_size:
+                        break
+                    request = self._queue.popleft()
+                    batch.append(request)
+                    rows += len(request.inputs)
+                    continue
+                remaining = deadline - time.perf_counter()
+                if remaining <= 0 or self._stopped:
+                    break
+                self._condition.wait(remaining)
+            return batch
+
+    def _run(self):
+        while True:
+            batch = self._collect_batch()
+            if batch is None:
+                return
+
+            started_at = time.perf_counter()
+            try:
+                inputs = np.concatenate([request.inputs for request in batch], axis=0)
+                with stage_timer('inference'):
+                    outputs = self.model.predict(inputs, batch_size=len(inputs), verbose=0)
+            except Exception as e:
+                logger.error(f"Batched inference failed for {len(batch)} requests: {e}")
+                for request in batch:
+                    request.future.set_exception(e)
+                continue
+
+            # Record first, so the batch is counted once its callers return
+            self._record(batch, len(inputs), started_at)
+            offset = 0
+            for request in batch:
+                rows = len(request.inputs)
+                request.future.set_result(outputs[offset:offset + rows])
+                offset += rows
+
+    def _record(self, batch, rows, started_at):
+        with self._stats_lock:
+            self._batches += 1
+            self._rows += rows
+            self._requests += len(batch)
+            self._max_batch_rows = max(self._max_batch_rows, rows)
+            self._batch_size_counts[rows] = self._batch_size_counts.get(rows, 0) + 1
+            for request in batch:
+                wait_s = started_at - request.enqueued_at
+                INFERENCE_QUEUE_WAIT.observe(wait_s)
+                self._total_wait_s += wait_s
+                self._max_wait_s = max(self._max_wait_s, wait_s)
+
+    def stats(self):
+        """
+        Get batch-size and queue-wait statistics
+
+        Returns:
+            dict: Dispatcher statistics
+        """
+        with self._stats_lock:
+            return {
+                'batches': self._batches,
+                'requests': self._requests,
+                'rows': self._rows,
+                'mean_batch_size': self._rows / self._batches if self._batches else 0.0,
+                'max_batch_size': self._max_batch_rows,
+                'batch_size_counts': {str(size): count for size, count in sorted(self._batch_size_counts.items())},
+                'mean_queue_wait_ms': 1000.0 * self._total_wait_s / self._requests if self._requests else 0.0,
+                'max_queue_wait_ms': 1000.0 * self._max_wait_s,
+                'queued_requests': len(self._queue),
+            }
@@ -0,0 +1,226 @@
+import logging
+import threading
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+# Layers that only act during training and are identities at inference
+TRAINING_ONLY_LAYERS = ('FrequencyMasking', 'TimeMasking', 'Dropout', 'SpatialDropout2D', 'GaussianNoise')
+
+def _is_linear(layer):
+    activation = getattr(layer, 'activation', None)
+    return activation is None or getattr(activation, '__name__', '') == 'linear'
+
+def fold_batch_norm(conv, batch_norm):
+    """
+    Fold an inference-mode BatchNormalization into the Conv2D before it
+
+    BN(conv(x)) = gamma * (W*x + b - mean) / sqrt(var + eps) + beta, which
+    is a convolution with kernel W * s and bias (b - mean) * s + beta, where
+    s = gamma / sqrt(var + eps) per output channel.
+
+    Args:
+        conv (keras.layers.Conv2D): Convolution with a linear activation
+        batch_norm (keras.layers.BatchNormalization): Normalization over the
+            channel axis that directly follows conv
+
+    Returns:
+        tuple: (kernel, bias) numpy arrays for a Conv2D with use_bias=True
+    """
+    kernel = np.asarray(conv.kernel, dtype=np.float64)
+    out_channels = kernel.shape[-1]
+    bias = np.asarray(conv.bias, dtype=np.float64) if conv.use_bias else np.zeros(out_channels)
+
+    gamma = np.asarray(batch_norm.gamma, dtype=np.float64) if batch_norm.scale else np.ones(out_channels)
+    beta = np.asarray(batch_norm.beta, dtype=np.float64) if batch_norm.center else np.zeros(out_channels)
+    mean = np.asarray(batch_norm.moving_mean, dtype=np.float64)
+    variance = np.asarray(batch_norm.moving_variance, dtype=np.float64)
+
+    scale = gamma / np.sqrt(variance + batch_norm.epsilon)
+    folded_kernel = (kernel * scale).astype(np.float32)
+    folded_bias = ((bias - mean) * scale + beta).astype(np.float32)
+    return folded_kernel, folded_bias
+
+def _can_fold(layer, next_layer):
+    if type(layer).__name__ != 'Conv2D' or type(next_layer).__name__ != 'BatchNormalization':
+        return False
+    axis = next_layer.axis if isinstance(next_layer.axis, int) else tuple(next_layer.axis)
+    return _is_linear(layer) and axis in (-1, 3, (3,), (-1,))
+
+def build_inference_model(model):
+    """
+    Copy a Sequential model without training-only layers and with every
+    BatchNormalization folded into the Conv2D in front of it
+
+    Args:
+        model (tf.keras.Sequential): Trained model
+
+    Returns:
+        tf.keras.Sequential: Inference-only model with the same outputs
+    """
+    import tensorflow as tf
+
+    if not isinstance(model, tf.keras.Sequential):
+        raise ValueError(f"Only Sequential models can be optimized, got {type(model).__name__}")
+
+    source_layers = [layer for layer in model.layers if type(layer).__name__ not in TRAINING_ONLY_LAYERS]
+    new_layers = []
+    new_weights = []
+    stripped = len(model.layers) - len(source_layers)
+    folded = 0
+
+    i = 0
+    while i < len(source_layers):
+        layer = source_layers[i]
+        config = layer.get_config()
+        next_layer = source_layers[i + 1] if i + 1 < len(source_layers) else None
+
+        if next_layer is not None and _can_fold(layer, next_layer):
+            config.update(use_bias=True, kernel_regularizer=None, bias_regularizer=None, activity_regularizer=None)
+            new_layers.append(type(layer).from_config(config))
+            new_weights.append(list(fold_batch_norm(layer, next_layer)))
+            folded += 1
+            i += 2
+            continue
+
+        for key in ('kernel_regularizer', 'bias_regularizer', 'activity_regularizer'):
+            if key in config:
+                config[key] = None
+        new_layers.append(type(layer).from_config(config))
+        new_weights.append(layer.get_weights())
+        i += 1
+
+    inference_model = tf.keras.Sequential(
+        [tf.keras.Input(shape=model.input_shape[1:])] + new_layers,
+        name=f"{model.name}_inference"
+    )
+    for layer, weights in zip(new_layers, new_weights):
+        layer.set_weights(weights)
+
+    logger.info(f"Inference model built: {stripped} training-only layers removed, {folded} BatchNorm layers folded")
+    return inference_model
+
+class CompiledModel:
+    """
+    Runs an inference model through tf.function graphs traced once per
+    batch-size bucket
+
+    Every bucket gets a concrete function with a fixed input signature when
+    the model is built, so calls never retrace. predict() pads a batch up to
+    the smallest bucket that fits (larger batches are split into
+    largest-bucket pieces) and returns float32 outputs like Model.predict.
+    """
+    def __init__(self, inference_model, batch_buckets, jit_compile=False):
+        import tensorflow as tf
+
+        self.model = inference_model
+        self.batch_buckets = tuple(sorted(set(int(b) for b in batch_buckets)))
+        self.jit_compile = jit_compile
+        self._input_shape = tuple(inference_model.input_shape[1:])
+        self._output_shape = tuple(inference_model.output_shape[1:])
+        self._tf = tf
+
+        forward = tf.function(lambda x: inference_model(x, training=False), jit_compile=jit_compile)
+        self._functions = {}
+        for bucket in self.batch_buckets:
+            spec = tf.TensorSpec((bucket,) + self._input_shape, tf.float32)
+            self._functions[bucket] = forward.get_concrete_function(spec)
+        self._stats_lock = threading.Lock()
+        self._bucket_counts = {bucket: 0 for bucket in self.batch_buckets}
+
+    @property
+    def input_shape(self):
+        return (None,) + self._input_shape
+
+    @property
+    def output_shape(self):
+        return (None,) + self._output_shape
+
+    def _run_bucket(self, rows):
+        bucket = next(b for b in self.batch_buckets if b >= len(rows))
+        if bucket > len(rows):
+            padding = np.zeros((bucket - len(rows),) + self._input_shape, dtype=np.float32)
+            rows = np.concatenate([rows, padding])
+        with self._stats_lock:
+            self._bucket_counts[bucket] += 1
+        return self._functions[bucket](self._tf.constant(rows)).numpy()
+
+    def predict(self, inputs, batch_size=None, verbose=0):
+        """
+        Run the model on a batch of inputs
+
+        Args:
+            inputs (numpy.ndarray): Model inputs of shape (N, H, W, 1)
+            batch_size: Ignored; batches are split by bucket size instead
+            verbose: Ignored; accepted for compatibility with Model.predict
+
+        Returns:
+            numpy.ndarray: float32 outputs of shape (N, num_classes)
+        """
+        inputs = np.asarray(inputs, dtype=np.float32)
+        largest = self.batch_buckets[-1]
+        outputs = []
+        for start in range(0, len(inputs), largest):
+            rows = inputs[start:start + largest]
+            outputs.append(self._run_bucket(rows)[:len(rows)])
+        if not outputs:
+            return np.zeros((0,) + self._output_shape, dtype=np.float32)
+        return np.concatenate(outputs).astype(np.float32, copy=False)
+
+    def warm_up(self):
+        """Run every bucket once so that graph optimization happens now."""
+        for bucket, function in self._functions.items():
+            function(self._tf.zeros((bucket,) + self._input_shape, dtype=self._tf.float32))
+
+    def bucket_counts(self):
+        """Number of forward passes run per bucket size."""
+        with self._stats_lock:
+            return dict(self._bucket_counts)
+
+def verify_inference_model(original_model, optimized_model, inputs, tolerance):
+    """
+    Compare an optimized model's outputs with the original model's
+
+    Args:
+        original_model (tf.keras.Model): Model as loaded
+        optimized_model: Anything with predict(), e.g. a CompiledModel
+        inputs (numpy.ndarray): Model inputs of shape (N, H, W, 1)
+        tolerance (float): Largest allowed absolute output difference
+
+    Returns:
+        float: Largest absolute difference found
+
+    Raises:
+        ValueError: If the difference exceeds tolerance
+    """
+    expected = np.asarray(original_model(inputs, training=False))
+    actual = optimized_model.predict(inputs)
+    max_diff = float(np.max(np.abs(actual - expected)))
+    if not max_diff <= tolerance:
+        raise ValueError(f"Optimized model differs from the original by {max_diff:.3g} (tolerance {tolerance:.3g})")
+    return max_diff
+
+def optimize_for_inference(model, batch_buckets, tolerance, jit_compile=False, verification_inputs=None):
+    """
+    Build, verify and warm up the compiled inference version of a model
+
+    Args:
+        model (tf.keras.Model): Trained model
+        batch_buckets (tuple): Batch sizes to trace graphs for
+        tolerance (float): Largest allowed absolute output difference
+        jit_compile (bool): Compile the graphs with XLA
+        verification_inputs (numpy.ndarray, optional): Inputs to verify on.
+            Defaults to random inputs in the normalized [0, 1] range
+
+    Returns:
+        CompiledModel: Verified model exposing predict()
+    """
+    compiled = CompiledModel(build_inference_model(model), batch_buckets, jit_compile=jit_compile)
+    if verification_inputs is None:
+        rng = np.random.RandomState(0)
+        verification_inputs = rng.rand(*((max(compiled.batch_buckets[0], 5),) + compiled.input_shape[1:])).astype(np.float32)
+
+    max_diff = verify_inference_model(model, compiled, verification_inputs, tolerance)
+    compiled.warm_up()
+    logger.info(f"Inference graph verified (max abs difference {max_diff:.2e}), buckets: {compiled.batch_buckets}")
+    return compiled
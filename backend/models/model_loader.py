@@ -1,88 +1,86 @@
-import tensorflow as tf
 import numpy as np
 import os
 import logging
-from tensorflow.keras import layers, models
-from tensorflow.keras.regularizers import l2
-from tensorflow.keras.saving import register_keras_serializable
-from backend.config import GENRES, TARGET_SHAPE
-from backend.utils.spectrogram_generator import prepare_spectrogram_for_model
+from backend.config import (
+    GENRES, TARGET_SHAPE, EARLY_EXIT_MIN_CHUNKS, EARLY_EXIT_STEP, EARLY_EXIT_TEST,
+    EARLY_EXIT_MARGIN, EARLY_EXIT_MAX_ENTROPY, INFERENCE_BACKEND, TFLITE_VARIANT, TFLITE_NUM_THREADS,
+    OPTIMIZE_INFERENCE_GRAPH, INFERENCE_BATCH_BUCKETS, INFERENCE_GRAPH_TOLERANCE, INFERENCE_JIT_COMPILE
+)
+from backend.utils.spectrogram_generator import (
+    prepare_audio_chunks_for_model, prepare_chunk_batch, compute_track_mel_power_if_enabled
+)
 from backend.utils.audio_processor import process_audio, create_audio_chunks
+from backend.utils.metrics import stage_timer, CHUNKS_EVALUATED
 
 logger = logging.getLogger(__name__)
 
-# Define custom layers for model loading
-@register_keras_serializable(package="Custom", name="FrequencyMasking")
-class FrequencyMasking(layers.Layer):
-    """Applies Frequency Masking augmentation."""
-    def __init__(self, freq_mask_param, name="frequency_masking", **kwargs):
-        super().__init__(name=name, **kwargs)
-        self.freq_mask_param = freq_mask_param
-
-    def call(self, inputs, training=None):
-        if training is None: training = False
-        def apply_augmentation():
-            n_mels = tf.shape(inputs)[1]
-            f = tf.random.uniform(shape=(), minval=0, maxval=self.freq_mask_param + 1, dtype=tf.int32)
-            def perform_mask():
-                f0 = tf.random.uniform(shape=(), minval=0, maxval=n_mels - f, dtype=tf.int32)
-                mask_value = 0.0
-                mask = tf.concat([tf.ones(shape=(1, f0, 1, 1), dtype=inputs.dtype),
-                                  tf.fill(dims=(1, f, 1, 1), value=mask_value),
-                                  tf.ones(shape=(1, n_mels - f0 - f, 1, 1), dtype=inputs.dtype)], axis=1)
-                batch_size = tf.shape(inputs)[0]
-                mask_repeated = tf.tile(mask, [batch_size, 1, tf.shape(inputs)[2], 1])
-                return inputs * mask_repeated
-            return tf.cond(tf.greater(f, 0), true_fn=perform_mask, false_fn=lambda: inputs)
-        return tf.cond(tf.cast(training, tf.bool), true_fn=apply_augmentation, false_fn=lambda: inputs)
-
-    def get_config(self):
-        config = super().get_config()
-        config.update({"freq_mask_param": self.freq_mask_param})
-        return config
-
-@register_keras_serializable(package="Custom", name="TimeMasking")
-class TimeMasking(layers.Layer):
-    """Applies Time Masking augmentation."""
-    def __init__(self, time_mask_param, name="time_masking", **kwargs):
-        super().__init__(name=name, **kwargs)
-        self.time_mask_param = time_mask_param
-
-    def call(self, inputs, training=None):
-        if training is None: training = False
-        def apply_augmentation():
-            time_steps = tf.shape(inputs)[2]
-            t = tf.random.uniform(shape=(), minval=0, maxval=self.time_mask_param + 1, dtype=tf.int32)
-            def perform_mask():
-                t0 = tf.random.uniform(shape=(), minval=0, maxval=time_steps - t, dtype=tf.int32)
-                mask_value = 0.0
-                mask = tf.concat([tf.ones(shape=(1, 1, t0, 1), dtype=inputs.dtype),
-                                  tf.fill(dims=(1, 1, t, 1), value=mask_value),
-                                  tf.ones(shape=(1, 1, time_steps - t0 - t, 1), dtype=inputs.dtype)], axis=2)
-                batch_size = tf.shape(inputs)[0]
-                mask_repeated = tf.tile(mask, [batch_size, tf.shape(inputs)[1], 1, 1])
-                return inputs * mask_repeated
-            return tf.cond(tf.greater(t, 0), true_fn=perform_mask, false_fn=lambda: inputs)
-        return tf.cond(tf.cast(training, tf.bool), true_fn=apply_augmentation, false_fn=lambda: inputs)
-
-    def get_config(self):
-        config = super().get_config()
-        config.update({"time_mask_param": self.time_mask_param})
-        return config
-
-def load_model(model_path):
+def serving_model_path(model_path, backend=INFERENCE_BACKEND):
+    """
+    Path of the model file that load_model() serves for a backend
+
+    Args:
+        model_path (str): Path to the saved Keras model
+        backend (str): 'keras' or 'tflite'
+
+    Returns:
+        str: model_path, or the converted TFLITE_VARIANT next to it
+    """
+    if backend == 'tflite':
+        from backend.models.tflite_backend import tflite_model_path
+        return tflite_model_path(model_path, TFLITE_VARIANT)
+    return model_path
+
+def optimize_model_for_serving(model):
+    """
+    Replace a Keras model with its verified inference graph
+
+    Falls back to the model as loaded if the graph cannot be built or does
+    not match it numerically.
+
+    Args:
+        model (tf.keras.Model): Loaded model
+
+    Returns:
+        CompiledModel or tf.keras.Model: Model to serve
+    """
+    try:
+        from backend.models.inference_graph import optimize_for_inference
+        return optimize_for_inference(
+            model, INFERENCE_BATCH_BUCKETS, INFERENCE_GRAPH_TOLERANCE, jit_compile=INFERENCE_JIT_COMPILE
+        )
+    except Exception as e:
+        logger.error(f"Inference graph optimization failed, serving the model as loaded: {e}")
+        return model
+
+def load_model(model_path, backend=INFERENCE_BACKEND, optimize=OPTIMIZE_INFERENCE_GRAPH):
     """
     Load the trained model from disk
 
     Args:
         model_path (str): Path to the saved model
+        backend (str): 'keras' to load the Keras model, or 'tflite' to serve
+            the TFLITE_VARIANT conversion of it through the TFLite interpreter
+        optimize (bool): For the 'keras' backend, serve the verified
+            inference graph from optimize_model_for_serving()
 
     Returns:
-        tf.keras.Model: Loaded model
+        tf.keras.Model: Loaded model (a CompiledModel or TFLiteModel with the
+        same predict() interface when optimized or for the 'tflite' backend)
     """
+    if backend == 'tflite':
+        from backend.models.tflite_backend import load_tflite_model
+        return load_tflite_model(serving_model_path(model_path, backend), num_threads=TFLITE_NUM_THREADS)
+    if backend != 'keras':
+        raise ValueError(f"Unknown inference backend: {backend} (expected 'keras' or 'tflite')")
+
     logger.info(f"Loading model from: {model_path}")
 
     try:
+        # TensorFlow is imported here rather than at module level so that
+        # importing the backend stays fast; the model is loaded in the background
+        import tensorflow as tf
+        from backend.models.architecture import FrequencyMasking, TimeMasking, create_placeholder_model
+
         # Check if model exists
         if not os.path.exists(model_path):
             logger.warning(f"Model file not found: {model_path}")
@@ -96,7 +94,7 @@ def load_model(model_path):
             model.save(model_path)
 
             logger.info(f"Placeholder model saved to: {model_path}")
-            return model
+            return optimize_model_for_serving(model) if optimize else model
 
         # Load the model with custom objects for the augmentation layers
         custom_objects = {
@@ -106,10 +104,11 @@ def load_model(model_path):
         model = tf.keras.models.load_model(model_path, custom_objects=custom_objects)
         logger.info(f"Model loaded successfully: {model_path}")
 
-        # Log model summary and output layer shape
-        model_summary = []
-        model.summary(print_fn=lambda x: model_summary.append(x))
-        logger.info("\n".join(model_summary))
+        # The full summary is only worth building when debugging
+        if logger.isEnabledFor(logging.DEBUG):
+            model_summary = []
+            model.summary(print_fn=lambda x: model_summary.append(x))
+            logger.debug("\n".join(model_summary))
 
         # Check output layer
         output_layer = model.layers[-1]
@@ -119,133 +118,102 @@ def load_model(model_path):
         if output_layer.units != len(GENRES):
             logger.warning(f"Model output units ({output_layer.units}) doesn't match number of genres ({len(GENRES)})")
 
-        # Test model with random input
-        test_model_with_random_input(model)
-
-        return model
+        return optimize_model_for_serving(model) if optimize else model
 
     except Exception as e:
         logger.error(f"Error loading model: {e}")
         raise Exception(f"Error loading model: {e}")
 
-def test_model_with_random_input(model):
+def average_chunk_predictions(chunk_indices, batch_predictions):
     """
-    Test the model with random input to verify it's working correctly
+    Average per-chunk model outputs into a track-level prediction
+
+    Chunks whose output is not finite are skipped.
 
     Args:
-        model (tf.keras.Model): The loaded model to test
+        chunk_indices (list): Index of the chunk behind each prediction row
+        batch_predictions (numpy.ndarray): Model outputs, one row per chunk
+
+    Returns:
+        tuple: (predicted_genre, confidence_scores)
     """
-    try:
-        # Create random input with the expected shape
-        input_shape = model.input_shape
-        random_input = np.random.random((1, input_shape[1], input_shape[2], input_shape[3]))
-
-        # Make prediction
-        logger.info("Testing model with random input...")
-        prediction = model.predict(random_input, verbose=0)[0]
-
-        # Log prediction results
-        logger.info(f"Random input prediction: {prediction}")
-        logger.info(f"Prediction values: {', '.join([f'{genre}: {score:.4f}' for genre, score in zip(GENRES, prediction)])}")
-        predicted_index = np.argmax(prediction)
-        logger.info(f"Predicted genre from random input: {GENRES[predicted_index]} (index {predicted_index}) with confidence: {prediction[predicted_index]:.4f}")
-
-        # Check if all predictions are the same or very similar
-        if np.std(prediction) < 0.01:
-            logger.warning("All prediction values are very similar, model might not be discriminating between classes")
-
-        # Check if one class is dominating predictions
-        if prediction[predicted_index] > 0.9:
-            logger.warning(f"One class ({GENRES[predicted_index]}) is dominating predictions with very high confidence")
-            logger.warning(f"This indicates a potential issue with the model - it may be biased toward one class")
-
-            # Test with a different random input to confirm bias
-            logger.info("Testing with a second random input to confirm bias...")
-            random_input2 = np.random.random((1, input_shape[1], input_shape[2], input_shape[3]))
-            prediction2 = model.predict(random_input2, verbose=0)[0]
-            predicted_index2 = np.argmax(prediction2)
-            logger.info(f"Second random input prediction: {GENRES[predicted_index2]} with confidence: {prediction2[predicted_index2]:.4f}")
-
-            if predicted_index == predicted_index2 and prediction2[predicted_index2] > 0.9:
-                logger.error(f"MODEL BIAS CONFIRMED: Model consistently predicts {GENRES[predicted_index]} with high confidence")
-                logger.error(f"This model may need to be retrained with better class balancing")
+    all_predictions = []
+    for i, chunk_prediction in zip(chunk_indices, batch_predictions):
+        logger.info(f"Prediction for chunk {i+1} complete. Raw prediction: {chunk_prediction}")
+        logger.info(f"Prediction values: {', '.join([f'{genre}: {score:.4f}' for genre, score in zip(GENRES, chunk_prediction)])}")
 
-    except Exception as e:
-        logger.error(f"Error testing model with random input: {e}")
-        import traceback
-        logger.error(traceback.format_exc())
+        # Skip chunks whose output is not a valid distribution
+        if not np.all(np.isfinite(chunk_prediction)):
+            logger.error(f"Error processing chunk {i+1}: prediction contains non-finite values")
+            continue
+
+        # Check if prediction is heavily biased toward one class
+        max_prob = np.max(chunk_prediction)
+        if max_prob > 0.9:
+            logger.warning(f"Chunk {i+1} prediction is heavily biased toward {GENRES[np.argmax(chunk_prediction)]} with probability {max_prob:.4f}")
+
+        # Check if prediction is uniform (model not discriminating)
+        if np.std(chunk_prediction) < 0.05:
+            logger.warning(f"Chunk {i+1} prediction has low standard deviation ({np.std(chunk_prediction):.4f}), model may not be discriminating between classes")
+
+        all_predictions.append(chunk_prediction)
 
-def create_placeholder_model():
+    if not all_predictions:
+        logger.error("No valid predictions could be made from any chunks")
+        raise ValueError("No valid predictions could be made from any chunks")
+
+    # Average predictions across all chunks
+    avg_prediction = np.mean(all_predictions, axis=0)
+    logger.info(f"Averaged predictions across {len(all_predictions)} chunks")
+    logger.info(f"Average prediction values: {', '.join([f'{genre}: {score:.4f}' for genre, score in zip(GENRES, avg_prediction)])}")
+
+    # Check if predictions are heavily biased toward one class
+    max_prob = np.max(avg_prediction)
+    predicted_index = np.argmax(avg_prediction)  # Get predicted index first
+
+    if max_prob > 0.95:
+        logger.warning(f"Prediction is heavily biased toward one class with probability {max_prob:.4f}")
+        logger.warning(f"This indicates a potential issue with the model or preprocessing")
+
+        # Log the issue but don't modify the predictions
+        if max_prob > 0.99:
+            logger.warning(f"Model is showing extreme bias toward {GENRES[predicted_index]}")
+            logger.warning(f"This may indicate a preprocessing mismatch between training and inference")
+
+    # Get predicted genre and confidence
+    # predicted_index already calculated above
+    predicted_genre = GENRES[predicted_index]
+    logger.info(f"Predicted index: {predicted_index}, genre: {predicted_genre}")
+
+    # Get confidence scores for all genres
+    confidence_scores = {genre: float(score) for genre, score in zip(GENRES, avg_prediction)}
+
+    logger.info(f"Prediction complete. Predicted genre: {predicted_genre} with confidence: {avg_prediction[predicted_index]:.4f}")
+    return predicted_genre, confidence_scores
+
+def predict_chunks(model, batch_input):
     """
-    Create a placeholder model for development that matches the architecture of the trained model
+    Run a batch of chunk inputs through the model and count them
+
+    The forward pass is timed as the 'inference' stage unless the model
+    times it itself (InferenceDispatcher does, leaving out the queue wait).
+
+    Args:
+        model: The model, or an InferenceDispatcher wrapping it
+        batch_input (numpy.ndarray): Model inputs of shape (N, H, W, 1)
 
     Returns:
-        tf.keras.Model: Placeholder model
+        numpy.ndarray: Model outputs, one row per chunk
     """
-    # Define input shape (mel spectrogram dimensions)
-    input_shape = (TARGET_SHAPE[0], TARGET_SHAPE[1], 1)  # (height, width, channels)
-
-    # Create a model with the same architecture as the trained model
-    model = models.Sequential(name="Refined_CNN_Genre_Classifier")
-    model.add(layers.Input(shape=input_shape, name="Input_Spectrogram"))
-
-    # Augmentation layers
-    model.add(FrequencyMasking(25, name="FreqMask"))
-    model.add(TimeMasking(30, name="TimeMask"))
-
-    # Block 1
-    model.add(layers.Conv2D(32, (3, 3), padding='same', kernel_regularizer=l2(0.001), name="Conv1_1"))
-    model.add(layers.BatchNormalization(name="BN1_1"))
-    model.add(layers.Activation('relu', name="Relu1_1"))
-    model.add(layers.Conv2D(32, (3, 3), padding='same', kernel_regularizer=l2(0.001), name="Conv1_2"))
-    model.add(layers.BatchNormalization(name="BN1_2"))
-    model.add(layers.Activation('relu', name="Relu1_2"))
-    model.add(layers.MaxPooling2D((2, 2), strides=(2, 2), name="Pool1"))
-    model.add(layers.Dropout(0.25, name="Drop1"))
-
-    # Block 2
-    model.add(layers.Conv2D(64, (3, 3), padding='same', kernel_regularizer=l2(0.001), name="Conv2_1"))
-    model.add(layers.BatchNormalization(name="BN2_1"))
-    model.add(layers.Activation('relu', name="Relu2_1"))
-    model.add(layers.Conv2D(64, (3, 3), padding='same', kernel_regularizer=l2(0.001), name="Conv2_2"))
-    model.add(layers.BatchNormalization(name="BN2_2"))
-    model.add(layers.Activation('relu', name="Relu2_2"))
-    model.add(layers.MaxPooling2D((2, 2), strides=(2, 2), name="Pool2"))
-    model.add(layers.Dropout(0.25, name="Drop2"))
-
-    # Block 3
-    model.add(layers.Conv2D(128, (3, 3), padding='same', kernel_regularizer=l2(0.001), name="Conv3_1"))
-    model.add(layers.BatchNormalization(name="BN3_1"))
-    model.add(layers.Activation('relu', name="Relu3_1"))
-    model.add(layers.Conv2D(128, (3, 3), padding='same', kernel_regularizer=l2(0.001), name="Conv3_2"))
-    model.add(layers.BatchNormalization(name="BN3_2"))
-    model.add(layers.Activation('relu', name="Relu3_2"))
-    model.add(layers.MaxPooling2D((2, 2), strides=(2, 2), name="Pool3"))
-    model.add(layers.Dropout(0.3, name="Drop3"))
-
-    # Block 4
-    model.add(layers.Conv2D(256, (3, 3), padding='same', kernel_regularizer=l2(0.001), name="Conv4_1"))
-    model.add(layers.BatchNormalization(name="BN4_1"))
-    model.add(layers.Activation('relu', name="Relu4_1"))
-    model.add(layers.MaxPooling2D((2, 2), strides=(2, 2), name="Pool4"))
-    model.add(layers.Dropout(0.3, name="Drop4"))
-
-    # Classification Head
-    model.add(layers.GlobalAveragePooling2D(name="GAP"))
-    model.add(layers.Dense(128, activation='relu', kernel_regularizer=l2(0.001), name="Dense1"))
-    model.add(layers.Dropout(0.5, name="Drop_Dense"))
-    model.add(layers.Dense(len(GENRES), activation='softmax', name="Output_Softmax"))
-
-    # Compile the model
-    model.compile(
-        optimizer=tf.keras.optimizers.Adam(learning_rate=1e-4),
-        loss='categorical_crossentropy',
-        metrics=['accuracy']
-    )
-
-    return model
-
-def predict_genre(model, spectrogram_path=None, audio_data=None):
+    if getattr(model, 'records_inference_metrics', False):
+        batch_predictions = model.predict(batch_input, batch_size=len(batch_input), verbose=0)
+    else:
+        with stage_timer('inference'):
+            batch_predictions = model.predict(batch_input, batch_size=len(batch_input), verbose=0)
+    CHUNKS_EVALUATED.inc(len(batch_input))
+    return batch_predictions
+
+def predict_genre(model, spectrogram_path=None, audio_data=None, track_mel_power=None):
     """
     Predict genre from spectrogram or audio data
 
@@ -253,6 +221,8 @@ def predict_genre(model, spectrogram_path=None, audio_data=None):
         model (tf.keras.Model): Loaded model
         spectrogram_path (str, optional): Path to the spectrogram image
         audio_data (numpy.ndarray, optional): Processed audio signal
+        track_mel_power (numpy.ndarray, optional): Already computed
+            compute_track_mel_power(audio_data), reused in track-level mode
 
     Returns:
         tuple: (predicted_genre, confidence_scores)
@@ -298,73 +268,16 @@ def predict_genre(model, spectrogram_path=None, audio_data=None):
                 logger.error("No valid audio chunks could be created")
                 raise ValueError("No valid audio chunks could be created")
 
-            # Process each chunk and get predictions
-            all_predictions = []
-            for i, chunk in enumerate(chunks):
-                logger.info(f"Processing chunk {i+1}/{len(chunks)}. Chunk length: {len(chunk)}")
-                logger.info(f"Chunk {i+1} stats - min: {np.min(chunk):.4f}, max: {np.max(chunk):.4f}, mean: {np.mean(chunk):.4f}")
-
-                try:
-                    # Prepare spectrogram for model input
-                    chunk_input = prepare_spectrogram_for_model(chunk)
-                    logger.info(f"Prepared spectrogram for chunk {i+1}. Shape: {chunk_input.shape}")
-                    logger.info(f"Model input stats - min: {np.min(chunk_input):.4f}, max: {np.max(chunk_input):.4f}, mean: {np.mean(chunk_input):.4f}")
-
-                    # Make prediction
-                    logger.info(f"Making prediction for chunk {i+1}")
-                    chunk_prediction = model.predict(chunk_input, verbose=0)[0]
-                    logger.info(f"Prediction for chunk {i+1} complete. Raw prediction: {chunk_prediction}")
-                    logger.info(f"Prediction values: {', '.join([f'{genre}: {score:.4f}' for genre, score in zip(GENRES, chunk_prediction)])}")
-
-                    # Check if prediction is heavily biased toward one class
-                    max_prob = np.max(chunk_prediction)
-                    if max_prob > 0.9:
-                        logger.warning(f"Chunk {i+1} prediction is heavily biased toward {GENRES[np.argmax(chunk_prediction)]} with probability {max_prob:.4f}")
-
-                    # Check if prediction is uniform (model not discriminating)
-                    if np.std(chunk_prediction) < 0.05:
-                        logger.warning(f"Chunk {i+1} prediction has low standard deviation ({np.std(chunk_prediction):.4f}), model may not be discriminating between classes")
-
-                    all_predictions.append(chunk_prediction)
-                except Exception as chunk_error:
-                    logger.error(f"Error processing chunk {i+1}: {chunk_error}")
-                    import traceback
-                    logger.error(traceback.format_exc())
-                    # Continue with other chunks instead of failing completely
-                    continue
-
-            if not all_predictions:
-                logger.error("No valid predictions could be made from any chunks")
-                raise ValueError("No valid predictions could be made from any chunks")
-
-            # Average predictions across all chunks
-            avg_prediction = np.mean(all_predictions, axis=0)
-            logger.info(f"Averaged predictions across {len(all_predictions)} chunks")
-            logger.info(f"Average prediction values: {', '.join([f'{genre}: {score:.4f}' for genre, score in zip(GENRES, avg_prediction)])}")
-
-            # Check if predictions are heavily biased toward one class
-            max_prob = np.max(avg_prediction)
-            predicted_index = np.argmax(avg_prediction)  # Get predicted index first
-
-            if max_prob > 0.95:
-                logger.warning(f"Prediction is heavily biased toward one class with probability {max_prob:.4f}")
-                logger.warning(f"This indicates a potential issue with the model or preprocessing")
-
-                # Log the issue but don't modify the predictions
-                if max_prob > 0.99:
-                    logger.warning(f"Model is showing extreme bias toward {GENRES[predicted_index]}")
-                    logger.warning(f"This may indicate a preprocessing mismatch between training and inference")
+            # Prepare every chunk first so a bad chunk can be skipped without
+            # losing the others, then run all of them in a single forward pass
+            batch_input, chunk_indices = prepare_audio_chunks_for_model(audio_data, chunks, track_mel_power)
 
-            # Get predicted genre and confidence
-            # predicted_index already calculated above
-            predicted_genre = GENRES[predicted_index]
-            logger.info(f"Predicted index: {predicted_index}, genre: {predicted_genre}")
-
-            # Get confidence scores for all genres
-            confidence_scores = {genre: float(score) for genre, score in zip(GENRES, avg_prediction)}
+            batch_predictions = []
+            if chunk_indices:
+                logger.info(f"Making batched prediction for {len(chunk_indices)} chunks. Batch shape: {batch_input.shape}")
+                batch_predictions = predict_chunks(model, batch_input)
 
-            logger.info(f"Prediction complete. Predicted genre: {predicted_genre} with confidence: {avg_prediction[predicted_index]:.4f}")
-            return predicted_genre, confidence_scores
+            return average_chunk_predictions(chunk_indices, batch_predictions)
 
         else:
             logger.error("Neither spectrogram_path nor audio_data was provided")
@@ -375,3 +288,158 @@ def predict_genre(model, spectrogram_path=None, audio_data=None):
         import traceback
         logger.error(traceback.format_exc())
         raise Exception(f"Error predicting genre: {e}")
+
+def spread_chunk_order(num_chunks):
+    """
+    Order chunk indices so that every prefix of the order is spread across
+    the track: the middle chunk first, then repeatedly the chunk farthest
+    from all chunks already chosen
+
+    Args:
+        num_chunks (int): Number of chunks in the track
+
+    Returns:
+        list: Chunk indices in evaluation order
+    """
+    if num_chunks <= 0:
+        return []
+
+    order = [num_chunks // 2]
+    remaining = [i for i in range(num_chunks) if i != order[0]]
+    while remaining:
+        farthest = max(remaining, key=lambda i: min(abs(i - j) for j in order))
+        order.append(farthest)
+        remaining.remove(farthest)
+    return order
+
+def is_prediction_stable(avg_prediction, previous_index, test=EARLY_EXIT_TEST,
+                         margin=EARLY_EXIT_MARGIN, max_entropy=EARLY_EXIT_MAX_ENTROPY):
+    """
+    Decide whether a running average of chunk predictions has settled
+
+    The predicted genre must be unchanged since the previous check, and the
+    average must pass either the margin test (top-1 minus top-2 probability
+    of at least margin) or the entropy test (entropy in nats of at most
+    max_entropy).
+
+    Args:
+        avg_prediction (numpy.ndarray): Running average of chunk predictions
+        previous_index (int): Predicted index at the previous check, or None
+        test (str): 'margin' or 'entropy'
+
+    Returns:
+        bool: True if evaluation can stop
+    """
+    predicted_index = int(np.argmax(avg_prediction))
+    if predicted_index != previous_index:
+        return False
+
+    if test == 'entropy':
+        probabilities = np.clip(avg_prediction, 1e-12, 1.0)
+        return float(-np.sum(probabilities * np.log(probabilities))) <= max_entropy
+
+    top_two = np.sort(avg_prediction)[-2:]
+    return float(top_two[1] - top_two[0]) >= margin
+
+def evaluate_chunks_adaptive(model, num_chunks, prepare_round, min_chunks=EARLY_EXIT_MIN_CHUNKS,
+                             step=EARLY_EXIT_STEP):
+    """
+    Run chunks through the model in rounds until the chunk average is stable
+
+    Chunks are evaluated in spread_chunk_order(), step chunks per forward
+    pass. After at least min_chunks have been evaluated, evaluation stops as
+    soon as is_prediction_stable() holds; ambiguous tracks fall through to
+    every chunk.
+
+    Args:
+        model: The model, or an InferenceDispatcher wrapping it
+        num_chunks (int): Number of chunks in the track
+        prepare_round (callable): prepare_round(indices) -> (batch_input,
+            chunk_indices) for the given chunk indices, skipping bad chunks
+        min_chunks (int): Chunks to evaluate before the first stability check
+        step (int): Chunks per forward pass
+
+    Returns:
+        tuple: (used_indices, used_predictions, early_exit)
+    """
+    order = spread_chunk_order(num_chunks)
+    used_indices = []
+    used_predictions = []
+    previous_index = None
+    early_exit = False
+    position = 0
+    while position < len(order):
+        # Take enough chunks to reach min_chunks on the first pass
+        take = max(step, min_chunks - position) if position < min_chunks else step
+        round_indices = order[position:position + take]
+        position += len(round_indices)
+
+        batch_input, chunk_indices = prepare_round(round_indices)
+        if chunk_indices:
+            batch_predictions = predict_chunks(model, batch_input)
+            for i, chunk_prediction in zip(chunk_indices, batch_predictions):
+                if np.all(np.isfinite(chunk_prediction)):
+                    used_indices.append(i)
+                    used_predictions.append(chunk_prediction)
+
+        if position < min_chunks or not used_predictions:
+            continue
+
+        avg_prediction = np.mean(used_predictions, axis=0)
+        if position < len(order) and is_prediction_stable(avg_prediction, previous_index):
+            early_exit = True
+            break
+        previous_index = int(np.argmax(avg_prediction))
+
+    return used_indices, used_predictions, early_exit
+
+def predict_genre_adaptive(model, audio_data, min_chunks=EARLY_EXIT_MIN_CHUNKS, step=EARLY_EXIT_STEP,
+                           track_mel_power=None):
+    """
+    Predict genre from audio data, stopping early once the chunk average is stable
+
+    Chunks are prepared and evaluated round by round through
+    evaluate_chunks_adaptive(); ambiguous tracks fall through to every
+    chunk, which gives the same result as predict_genre().
+
+    Args:
+        model (tf.keras.Model): Loaded model (or anything with predict())
+        audio_data (numpy.ndarray): Processed audio signal
+        min_chunks (int): Chunks to evaluate before the first stability check
+        step (int): Chunks per forward pass
+        track_mel_power (numpy.ndarray, optional): Already computed
+            compute_track_mel_power(audio_data), reused in track-level mode
+
+    Returns:
+        tuple: (predicted_genre, confidence_scores, details) where details
+        holds 'chunks_used', 'chunks_total' and 'early_exit'
+    """
+    try:
+        chunks = create_audio_chunks(audio_data)
+        if not chunks:
+            logger.error("No valid audio chunks could be created")
+            raise ValueError("No valid audio chunks could be created")
+
+        track_mel_power = compute_track_mel_power_if_enabled(audio_data, track_mel_power)
+
+        def prepare_round(round_indices):
+            return prepare_chunk_batch([chunks[i] for i in round_indices], track_mel_power, indices=round_indices)
+
+        used_indices, used_predictions, early_exit = evaluate_chunks_adaptive(
+            model, len(chunks), prepare_round, min_chunks=min_chunks, step=step
+        )
+
+        logger.info(f"Adaptive evaluation used {len(used_indices)} of {len(chunks)} chunks (early exit: {early_exit})")
+        predicted_genre, confidence_scores = average_chunk_predictions(used_indices, used_predictions)
+        details = {
+            'chunks_used': len(used_indices),
+            'chunks_total': len(chunks),
+            'early_exit': early_exit
+        }
+        return predicted_genre, confidence_scores, details
+
+    except Exception as e:
+        logger.error(f"Error predicting genre: {e}")
+        import traceback
+        logger.error(traceback.format_exc())
+        raise Exception(f"Error predicting genre: {e}")
@@ -0,0 +1,171 @@
+import os
+import logging
+import threading
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+# Conversion variants produced by convert_to_tflite():
+#   float32  plain conversion, same numerics as Keras
+#   float16  float16 weights, computed in float32 (half the file size)
+#   dynamic  int8 weights, activations quantized on the fly
+#   int8     full integer: int8 weights, activations, input and output,
+#            calibrated on representative model inputs
+TFLITE_VARIANTS = ('float32', 'float16', 'dynamic', 'int8')
+
+def tflite_model_path(model_path, variant):
+    """
+    Path of a converted variant next to the Keras model
+
+    Args:
+        model_path (str): Path to the .keras model
+        variant (str): One of TFLITE_VARIANTS
+
+    Returns:
+        str: <model stem>_<variant>.tflite in the model directory
+    """
+    return f"{os.path.splitext(model_path)[0]}_{variant}.tflite"
+
+def convert_to_tflite(keras_model, variant, representative_inputs=None):
+    """
+    Convert a Keras model to a TFLite flatbuffer
+
+    Args:
+        keras_model (tf.keras.Model): Model to convert
+        variant (str): One of TFLITE_VARIANTS
+        representative_inputs (numpy.ndarray, optional): Model inputs of shape
+            (N, H, W, 1) used to calibrate activation ranges; required for
+            'int8'
+
+    Returns:
+        bytes: Serialized TFLite model
+    """
+    import tensorflow as tf
+
+    if variant not in TFLITE_VARIANTS:
+        raise ValueError(f"Unknown TFLite variant: {variant} (expected one of {', '.join(TFLITE_VARIANTS)})")
+
+    converter = tf.lite.TFLiteConverter.from_keras_model(keras_model)
+    if variant == 'float16':
+        converter.optimizations = [tf.lite.Optimize.DEFAULT]
+        converter.target_spec.supported_types = [tf.float16]
+    elif variant == 'dynamic':
+        converter.optimizations = [tf.lite.Optimize.DEFAULT]
+    elif variant == 'int8':
+        if representative_inputs is None or len(representative_inputs) == 0:
+            raise ValueError("Full int8 conversion needs representative inputs for calibration")
+
+        def representative_dataset():
+            for row in representative_inputs:
+                yield [np.asarray(row[np.newaxis], dtype=np.float32)]
+
+        converter.optimizations = [tf.lite.Optimize.DEFAULT]
+        converter.representative_dataset = representative_dataset
+        converter.target_spec.supported_ops = [tf.lite.OpsSet.TFLITE_BUILTINS_INT8]
+        converter.inference_input_type = tf.int8
+        converter.inference_output_type = tf.int8
+
+    return converter.convert()
+
+def _interpreter_class():
+    """The standalone LiteRT interpreter if installed, else TensorFlow's."""
+    try:
+        from ai_edge_litert.interpreter import Interpreter
+    except ImportError:
+        import tensorflow as tf
+        Interpreter = tf.lite.Interpreter
+    return Interpreter
+
+class TFLiteModel:
+    """
+    Runs a converted model through the TFLite interpreter behind the subset
+    of the tf.keras.Model interface the backend uses
+
+    predict() takes and returns float32 arrays like Model.predict; inputs
+    and outputs of integer-quantized models are (de)quantized here. The
+    interpreter is resized to the batch size of each call and is not
+    thread-safe, so calls are serialized.
+    """
+    def __init__(self, model_path=None, model_content=None, num_threads=None):
+        Interpreter = _interpreter_class()
+        self.model_path = model_path
+        self._interpreter = Interpreter(model_path=model_path, model_content=model_content, num_threads=num_threads)
+        self._interpreter.allocate_tensors()
+        self._input = self._interpreter.get_input_details()[0]
+        self._output = self._interpreter.get_output_details()[0]
+        self._batch_size = int(self._input['shape'][0])
+        self._lock = threading.Lock()
+
+    @property
+    def input_shape(self):
+        return (None,) + tuple(int(d) for d in self._input['shape'][1:])
+
+    @property
+    def output_shape(self):
+        return (None,) + tuple(int(d) for d in self._output['shape'][1:])
+
+    @property
+    def input_dtype(self):
+        return np.dtype(self._input['dtype'])
+
+    def _resize(self, batch_size):
+        if batch_size != self._batch_size:
+            self._interpreter.resize_tensor_input(self._input['index'], [batch_size] + list(self.input_shape[1:]))
+            self._interpreter.allocate_tensors()
+            self._input = self._interpreter.get_input_details()[0]
+            self._output = self._interpreter.get_output_details()[0]
+            self._batch_size = batch_size
+
+    def predict(self, inputs, batch_size=None, verbose=0):
+        """
+        Run the model on a batch of inputs
+
+        Args:
+            inputs (numpy.ndarray): Model inputs of shape (N, H, W, 1)
+            batch_size: Ignored; the whole batch runs in one invocation
+            verbose: Ignored; accepted for compatibility with Model.predict
+
+        Returns:
+            numpy.ndarray: float32 outputs of shape (N, num_classes)
+        """
+        inputs = np.asarray(inputs, dtype=np.float32)
+        with self._lock:
+            self._resize(len(inputs))
+
+            input_scale, input_zero_point = self._input['quantization']
+            if np.issubdtype(self.input_dtype, np.integer) and input_scale:
+                info = np.iinfo(self.input_dtype)
+                inputs = np.clip(np.round(inputs / input_scale + input_zero_point), info.min, info.max)
+            self._interpreter.set_tensor(self._input['index'], inputs.astype(self.input_dtype))
+            self._interpreter.invoke()
+            outputs = self._interpreter.get_tensor(self._output['index'])
+
+            output_scale, output_zero_point = self._output['quantization']
+            if np.issubdtype(outputs.dtype, np.integer) and output_scale:
+                outputs = (outputs.astype(np.float32) - output_zero_point) * output_scale
+        return outputs.astype(np.float32)
+
+def load_tflite_model(model_path, num_threads=None):
+    """
+    Load a converted model for serving
+
+    Args:
+        model_path (str): Path to a .tflite file from scripts/convert_tflite.py
+        num_threads (int, optional): Interpreter threads
+
+    Returns:
+        TFLiteModel: Model exposing predict(), input_shape and output_shape
+    """
+    logger.info(f"Loading TFLite model from: {model_path}")
+
+    try:
+        if not os.path.exists(model_path):
+            raise FileNotFoundError(f"TFLite model not found: {model_path}. Run scripts/convert_tflite.py first")
+
+        model = TFLiteModel(model_path=model_path, num_threads=num_threads)
+        logger.info(f"TFLite model loaded successfully: {model_path} (input {model.input_dtype.name}, shape {model.input_shape})")
+        return model
+
+    except Exception as e:
+        logger.error(f"Error loading TFLite model: {e}")
+        raise Exception(f"Error loading TFLite model: {e}")
@@ -0,0 +1,206 @@
+import os
+import hashlib
+import logging
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from backend.config import SAMPLE_RATE
+from backend.utils.prediction_cache import HASH_BLOCK_SIZE
+
+logger = logging.getLogger(__name__)
+
+# Characters of the content hash used in versioned URLs (?v=...)
+URL_VERSION_LENGTH = 16
+
+def hash_file(file_path):
+    """
+    SHA-256 of a file's content, read in blocks
+
+    Args:
+        file_path (str): Path to the file
+
+    Returns:
+        str: SHA-256 hex digest
+    """
+    digest = hashlib.sha256()
+    with open(file_path, 'rb') as f:
+        while True:
+            block = f.read(HASH_BLOCK_SIZE)
+            if not block:
+                break
+            digest.update(block)
+    return digest.hexdigest()
+
+class ContentHashIndex:
+    """
+    Content hashes of served files, keyed by path
+
+    Entries are tagged with the file's size and mtime, so a file overwritten
+    by a later upload of the same name is hashed again instead of being
+    served under the old ETag. Hashes known at upload time are recorded
+    directly; others are computed on first request.
+    """
+    def __init__(self, max_entries=10000):
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _stat_key(file_path):
+        stat = os.stat(file_path)
+        return stat.st_size, stat.st_mtime_ns
+
+    def _store(self, file_path, stat_key, content_hash):
+        with self._lock:
+            self._entries[file_path] = (stat_key, content_hash)
+            self._entries.move_to_end(file_path)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def record(self, file_path, content_hash):
+        """
+        Remember the hash of a file that was just written
+
+        Args:
+            file_path (str): Path to the file
+            content_hash (str): SHA-256 hex digest of its content
+        """
+        self._store(file_path, self._stat_key(file_path), content_hash)
+
+    def get(self, file_path):
+        """
+        Content hash of a file, hashing it if it is new or has changed
+
+        Args:
+            file_path (str): Path to the file
+
+        Returns:
+            str: SHA-256 hex digest
+        """
+        stat_key = self._stat_key(file_path)
+        with self._lock:
+            entry = self._entries.get(file_path)
+            if entry is not None and entry[0] == stat_key:
+                self._entries.move_to_end(file_path)
+                return entry[1]
+
+        content_hash = hash_file(file_path)
+        self._store(file_path, stat_key, content_hash)
+        return content_hash
+
+def preview_filename(content_hash):
+    """
+    File name of the preview rendition of an upload
+
+    Previews are named by content, so identical uploads share one and a
+    re-uploaded file name never serves the previous content's preview.
+
+    Args:
+        content_hash (str): SHA-256 hex digest of the upload
+
+    Returns:
+        str: <hash>.mp3
+    """
+    return f"{content_hash}.mp3"
+
+def encode_preview(source_path, output_path, sample_rate=SAMPLE_RATE, compression_level=0.8):
+    """
+    Encode a low-bitrate mono MP3 rendition of a whole audio file
+
+    Args:
+        source_path (str): Uploaded wav or mp3 file
+        output_path (str): Destination .mp3 path, written atomically
+        sample_rate (int): Sample rate of the preview
+        compression_level (float): libsndfile MP3 compression level in
+            [0, 1) at a constant bitrate; 0.8 is about 40 kbps at 22050 Hz
+    """
+    # Heavy audio libraries are imported on first use to keep backend imports fast
+    import librosa
+    import soundfile as sf
+
+    audio, _ = librosa.load(source_path, sr=sample_rate, mono=True)
+    tmp_path = f"{output_path}.{os.getpid()}.{threading.get_ident()}.tmp"
+    try:
+        sf.write(tmp_path, audio, sample_rate, format='MP3', subtype='MPEG_LAYER_III',
+                 compression_level=compression_level, bitrate_mode='CONSTANT')
+        os.replace(tmp_path, output_path)
+    finally:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+
+class PreviewGenerator:
+    """
+    Encodes preview renditions of uploads on background threads
+
+    Requests for a preview that exists or is already being encoded are
+    ignored, so the same content is encoded at most once.
+    """
+    def __init__(self, preview_dir, workers=1, sample_rate=SAMPLE_RATE, compression_level=0.8):
+        self.preview_dir = preview_dir
+        self.sample_rate = sample_rate
+        self.compression_level = compression_level
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix='preview')
+        self._pending = {}
+        self._lock = threading.Lock()
+        os.makedirs(preview_dir, exist_ok=True)
+
+    def path(self, content_hash):
+        """
+        Path where the preview of an upload is (or will be) stored
+
+        Args:
+            content_hash (str): SHA-256 hex digest of the upload
+
+        Returns:
+            str: Path of the .mp3 preview
+        """
+        return os.path.join(self.preview_dir, preview_filename(content_hash))
+
+    def submit(self, source_path, content_hash):
+        """
+        Queue the preview of an upload unless it exists or is queued
+
+        Args:
+            source_path (str): Uploaded audio file
+            content_hash (str): SHA-256 hex digest of the upload
+
+        Returns:
+            concurrent.futures.Future: The encoding job, or None if the
+            preview already exists
+        """
+        output_path = self.path(content_hash)
+        with self._lock:
+            if content_hash in self._pending:
+                return self._pending[content_hash]
+            if os.path.exists(output_path):
+                return None
+            future = self._executor.submit(self._encode, source_path, output_path, content_hash)
+            self._pending[content_hash] = future
+            return future
+
+    def _encode(self, source_path, output_path, content_hash):
+        try:
+            encode_preview(source_path, output_path, self.sample_rate, self.compression_level)
+            logger.info(f"Preview written: {output_path}")
+        except Exception as e:
+            logger.error(f"Error encoding preview for {source_path}: {e}")
+            raise
+        finally:
+            with self._lock:
+                self._pending.pop(content_hash, None)
+
+    def is_ready(self, content_hash):
+        """
+        Whether the preview of an upload has been written
+
+        Args:
+            content_hash (str): SHA-256 hex digest of the upload
+
+        Returns:
+            bool: True if the preview file exists
+        """
+        return os.path.exists(self.path(content_hash))
+
+    def shutdown(self, wait=True):
+        """Stop the worker threads."""
+        self._executor.shutdown(wait=wait)
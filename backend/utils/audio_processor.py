@@ -1,29 +1,54 @@
-import librosa
+import io
 import numpy as np
 import os
 import logging
 from backend.config import SAMPLE_RATE, DURATION, MONO, CHUNK_DURATION_S, SAMPLES_PER_CHUNK, HOP_SAMPLES_BETWEEN_CHUNKS
+from backend.utils.metrics import timed_stage
 
 logger = logging.getLogger(__name__)
 
-def process_audio(file_path):
+@timed_stage('decode')
+def process_audio(file_path, offset=0.0, duration=DURATION):
     """
     Process audio file: load, resample, and trim if necessary
 
+    Only the requested window is decoded. librosa.load seeks to offset
+    through soundfile (wav, and mp3 with libsndfile >= 1.1) and stops reading
+    after duration seconds, so decode time and peak memory scale with the
+    window instead of the file length. Files soundfile cannot open fall back
+    to audioread, which still stops decoding at the end of the window.
+
+    file_path may also be a file-like object holding the encoded upload
+    (e.g. io.BytesIO), which soundfile decodes without touching the disk;
+    check such buffers with can_decode_in_memory() first, as the audioread
+    fallback needs a path.
+
     Args:
-        file_path (str): Path to the audio file
+        file_path (str or file-like): Path to the audio file, or the
+            encoded audio in a seekable binary stream
+        offset (float): Start of the window in seconds
+        duration (float): Length of the window in seconds, or None for the
+            rest of the file
 
     Returns:
         numpy.ndarray: Processed audio signal
     """
-    logger.info(f"Processing audio file: {file_path}")
+    source = file_path if isinstance(file_path, (str, os.PathLike)) else 'in-memory upload'
+    logger.info(f"Processing audio file: {source} (offset: {offset}s, duration: {duration}s)")
 
     try:
-        # Load audio file
-        y, sr = librosa.load(file_path, sr=SAMPLE_RATE, mono=MONO)
+        # librosa is imported on first use to keep backend imports fast
+        import librosa
+
+        # Load only the requested window of the audio file
+        y, sr = librosa.load(file_path, sr=SAMPLE_RATE, mono=MONO, offset=offset, duration=duration)
+
+        if duration is None:
+            logger.info(f"Audio processed successfully: {source}")
+            return y
 
         # Check duration and trim or pad if necessary
-        target_length = SAMPLE_RATE * DURATION
+        target_length = int(SAMPLE_RATE * duration)
 
         if len(y) > target_length:
             # Trim to target length
@@ -33,13 +58,31 @@ def process_audio(file_path):
             padding = target_length - len(y)
             y = np.pad(y, (0, padding), 'constant')
 
-        logger.info(f"Audio processed successfully: {file_path}")
+        logger.info(f"Audio processed successfully: {source}")
         return y
 
     except Exception as e:
         logger.error(f"Error processing audio file: {e}")
         raise Exception(f"Error processing audio file: {e}")
 
+def can_decode_in_memory(data):
+    """
+    Check whether soundfile can decode an upload straight from memory
+
+    Args:
+        data (bytes): Encoded audio file content
+
+    Returns:
+        bool: True if process_audio(io.BytesIO(data)) will not need a path
+    """
+    import soundfile as sf
+
+    try:
+        sf.info(io.BytesIO(data))
+        return True
+    except Exception:
+        return False
+
 def create_audio_chunks(audio_data, chunk_samples=SAMPLES_PER_CHUNK, hop_samples=HOP_SAMPLES_BETWEEN_CHUNKS):
     """
     Create overlapping chunks from audio data
@@ -90,6 +133,8 @@ def extract_features(audio_data):
     Returns:
         dict: Dictionary of extracted features
     """
+    import librosa
+
     features = {}
 
     # Extract MFCCs
@@ -0,0 +1,170 @@
+import os
+import logging
+import zipfile
+from concurrent.futures import as_completed
+from werkzeug.utils import secure_filename
+from backend.utils.prediction_cache import save_upload_with_hash
+
+logger = logging.getLogger(__name__)
+
+class BulkUploadRejected(Exception):
+    """Raised when a bulk upload as a whole exceeds the configured limits."""
+
+def _extension(filename):
+    return filename.rsplit('.', 1)[1].lower() if '.' in filename else ''
+
+def _unique_name(filename, taken):
+    """filename, or filename with a _<n> suffix if another item of the batch already has it"""
+    stem, ext = os.path.splitext(filename)
+    name, n = filename, 1
+    while name in taken:
+        name = f"{stem}_{n}{ext}"
+        n += 1
+    taken.add(name)
+    return name
+
+def _zip_members(archive, allowed_extensions):
+    """Audio members of a zip archive, skipping directories and macOS metadata."""
+    members = []
+    for info in archive.infolist():
+        basename = os.path.basename(info.filename)
+        if info.is_dir() or not basename or basename.startswith('._') or '__MACOSX' in info.filename:
+            continue
+        if _extension(basename) in allowed_extensions:
+            members.append((basename, info))
+    return members
+
+class _NoClose:
+    """Context manager handing out a stream that the caller closes."""
+    def __init__(self, stream):
+        self.stream = stream
+
+    def __enter__(self):
+        return self.stream
+
+    def __exit__(self, *exc_info):
+        return False
+
+def save_bulk_upload(parts, upload_dir, allowed_extensions, max_files=500, max_uncompressed_bytes=2 * 1024 ** 3):
+    """
+    Save the audio files of a bulk upload, expanding zip archives
+
+    Every file becomes one item. Items that cannot be saved carry an error
+    instead of failing the batch; names that repeat within the batch get a
+    numeric suffix so items do not overwrite each other.
+
+    Args:
+        parts (list): (filename, stream) pairs of the uploaded files
+        upload_dir (str): Folder to save into
+        allowed_extensions (set): Accepted audio extensions
+        max_files (int): Most audio files accepted in one upload
+        max_uncompressed_bytes (int): Most bytes zip archives may expand to
+
+    Returns:
+        list: One dict per item with index and filename, plus either path
+        and content_hash or error
+
+    Raises:
+        BulkUploadRejected: If the upload exceeds max_files or
+            max_uncompressed_bytes; the files saved before the limit was
+            reached are removed
+    """
+    items = []
+    taken = set()
+    expanded_bytes = 0
+
+    def add_item(original_name, open_stream):
+        if len(items) >= max_files:
+            raise BulkUploadRejected(f"Bulk upload has more than {max_files} files")
+        item = {'index': len(items), 'filename': original_name}
+        items.append(item)
+
+        filename = secure_filename(original_name)
+        if not filename or _extension(filename) not in allowed_extensions:
+            item['error'] = 'File type not allowed'
+            return
+        filename = _unique_name(filename, taken)
+        path = os.path.join(upload_dir, filename)
+        try:
+            with open_stream() as stream:
+                item['content_hash'] = save_upload_with_hash(stream, path)
+        except Exception as e:
+            logger.error(f"Error saving bulk upload item {original_name}: {e}")
+            item['error'] = f"Error saving file: {e}"
+            return
+        item['filename'] = filename
+        item['path'] = path
+
+    try:
+        for name, stream in parts:
+            if _extension(name or '') != 'zip':
+                add_item(name or '', lambda stream=stream: _NoClose(stream))
+                continue
+
+            try:
+                archive = zipfile.ZipFile(stream)
+            except zipfile.BadZipFile as e:
+                items.append({'index': len(items), 'filename': name, 'error': f"Invalid zip archive: {e}"})
+                continue
+
+            with archive:
+                members = _zip_members(archive, allowed_extensions)
+                # Declared sizes bound what ZipExtFile will return, so this check
+                # holds even for archives crafted to expand far beyond their size
+                expanded_bytes += sum(info.file_size for _, info in members)
+                if expanded_bytes > max_uncompressed_bytes:
+                    raise BulkUploadRejected(f"Zip archives expand to more than {max_uncompressed_bytes} bytes")
+                for basename, info in members:
+                    add_item(basename, lambda info=info: archive.open(info))
+    except Exception:
+        # A rejected upload keeps none of its files
+        for item in items:
+            if 'path' in item:
+                try:
+                    os.remove(item['path'])
+                except OSError as e:
+                    logger.error(f"Error removing bulk upload item {item['path']}: {e}")
+        raise
+
+    return items
+
+def iter_bulk_results(items, classify, executor):
+    """
+    Classify saved bulk upload items in parallel, yielding results as they finish
+
+    Items that failed to save are reported first. The others are submitted
+    to the executor together, so with an InferenceDispatcher in front of the
+    model their forward passes are batched with each other.
+
+    Args:
+        items (list): Items from save_bulk_upload()
+        classify (callable): classify(path, filename, content_hash) -> dict
+        executor (concurrent.futures.Executor): Pool to classify on
+
+    Yields:
+        dict: index, filename, status ('ok' or 'error') and result or error
+    """
+    futures = {}
+    try:
+        for item in items:
+            if 'error' not in item:
+                future = executor.submit(classify, item['path'], item['filename'], item['content_hash'])
+                futures[future] = item
+
+        for item in items:
+            if 'error' in item:
+                yield {'index': item['index'], 'filename': item['filename'], 'status': 'error', 'error': item['error']}
+
+        for future in as_completed(futures):
+            item = futures[future]
+            line = {'index': item['index'], 'filename': item['filename']}
+            try:
+                line.update(status='ok', result=future.result())
+            except Exception as e:
+                logger.error(f"Error classifying bulk upload item {item['filename']}: {e}")
+                line.update(status='error', error=str(e))
+            yield line
+    finally:
+        # The client went away: drop the items that have not started
+        for future in futures:
+            future.cancel()
@@ -0,0 +1,178 @@
+import os
+import logging
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
+from backend.config import ALLOWED_EXTENSIONS, GENRES, TARGET_SHAPE
+from backend.utils.prediction_cache import preprocessing_settings
+from backend.utils.spectrogram_shards import ShardWriter, ShardReader
+
+logger = logging.getLogger(__name__)
+
+# Training dataset of model inputs: every chunk of every track, prepared by
+# the serving path (process_audio -> create_audio_chunks ->
+# prepare_audio_chunks_for_model) and stored as TARGET_SHAPE items in
+# spectrogram shards. Item keys are "<genre>/<file>#<chunk index>".
+
+def track_chunk_inputs(audio_path):
+    """
+    Model inputs for every chunk of a track, exactly as served
+
+    Args:
+        audio_path (str): Path to the audio file
+
+    Returns:
+        tuple: (inputs of shape (N, H, W), chunk_indices)
+    """
+    from backend.utils.audio_processor import process_audio, create_audio_chunks
+    from backend.utils.spectrogram_generator import prepare_audio_chunks_for_model
+
+    audio = process_audio(str(audio_path))
+    batch_input, chunk_indices = prepare_audio_chunks_for_model(audio, create_audio_chunks(audio))
+    if batch_input is None:
+        return np.zeros((0,) + tuple(TARGET_SHAPE), dtype=np.float32), []
+    return batch_input[..., 0], chunk_indices
+
+def _track_task(audio_path):
+    try:
+        return track_chunk_inputs(audio_path)
+    except Exception as e:
+        logger.error(f"Error preparing chunks of {audio_path}: {e}")
+        return None
+
+def find_tracks(dataset_dir, genres=GENRES):
+    """
+    Audio files of a dataset laid out as <dataset_dir>/<genre>/<file>
+
+    Args:
+        dataset_dir (str): Root directory with one subdirectory per genre
+        genres (list): Genres to include
+
+    Returns:
+        list: Sorted (genre, path) pairs
+    """
+    tracks = []
+    for genre in genres:
+        genre_dir = os.path.join(dataset_dir, genre)
+        if not os.path.isdir(genre_dir):
+            continue
+        for name in sorted(os.listdir(genre_dir)):
+            if os.path.splitext(name)[1].lower().lstrip('.') in ALLOWED_EXTENSIONS:
+                tracks.append((genre, os.path.join(genre_dir, name)))
+    return tracks
+
+def build_chunk_dataset(dataset_dir, output_dir, dtype='float32', shard_size_bytes=256 * 1024 ** 2, workers=1):
+    """
+    Precompute the model input of every chunk of every track into shards
+
+    Tracks are prepared in worker processes and written in sorted order, so
+    a track's chunks are stored next to each other. The output replaces
+    output_dir only once complete.
+
+    Args:
+        dataset_dir (str): Root directory with one subdirectory per genre
+        output_dir (str): Dataset directory to write
+        dtype (str): 'float32' or 'float16' storage
+        shard_size_bytes (int): Target size of each shard file
+        workers (int): Processes preparing tracks (1 prepares them in this process)
+
+    Returns:
+        dict: Counts of tracks, chunks and failed tracks
+    """
+    tracks = find_tracks(dataset_dir)
+    if not tracks:
+        raise Exception(f"Error building chunk dataset: no audio files under {dataset_dir}")
+
+    metadata = {'preprocessing': preprocessing_settings(), 'source': os.path.abspath(dataset_dir)}
+    chunk_count = 0
+    failed = 0
+    executor = ProcessPoolExecutor(max_workers=workers) if workers > 1 else None
+    try:
+        paths = [path for _, path in tracks]
+        results = executor.map(_track_task, paths, chunksize=2) if executor else map(_track_task, paths)
+        with ShardWriter(output_dir, dtype=dtype, shard_size_bytes=shard_size_bytes, metadata=metadata) as writer:
+            for (genre, path), result in zip(tracks, results):
+                if result is None:
+                    failed += 1
+                    continue
+                inputs, chunk_indices = result
+                key = f"{genre}/{os.path.basename(path)}"
+                for chunk_input, chunk_index in zip(inputs, chunk_indices):
+                    writer.add(chunk_input, genre, key=f"{key}#{chunk_index}")
+                chunk_count += len(chunk_indices)
+    finally:
+        if executor is not None:
+            executor.shutdown(cancel_futures=True)
+
+    logger.info(f"Built chunk dataset of {chunk_count} chunks from {len(tracks) - failed} tracks ({failed} failed)")
+    return {'tracks': len(tracks) - failed, 'chunks': chunk_count, 'failed': failed}
+
+def open_chunk_dataset(dataset_dir):
+    """
+    Open a dataset written by build_chunk_dataset()
+
+    Raises if it was prepared with settings other than the current serving
+    configuration, since a model trained on it would then see different
+    inputs than it is served.
+
+    Args:
+        dataset_dir (str): Dataset directory
+
+    Returns:
+        ShardReader: Reader over the chunk inputs
+    """
+    reader = ShardReader(dataset_dir)
+    if reader.metadata.get('preprocessing') != preprocessing_settings():
+        raise ValueError(f"Chunk dataset {dataset_dir} was prepared with other preprocessing settings; rebuild it")
+    return reader
+
+def make_tf_dataset(dataset_dir, batch_size=32, shuffle_buffer=2048, cycle_length=4, block_length=16, seed=None):
+    """
+    Streaming tf.data pipeline over a chunk dataset
+
+    Shards are visited in a shuffled order and read cycle_length at a time
+    (interleaved, in parallel) in runs of block_length contiguous items, so
+    reads stay sequential within a shard. Items then pass through a shuffle
+    buffer, are batched and prefetched.
+
+    Args:
+        dataset_dir (str): Dataset directory written by build_chunk_dataset()
+        batch_size (int): Items per batch
+        shuffle_buffer (int): Size of the item shuffle buffer (0 disables shuffling)
+        cycle_length (int): Shards read at once
+        block_length (int): Consecutive items taken from a shard in turn
+        seed (int, optional): Seed for a reproducible order
+
+    Returns:
+        tf.data.Dataset: Batches of (inputs (B, H, W, 1) float32, labels (B,) int32),
+        with labels indexing GENRES
+    """
+    import tensorflow as tf
+
+    reader = open_chunk_dataset(dataset_dir)
+    labels = np.array([GENRES.index(genre) for genre in reader.genres], dtype=np.int32)[reader.genre_ids()]
+    shape = tuple(TARGET_SHAPE)
+
+    def shard_blocks(shard):
+        indices = reader.shard_indices(int(shard))
+        for start in range(0, len(indices), block_length):
+            block = indices[start:start + block_length]
+            # Items of a shard are contiguous, so each block is one sequential read
+            yield np.stack([reader[int(i)] for i in block]).astype(np.float32), labels[block]
+
+    def read_shard(shard):
+        blocks = tf.data.Dataset.from_generator(
+            shard_blocks, args=(shard,),
+            output_signature=(tf.TensorSpec((None,) + shape, tf.float32), tf.TensorSpec((None,), tf.int32)))
+        return blocks.unbatch()
+
+    deterministic = seed is not None
+    dataset = tf.data.Dataset.range(reader.num_shards)
+    if shuffle_buffer:
+        dataset = dataset.shuffle(reader.num_shards, seed=seed, reshuffle_each_iteration=True)
+    dataset = dataset.interleave(read_shard, cycle_length=cycle_length, block_length=block_length,
+                                 num_parallel_calls=tf.data.AUTOTUNE, deterministic=deterministic)
+    if shuffle_buffer:
+        dataset = dataset.shuffle(shuffle_buffer, seed=seed, reshuffle_each_iteration=True)
+    dataset = dataset.map(lambda x, y: (x[..., tf.newaxis], y), num_parallel_calls=tf.data.AUTOTUNE,
+                          deterministic=deterministic)
+    return dataset.batch(batch_size).prefetch(tf.data.AUTOTUNE)
@@ -0,0 +1,197 @@
+import time
+import uuid
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+logger = logging.getLogger(__name__)
+
+# Job states
+QUEUED = 'queued'
+RUNNING = 'running'
+SUCCEEDED = 'succeeded'
+FAILED = 'failed'
+CANCELLED = 'cancelled'
+TIMED_OUT = 'timed_out'
+FINISHED_STATES = {SUCCEEDED, FAILED, CANCELLED, TIMED_OUT}
+
+class JobQueueFull(Exception):
+    """Raised when a job is submitted while the pending queue is at capacity."""
+
+class JobInterrupted(Exception):
+    """Raised inside a running job when it has been cancelled or has timed out."""
+
+class Job:
+    """State of a single background job."""
+    def __init__(self, job_id, timeout_s):
+        self.id = job_id
+        self.status = QUEUED
+        self.result = None
+        self.error = None
+        self.timeout_s = timeout_s
+        self.created_at = time.time()
+        self.started_at = None
+        self.finished_at = None
+        self.cancel_requested = False
+        self.future = None
+
+    def to_dict(self):
+        """
+        Snapshot of the job for API responses
+
+        Returns:
+            dict: Job status, timestamps and result or error
+        """
+        return {
+            'job_id': self.id,
+            'status': self.status,
+            'result': self.result,
+            'error': self.error,
+            'created_at': self.created_at,
+            'started_at': self.started_at,
+            'finished_at': self.finished_at,
+        }
+
+class JobManager:
+    """
+    Runs jobs on a bounded in-process thread pool
+
+    Jobs that are still queued can be cancelled outright. Running jobs are
+    cancelled or timed out cooperatively: the job function receives a
+    checkpoint() callable and should call it between stages, which raises
+    JobInterrupted once the job has been cancelled or has run longer than
+    its timeout. Such a job counts toward max_pending until its worker
+    returns. Finished jobs are kept for retention_s seconds.
+    """
+    def __init__(self, max_workers=2, max_pending=32, timeout_s=120, retention_s=600):
+        self.max_pending = max_pending
+        self.timeout_s = timeout_s
+        self.retention_s = retention_s
+        self._jobs = {}
+        self._lock = threading.Lock()
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='job-worker')
+
+    def submit(self, fn, *args, **kwargs):
+        """
+        Queue fn(*args, checkpoint=..., **kwargs) to run in the worker pool
+
+        Returns:
+            str: Job ID
+
+        Raises:
+            JobQueueFull: If max_pending jobs are already queued or running
+                (including cancelled jobs that have not stopped yet)
+        """
+        with self._lock:
+            self._purge_expired()
+            active = sum(1 for job in self._jobs.values() if self._is_active(job))
+            if active >= self.max_pending:
+                raise JobQueueFull(f"Job queue is full ({active} active jobs)")
+
+            job = Job(uuid.uuid4().hex, self.timeout_s)
+            self._jobs[job.id] = job
+            job.future = self._executor.submit(self._run, job, fn, args, kwargs)
+
+        logger.info(f"Queued job {job.id}")
+        return job.id
+
+    def get(self, job_id):
+        """
+        Get a snapshot of a job
+
+        Args:
+            job_id (str): Job ID
+
+        Returns:
+            dict: Job snapshot, or None if the job is unknown or expired
+        """
+        with self._lock:
+            self._purge_expired()
+            job = self._jobs.get(job_id)
+            if job is None:
+                return None
+            if job.status == RUNNING and self._is_overdue(job):
+                self._finish(job, TIMED_OUT, error=f"Job exceeded timeout of {job.timeout_s} seconds")
+            return job.to_dict()
+
+    def cancel(self, job_id):
+        """
+        Cancel a queued or running job
+
+        Args:
+            job_id (str): Job ID
+
+        Returns:
+            dict: Job snapshot, or None if the job is unknown or expired
+        """
+        with self._lock:
+            job = self._jobs.get(job_id)
+            if job is None:
+                return None
+            if job.status not in FINISHED_STATES:
+                job.cancel_requested = True
+                # Queued jobs never start; running jobs stop at their next checkpoint
+                if job.status == QUEUED:
+                    job.future.cancel()
+                self._finish(job, CANCELLED, error="Job was cancelled")
+                logger.info(f"Cancelled job {job_id}")
+            return job.to_dict()
+
+    def shutdown(self, wait=True):
+        """Stop accepting jobs and shut down the worker pool."""
+        self._executor.shutdown(wait=wait)
+
+    def _run(self, job, fn, args, kwargs):
+        with self._lock:
+            if job.cancel_requested or job.status in FINISHED_STATES:
+                return
+            job.status = RUNNING
+            job.started_at = time.time()
+
+        def checkpoint():
+            with self._lock:
+                if job.cancel_requested:
+                    raise JobInterrupted("Job was cancelled")
+                if self._is_overdue(job):
+                    raise JobInterrupted(f"Job exceeded timeout of {job.timeout_s} seconds")
+
+        try:
+            result = fn(*args, checkpoint=checkpoint, **kwargs)
+        except JobInterrupted as e:
+            with self._lock:
+                if job.status not in FINISHED_STATES:
+                    self._finish(job, CANCELLED if job.cancel_requested else TIMED_OUT, error=str(e))
+            return
+        except Exception as e:
+            logger.error(f"Job {job.id} failed: {e}")
+            with self._lock:
+                if job.status not in FINISHED_STATES:
+                    self._finish(job, FAILED, error=str(e))
+            return
+
+        with self._lock:
+            # A job cancelled or timed out while running keeps that status
+            if job.status not in FINISHED_STATES:
+                job.result = result
+                self._finish(job, SUCCEEDED)
+
+    def _is_active(self, job):
+        # A job cancelled or timed out while running still holds its worker
+        # until it reaches a checkpoint, so it counts until its future is done
+        return job.status not in FINISHED_STATES or (job.future is not None and not job.future.done())
+
+    def _is_overdue(self, job):
+        return job.started_at is not None and time.time() - job.started_at > job.timeout_s
+
+    def _finish(self, job, status, error=None):
+        job.status = status
+        job.error = error
+        job.finished_at = time.time()
+
+    def _purge_expired(self):
+        now = time.time()
+        expired = [job_id for job_id, job in self._jobs.items()
+                   if job.finished_at is not None and now - job.finished_at > self.retention_s
+                   and (job.future is None or job.future.done())]
+        for job_id in expired:
+            del self._jobs[job_id]
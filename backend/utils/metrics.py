@@ -0,0 +1,311 @@
+import time
+import bisect
+import threading
+from contextlib import contextmanager
+from functools import wraps
+
+# Prometheus text exposition format, version 0.0.4
+CONTENT_TYPE = 'text/plain; version=0.0.4; charset=utf-8'
+
+# Serving stages with a duration histogram and an error counter
+STAGES = ('decode', 'mel', 'resize', 'inference', 'render', 'playlist_write')
+# Upper bounds in seconds; stages range from sub-millisecond resizes to
+# multi-second inference under load
+DEFAULT_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+def _format_value(value):
+    if value == float('inf'):
+        return '+Inf'
+    if value == float('-inf'):
+        return '-Inf'
+    if float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
+
+def _format_labels(names, values):
+    if not names:
+        return ''
+    escaped = (str(v).replace('\\', r'\\').replace('"', r'\"').replace('\n', r'\n') for v in values)
+    return '{' + ','.join(f'{name}="{value}"' for name, value in zip(names, escaped)) + '}'
+
+class _Metric:
+    """
+    Base of the metric types: a named family of children, one per label value tuple
+
+    Children are created on first use and cached, so recording a sample is
+    a dict lookup plus a short critical section under the child's lock.
+    """
+    type_name = None
+
+    def __init__(self, name, documentation, labelnames=(), registry=None):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._children = {}
+        self._lock = threading.Lock()
+        if not self.labelnames:
+            self._default = self._new_child()
+            self._children[()] = self._default
+        (registry if registry is not None else REGISTRY).register(self)
+
+    def labels(self, *values):
+        """
+        Child of the family for the given label values
+
+        Args:
+            *values: One value per label name, in order
+
+        Returns:
+            Child with the recording methods of the metric type
+        """
+        if len(values) != len(self.labelnames):
+            raise ValueError(f"{self.name} expects labels {self.labelnames}, got {values}")
+        key = tuple(str(v) for v in values)
+        child = self._children.get(key)
+        if child is None:
+            with self._lock:
+                child = self._children.setdefault(key, self._new_child())
+        return child
+
+    def _new_child(self):
+        raise NotImplementedError
+
+    def reset(self):
+        """Zero every child, keeping the label sets already exposed."""
+        with self._lock:
+            children = list(self._children.values())
+        for child in children:
+            child.reset()
+
+    def _samples(self, child):
+        raise NotImplementedError
+
+    def collect(self):
+        """
+        Lines of this family in the text exposition format
+
+        Returns:
+            list: Lines without trailing newlines
+        """
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.type_name}"]
+        with self._lock:
+            children = sorted(self._children.items())
+        for values, child in children:
+            for suffix, extra_names, extra_values, value in self._samples(child):
+                labels = _format_labels(self.labelnames + extra_names, values + extra_values)
+                lines.append(f"{self.name}{suffix}{labels} {_format_value(value)}")
+        return lines
+
+class _Value:
+    def __init__(self):
+        self.value = 0.0
+        self.lock = threading.Lock()
+
+    def reset(self):
+        with self.lock:
+            self.value = 0.0
+
+class _CounterChild(_Value):
+    def inc(self, amount=1):
+        if amount < 0:
+            raise ValueError("Counters can only be increased")
+        with self.lock:
+            self.value += amount
+
+class Counter(_Metric):
+    """Monotonically increasing count, exposed as <name> (use a _total suffix)."""
+    type_name = 'counter'
+
+    def _new_child(self):
+        return _CounterChild()
+
+    def inc(self, amount=1):
+        """Increase the unlabelled counter."""
+        self._default.inc(amount)
+
+    def _samples(self, child):
+        return [('', (), (), child.value)]
+
+class _GaugeChild(_Value):
+    def set(self, value):
+        with self.lock:
+            self.value = float(value)
+
+    def inc(self, amount=1):
+        with self.lock:
+            self.value += amount
+
+    def dec(self, amount=1):
+        with self.lock:
+            self.value -= amount
+
+class Gauge(_Metric):
+    """Value that can go up and down."""
+    type_name = 'gauge'
+
+    def _new_child(self):
+        return _GaugeChild()
+
+    def set(self, value):
+        """Set the unlabelled gauge."""
+        self._default.set(value)
+
+    def inc(self, amount=1):
+        """Increase the unlabelled gauge."""
+        self._default.inc(amount)
+
+    def dec(self, amount=1):
+        """Decrease the unlabelled gauge."""
+        self._default.dec(amount)
+
+    def _samples(self, child):
+        return [('', (), (), child.value)]
+
+class _HistogramChild:
+    def __init__(self, upper_bounds):
+        self.upper_bounds = upper_bounds
+        # One count per bucket plus the +Inf bucket, not cumulative
+        self.counts = [0] * (len(upper_bounds) + 1)
+        self.sum = 0.0
+        self.lock = threading.Lock()
+
+    def observe(self, value):
+        index = bisect.bisect_left(self.upper_bounds, value)
+        with self.lock:
+            self.counts[index] += 1
+            self.sum += value
+
+    def reset(self):
+        with self.lock:
+            self.counts = [0] * (len(self.upper_bounds) + 1)
+            self.sum = 0.0
+
+    @contextmanager
+    def time(self):
+        """Observe the duration of the with block in seconds."""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - start)
+
+class Histogram(_Metric):
+    """
+    Distribution of observed values in cumulative buckets, for quantiles
+    such as histogram_quantile(0.99, rate(<name>_bucket[5m]))
+    """
+    type_name = 'histogram'
+
+    def __init__(self, name, documentation, labelnames=(), buckets=DEFAULT_BUCKETS, registry=None):
+        self.upper_bounds = tuple(sorted(float(b) for b in buckets if b != float('inf')))
+        super().__init__(name, documentation, labelnames, registry)
+
+    def _new_child(self):
+        return _HistogramChild(self.upper_bounds)
+
+    def observe(self, value):
+        """Record a value in the unlabelled histogram."""
+        self._default.observe(value)
+
+    def time(self):
+        """Observe the duration of a with block in the unlabelled histogram."""
+        return self._default.time()
+
+    def _samples(self, child):
+        with child.lock:
+            counts = list(child.counts)
+            total = child.sum
+        samples = []
+        cumulative = 0
+        for bound, count in zip(self.upper_bounds + (float('inf'),), counts):
+            cumulative += count
+            samples.append(('_bucket', ('le',), (_format_value(bound),), cumulative))
+        samples.append(('_sum', (), (), total))
+        samples.append(('_count', (), (), cumulative))
+        return samples
+
+class MetricsRegistry:
+    """Set of metric families rendered together for /metrics."""
+    def __init__(self):
+        self._metrics = {}
+        self._lock = threading.Lock()
+
+    def register(self, metric):
+        with self._lock:
+            if metric.name in self._metrics:
+                raise ValueError(f"Metric already registered: {metric.name}")
+            self._metrics[metric.name] = metric
+
+    def exposition(self):
+        """
+        Every registered metric in the Prometheus text format
+
+        Returns:
+            str: Response body for a scrape
+        """
+        with self._lock:
+            metrics = list(self._metrics.values())
+        lines = []
+        for metric in metrics:
+            lines.extend(metric.collect())
+        return '\n'.join(lines) + '\n'
+
+REGISTRY = MetricsRegistry()
+
+STAGE_DURATION = Histogram('genre_stage_duration_seconds', 'Duration of each serving stage', ('stage',))
+STAGE_ERRORS = Counter('genre_stage_errors_total', 'Serving stage calls that raised', ('stage',))
+UPLOADS = Counter('genre_uploads_total', 'Uploaded tracks accepted for classification', ('mode',))
+CHUNKS_EVALUATED = Counter('genre_chunks_evaluated_total', 'Chunk inputs run through the model')
+REQUESTS_IN_FLIGHT = Gauge('genre_requests_in_flight', 'HTTP requests being handled')
+MODEL_LOAD_SECONDS = Gauge('genre_model_load_seconds', 'Time the model took to load at startup')
+INFERENCE_QUEUE_WAIT = Histogram('genre_inference_queue_wait_seconds',
+                                 'Time chunk batches waited in the inference dispatcher before their forward pass')
+
+# Every stage series exists from the first scrape, so rates start at zero
+for _stage in STAGES:
+    STAGE_DURATION.labels(_stage)
+    STAGE_ERRORS.labels(_stage)
+for _mode in ('sync', 'async', 'bulk'):
+    UPLOADS.labels(_mode)
+
+@contextmanager
+def stage_timer(stage):
+    """
+    Record the duration of a with block under a serving stage, and count it
+    as an error of that stage if it raises
+
+    Args:
+        stage (str): One of STAGES
+    """
+    histogram = STAGE_DURATION.labels(stage)
+    start = time.perf_counter()
+    try:
+        yield
+    except Exception:
+        STAGE_ERRORS.labels(stage).inc()
+        raise
+    finally:
+        histogram.observe(time.perf_counter() - start)
+
+def reset_serving_metrics():
+    """
+    Zero the per-request series, so that startup warm-up traffic does not
+    show up as served requests
+    """
+    for metric in (STAGE_DURATION, STAGE_ERRORS, CHUNKS_EVALUATED, INFERENCE_QUEUE_WAIT):
+        metric.reset()
+
+def timed_stage(stage):
+    """
+    Decorator form of stage_timer()
+
+    Args:
+        stage (str): One of STAGES
+    """
+    def decorator(fn):
+        @wraps(fn)
+        def wrapper(*args, **kwargs):
+            with stage_timer(stage):
+                return fn(*args, **kwargs)
+        return wrapper
+    return decorator
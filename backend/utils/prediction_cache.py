@@ -0,0 +1,268 @@
+import os
+import json
+import hashlib
+import logging
+import tempfile
+import threading
+from collections import OrderedDict
+from backend.config import (
+    SAMPLE_RATE, DURATION, MONO, CHUNK_DURATION_S, CHUNK_OVERLAP_S, N_MELS, N_FFT, HOP_LENGTH,
+    TRACK_LEVEL_MEL, TARGET_SHAPE, GENRES, EARLY_EXIT, EARLY_EXIT_MIN_CHUNKS, EARLY_EXIT_STEP, EARLY_EXIT_TEST,
+    EARLY_EXIT_MARGIN, EARLY_EXIT_MAX_ENTROPY
+)
+
+logger = logging.getLogger(__name__)
+
+# Size of the blocks read from the upload stream while it is saved and hashed
+HASH_BLOCK_SIZE = 1024 * 1024
+
+def save_upload_with_hash(stream, file_path):
+    """
+    Save an upload stream to disk and hash its content in the same pass
+
+    Args:
+        stream (file-like): Upload stream (e.g. werkzeug FileStorage.stream)
+        file_path (str): Destination path
+
+    Returns:
+        str: SHA-256 hex digest of the file content
+    """
+    digest = hashlib.sha256()
+    with open(file_path, 'wb') as f:
+        while True:
+            block = stream.read(HASH_BLOCK_SIZE)
+            if not block:
+                break
+            digest.update(block)
+            f.write(block)
+    return digest.hexdigest()
+
+def read_upload_with_hash(stream):
+    """
+    Read an upload stream into memory and hash its content in the same pass
+
+    Args:
+        stream (file-like): Upload stream (e.g. werkzeug FileStorage.stream)
+
+    Returns:
+        tuple: (bytes content, SHA-256 hex digest)
+    """
+    digest = hashlib.sha256()
+    blocks = []
+    while True:
+        block = stream.read(HASH_BLOCK_SIZE)
+        if not block:
+            break
+        digest.update(block)
+        blocks.append(block)
+    return b''.join(blocks), digest.hexdigest()
+
+def write_upload(data, file_path):
+    """
+    Write upload content to disk atomically
+
+    The content appears under file_path only once complete, so the file is
+    never served or hashed half-written.
+
+    Args:
+        data (bytes): Upload content
+        file_path (str): Destination path
+    """
+    tmp_path = f"{file_path}.{os.getpid()}.{threading.get_ident()}.tmp"
+    try:
+        with open(tmp_path, 'wb') as f:
+            f.write(data)
+        os.replace(tmp_path, file_path)
+    finally:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+
+def preprocessing_settings():
+    """
+    Every setting that affects the model input computed from a track
+
+    Returns:
+        dict: JSON-serializable settings
+    """
+    return {
+        'sample_rate': SAMPLE_RATE,
+        'duration': DURATION,
+        'mono': MONO,
+        'chunk_duration_s': CHUNK_DURATION_S,
+        'chunk_overlap_s': CHUNK_OVERLAP_S,
+        'n_mels': N_MELS,
+        'n_fft': N_FFT,
+        'hop_length': HOP_LENGTH,
+        'track_level_mel': TRACK_LEVEL_MEL,
+        'target_shape': list(TARGET_SHAPE),
+        'genres': GENRES,
+    }
+
+def compute_model_fingerprint(model_path):
+    """
+    Fingerprint the model file and every setting that affects a prediction,
+    so cached results are invalidated when either changes
+
+    Args:
+        model_path (str): Path to the saved model
+
+    Returns:
+        str: SHA-256 hex digest
+    """
+    settings = preprocessing_settings()
+    # Early exit changes which chunks are averaged, not the model inputs
+    settings['early_exit'] = {
+        'enabled': EARLY_EXIT,
+        'min_chunks': EARLY_EXIT_MIN_CHUNKS,
+        'step': EARLY_EXIT_STEP,
+        'test': EARLY_EXIT_TEST,
+        'margin': EARLY_EXIT_MARGIN,
+        'max_entropy': EARLY_EXIT_MAX_ENTROPY,
+    }
+    # Results cached before spectrograms were named by content hash point at
+    # per-filename spectrograms that a later upload may have overwritten
+    settings['spectrogram_names'] = 'content_hash'
+    if os.path.exists(model_path):
+        stat = os.stat(model_path)
+        settings['model'] = [os.path.basename(model_path), stat.st_size, stat.st_mtime_ns]
+    return hashlib.sha256(json.dumps(settings, sort_keys=True).encode('utf-8')).hexdigest()
+
+class PredictionCache:
+    """
+    Two-tier cache of classification results keyed by upload content
+
+    Results live in a bounded in-memory LRU in front of a persistent on-disk
+    store (one JSON file per entry) that evicts its least recently used
+    entries beyond max_disk_entries.
+    """
+    def __init__(self, cache_dir, fingerprint, max_memory_entries=256, max_disk_entries=10000):
+        self.cache_dir = cache_dir
+        self.fingerprint = fingerprint
+        self.max_memory_entries = max_memory_entries
+        self.max_disk_entries = max_disk_entries
+        self.hits = 0
+        self.memory_hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self._memory = OrderedDict()
+        self._lock = threading.Lock()
+
+        os.makedirs(cache_dir, exist_ok=True)
+        # Disk index of key -> last access time, oldest first
+        entries = []
+        for entry in os.scandir(cache_dir):
+            if entry.is_file() and entry.name.endswith('.json'):
+                entries.append((entry.stat().st_mtime, entry.name[:-len('.json')]))
+        self._disk_index = OrderedDict((key, mtime) for mtime, key in sorted(entries))
+
+    def make_key(self, content_hash):
+        """
+        Build the cache key for an upload's content hash
+
+        Args:
+            content_hash (str): SHA-256 hex digest of the upload
+
+        Returns:
+            str: Cache key
+        """
+        return hashlib.sha256(f"{self.fingerprint}:{content_hash}".encode('utf-8')).hexdigest()
+
+    def _entry_path(self, key):
+        return os.path.join(self.cache_dir, f"{key}.json")
+
+    def get(self, content_hash):
+        """
+        Look up a cached result
+
+        Args:
+            content_hash (str): SHA-256 hex digest of the upload
+
+        Returns:
+            dict: Cached result, or None on a miss
+        """
+        key = self.make_key(content_hash)
+        with self._lock:
+            if key in self._memory:
+                self._memory.move_to_end(key)
+                # Keep the disk tier's eviction order in step without touching the file
+                if key in self._disk_index:
+                    self._disk_index.move_to_end(key)
+                self.hits += 1
+                self.memory_hits += 1
+                return dict(self._memory[key])
+
+            result = None
+            if key in self._disk_index:
+                try:
+                    with open(self._entry_path(key), 'r') as f:
+                        result = json.load(f)
+                    os.utime(self._entry_path(key))
+                    self._disk_index[key] = os.path.getmtime(self._entry_path(key))
+                    self._disk_index.move_to_end(key)
+                except Exception as e:
+                    logger.warning(f"Dropping unreadable prediction cache entry {key}: {e}")
+                    self._disk_index.pop(key, None)
+                    result = None
+
+            if result is None:
+                self.misses += 1
+                return None
+
+            self.hits += 1
+            self.disk_hits += 1
+            self._remember(key, result)
+            return dict(result)
+
+    def put(self, content_hash, result):
+        """
+        Store a result in both tiers
+
+        Args:
+            content_hash (str): SHA-256 hex digest of the upload
+            result (dict): JSON-serializable classification result
+        """
+        key = self.make_key(content_hash)
+        with self._lock:
+            self._remember(key, dict(result))
+            try:
+                fd, tmp_path = tempfile.mkstemp(dir=self.cache_dir, suffix='.tmp')
+                with os.fdopen(fd, 'w') as f:
+                    json.dump(result, f)
+                os.replace(tmp_path, self._entry_path(key))
+                self._disk_index[key] = os.path.getmtime(self._entry_path(key))
+                self._disk_index.move_to_end(key)
+            except Exception as e:
+                logger.error(f"Error writing prediction cache entry {key}: {e}")
+                return
+
+            while len(self._disk_index) > self.max_disk_entries:
+                old_key, _ = self._disk_index.popitem(last=False)
+                try:
+                    os.remove(self._entry_path(old_key))
+                except FileNotFoundError:
+                    pass
+
+    def _remember(self, key, result):
+        self._memory[key] = result
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_memory_entries:
+            self._memory.popitem(last=False)
+
+    def stats(self):
+        """
+        Get hit/miss counters and tier sizes
+
+        Returns:
+            dict: Cache statistics
+        """
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'hits': self.hits,
+                'memory_hits': self.memory_hits,
+                'disk_hits': self.disk_hits,
+                'misses': self.misses,
+                'hit_rate': self.hits / lookups if lookups else 0.0,
+                'memory_entries': len(self._memory),
+                'disk_entries': len(self._disk_index),
+            }
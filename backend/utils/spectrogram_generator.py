@@ -1,67 +1,118 @@
-import librosa
-import librosa.display
-import matplotlib
-# Set the backend to 'Agg' to avoid GUI window creation
-matplotlib.use('Agg')
-import matplotlib.pyplot as plt
 import numpy as np
 import os
 import logging
-import tensorflow as tf
-from backend.config import SAMPLE_RATE, N_MELS, N_FFT, HOP_LENGTH, TARGET_SHAPE, RESIZE_DIM, MODEL_DIR
+import threading
+from functools import lru_cache
+from backend.config import (
+    SAMPLE_RATE, N_MELS, N_FFT, HOP_LENGTH, TARGET_SHAPE, RESIZE_DIM, MODEL_DIR, SAMPLES_PER_CHUNK,
+    HOP_SAMPLES_BETWEEN_CHUNKS, TRACK_LEVEL_MEL, SPECTROGRAM_FOLDER
+)
+from backend.utils.spectrogram_renderer import render_spectrogram_png
+from backend.utils.metrics import stage_timer, timed_stage
 
 logger = logging.getLogger(__name__)
 
-def generate_spectrogram(audio_data, filename):
+def spectrogram_image_name(filename):
+    """Name of the spectrogram image for an uploaded file."""
+    return os.path.splitext(filename)[0] + '_spectrogram.png'
+
+def _spectrogram_data_path(spectrogram_filename, spectrogram_dir):
+    return os.path.join(spectrogram_dir, os.path.splitext(spectrogram_filename)[0] + '.npy')
+
+def save_spectrogram_data(track_mel_power, filename, spectrogram_dir=SPECTROGRAM_FOLDER):
+    """
+    Store the dB Mel spectrogram of a track so its image can be rendered later
+
+    The array is written as float16 (the dB values span -80..0, so the
+    rounding is far below what the image shows) next to where
+    render_spectrogram() puts the image.
+
+    Args:
+        track_mel_power (numpy.ndarray): Output of compute_track_mel_power()
+        filename (str): Name for the spectrogram; uploads use their content
+            hash, so the data always matches the track a result refers to
+        spectrogram_dir (str): Directory holding spectrogram data and images
+
+    Returns:
+        str: Filename of the spectrogram image, rendered on first request
+    """
+    try:
+        os.makedirs(spectrogram_dir, exist_ok=True)
+        mel_spectrogram_db = get_mel_frontend().power_to_db(track_mel_power)
+
+        spectrogram_filename = spectrogram_image_name(filename)
+        data_path = _spectrogram_data_path(spectrogram_filename, spectrogram_dir)
+        tmp_path = f"{data_path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(tmp_path, 'wb') as f:
+            np.save(f, mel_spectrogram_db.astype(np.float16))
+        os.replace(tmp_path, data_path)
+
+        # An image rendered for an earlier upload of the same name is stale now
+        image_path = os.path.join(spectrogram_dir, spectrogram_filename)
+        if os.path.exists(image_path):
+            os.remove(image_path)
+
+        logger.info(f"Spectrogram data saved: {data_path}")
+        return spectrogram_filename
+
+    except Exception as e:
+        logger.error(f"Error saving spectrogram data: {e}")
+        raise Exception(f"Error saving spectrogram data: {e}")
+
+def render_spectrogram(spectrogram_filename, spectrogram_dir=SPECTROGRAM_FOLDER):
+    """
+    Render a stored spectrogram image on first request and reuse it afterwards
+
+    Args:
+        spectrogram_filename (str): Image filename from save_spectrogram_data()
+        spectrogram_dir (str): Directory holding spectrogram data and images
+
+    Returns:
+        str: Path to the spectrogram image
+
+    Raises:
+        FileNotFoundError: If neither the image nor its data exists
+    """
+    image_path = os.path.join(spectrogram_dir, spectrogram_filename)
+    if os.path.exists(image_path):
+        return image_path
+
+    data_path = _spectrogram_data_path(spectrogram_filename, spectrogram_dir)
+    if not os.path.exists(data_path):
+        raise FileNotFoundError(f"No spectrogram data for: {spectrogram_filename}")
+
+    # Concurrent first requests each render to their own temporary file and
+    # the last rename wins; the images are identical
+    logger.info(f"Rendering spectrogram: {spectrogram_filename}")
+    mel_spectrogram_db = np.load(data_path).astype(np.float32)
+    tmp_path = f"{image_path}.{os.getpid()}.{threading.get_ident()}.tmp"
+    with stage_timer('render'):
+        render_spectrogram_png(mel_spectrogram_db, tmp_path)
+    os.replace(tmp_path, image_path)
+
+    logger.info(f"Spectrogram rendered successfully: {image_path}")
+    return image_path
+
+def generate_spectrogram(audio_data, filename, spectrogram_dir=SPECTROGRAM_FOLDER):
     """
     Generate Mel spectrogram from audio data and save as image
 
+    Renders immediately; the upload path stores the data with
+    save_spectrogram_data() and leaves rendering to the first request.
+
     Args:
         audio_data (numpy.ndarray): Processed audio signal
         filename (str): Original filename for naming the spectrogram
+        spectrogram_dir (str): Directory for spectrogram data and images
 
     Returns:
-        str: Path to the saved spectrogram image
+        str: Filename of the saved spectrogram image
     """
     logger.info(f"Generating spectrogram for: {filename}")
 
     try:
-        # Create spectrograms directory if it doesn't exist
-        spectrogram_dir = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'uploads', 'spectrograms')
-        os.makedirs(spectrogram_dir, exist_ok=True)
-
-        # Generate Mel spectrogram
-        mel_spectrogram = librosa.feature.melspectrogram(
-            y=audio_data,
-            sr=SAMPLE_RATE,
-            n_fft=N_FFT,
-            hop_length=HOP_LENGTH,
-            n_mels=N_MELS
-        )
-
-        # Convert to dB scale
-        mel_spectrogram_db = librosa.power_to_db(mel_spectrogram, ref=np.max)
-
-        # Create figure and plot spectrogram
-        plt.figure(figsize=(10, 4))
-        librosa.display.specshow(
-            mel_spectrogram_db,
-            sr=SAMPLE_RATE,
-            hop_length=HOP_LENGTH,
-            x_axis='time',
-            y_axis='mel'
-        )
-        plt.colorbar(format='%+2.0f dB')
-        plt.title('Mel Spectrogram')
-        plt.tight_layout()
-
-        # Save figure
-        spectrogram_filename = os.path.splitext(filename)[0] + '_spectrogram.png'
-        spectrogram_path = os.path.join(spectrogram_dir, spectrogram_filename)
-        plt.savefig(spectrogram_path)
-        plt.close()
-
-        logger.info(f"Spectrogram generated successfully: {spectrogram_path}")
+        spectrogram_filename = save_spectrogram_data(compute_track_mel_power(audio_data), filename, spectrogram_dir)
+        render_spectrogram(spectrogram_filename, spectrogram_dir)
         return spectrogram_filename
 
     except Exception as e:
@@ -72,6 +123,9 @@ def resize_spectrogram_tf(spec, target_shape=TARGET_SHAPE):
     """
     Resizes spectrogram using TensorFlow
 
+    Kept as the reference implementation for resize_spectrogram(), which
+    the serving path uses instead to avoid eager TF op dispatch per chunk.
+
     Args:
         spec (numpy.ndarray): Mel spectrogram
         target_shape (tuple): Target shape for resizing
@@ -79,11 +133,176 @@ def resize_spectrogram_tf(spec, target_shape=TARGET_SHAPE):
     Returns:
         numpy.ndarray: Resized spectrogram
     """
+    import tensorflow as tf
+
     # Add channel dim, resize, remove channel dim
     spec_tf = tf.constant(spec[..., np.newaxis], dtype=tf.float32)
     resized_spec_tf = tf.image.resize(spec_tf, target_shape, method='bilinear')
     return resized_spec_tf.numpy().squeeze()  # Back to numpy array (H, W)
 
+@lru_cache(maxsize=32)
+def _bilinear_resize_matrix(in_size, out_size):
+    """
+    Builds the (out_size, in_size) matrix that performs 1-D bilinear
+    interpolation with half-pixel centers, the convention used by
+    tf.image.resize(method='bilinear', antialias=False)
+
+    Args:
+        in_size (int): Source length
+        out_size (int): Target length
+
+    Returns:
+        numpy.ndarray: Read-only float32 interpolation matrix
+    """
+    # Positions are computed in float32 like the TF kernel does
+    scale = np.float32(in_size / out_size)
+    positions = (np.arange(out_size, dtype=np.float32) + np.float32(0.5)) * scale - np.float32(0.5)
+    floor = np.floor(positions)
+    lerp = positions - floor
+    # Same edge clamping as TF's compute_interpolation_weights
+    lower = np.clip(floor.astype(np.int64), 0, in_size - 1)
+    upper = np.clip(np.ceil(positions).astype(np.int64), 0, in_size - 1)
+
+    matrix = np.zeros((out_size, in_size), dtype=np.float32)
+    rows = np.arange(out_size)
+    np.add.at(matrix, (rows, lower), 1.0 - lerp)
+    np.add.at(matrix, (rows, upper), lerp)
+    matrix.setflags(write=False)
+    return matrix
+
+@timed_stage('resize')
+def resize_spectrograms(specs, target_shape=TARGET_SHAPE):
+    """
+    Resizes a batch of spectrograms with bilinear interpolation in NumPy
+
+    Matches tf.image.resize(method='bilinear') to float32 rounding. The
+    interpolation matrices are cached per (source shape, target shape), so
+    resizing is two matrix products over the whole batch.
+
+    Args:
+        specs (numpy.ndarray): Spectrograms of shape (N, H, W)
+        target_shape (tuple): Target shape for resizing
+
+    Returns:
+        numpy.ndarray: Resized spectrograms of shape (N, target_H, target_W)
+    """
+    specs = np.asarray(specs, dtype=np.float32)
+    rows = _bilinear_resize_matrix(specs.shape[-2], target_shape[0])
+    cols = _bilinear_resize_matrix(specs.shape[-1], target_shape[1])
+    return rows @ specs @ cols.T
+
+def resize_spectrogram(spec, target_shape=TARGET_SHAPE):
+    """
+    Resizes a single spectrogram with resize_spectrograms()
+
+    Args:
+        spec (numpy.ndarray): Mel spectrogram
+        target_shape (tuple): Target shape for resizing
+
+    Returns:
+        numpy.ndarray: Resized spectrogram
+    """
+    return resize_spectrograms(spec[np.newaxis], target_shape)[0]
+
+class MelFrontend:
+    """
+    Batched Mel spectrogram front end with a precomputed filterbank and window
+
+    Produces the same output as librosa.feature.melspectrogram (centered
+    STFT with zero padding, periodic Hann window, Slaney mel basis, power 2)
+    followed by librosa.power_to_db(ref=np.max), but builds the filterbank
+    and window once and transforms a whole (N, samples) batch with a single
+    rfft and matmul. Zero padding is librosa's default since 0.10 (earlier
+    versions pad with 'reflect'), hence librosa>=0.10 in requirements.txt.
+    """
+    def __init__(self, sr=SAMPLE_RATE, n_fft=N_FFT, hop_length=HOP_LENGTH, n_mels=N_MELS,
+                 amin=1e-10, top_db=80.0):
+        self.sr = sr
+        self.n_fft = n_fft
+        self.hop_length = hop_length
+        self.n_mels = n_mels
+        self.amin = amin
+        self.top_db = top_db
+
+        # librosa is only needed to build the tables, so it is imported here
+        import librosa
+        self.window = librosa.filters.get_window('hann', n_fft, fftbins=True).astype(np.float32)
+        self.mel_basis = librosa.filters.mel(sr=sr, n_fft=n_fft, n_mels=n_mels)
+
+    def num_frames(self, num_samples):
+        """Number of STFT frames for a signal of num_samples samples."""
+        return 1 + num_samples // self.hop_length
+
+    @timed_stage('mel')
+    def mel_power(self, signals):
+        """
+        Computes power Mel spectrograms for a batch of equal-length signals
+
+        Args:
+            signals (numpy.ndarray): Signals of shape (N, samples) or (samples,)
+
+        Returns:
+            numpy.ndarray: Power Mel spectrograms of shape (N, n_mels, n_frames),
+            or (n_mels, n_frames) for a 1-D input
+        """
+        signals = np.asarray(signals, dtype=np.float32)
+        single = signals.ndim == 1
+        if single:
+            signals = signals[np.newaxis]
+
+        pad = self.n_fft // 2
+        padded = np.pad(signals, ((0, 0), (pad, pad)), mode='constant')
+        frames = np.lib.stride_tricks.sliding_window_view(padded, self.n_fft, axis=-1)[:, ::self.hop_length]
+        spectrum = np.fft.rfft(frames * self.window, axis=-1)
+        power = (spectrum.real ** 2 + spectrum.imag ** 2).astype(np.float32)
+
+        # (N, frames, bins) @ (bins, n_mels) -> (N, n_mels, frames)
+        mel = np.matmul(power, self.mel_basis.T).transpose(0, 2, 1)
+        return mel[0] if single else mel
+
+    def power_to_db(self, mel_power):
+        """
+        Converts power Mel spectrograms to dB, each relative to its own maximum
+
+        Same as librosa.power_to_db(S, ref=np.max) applied to every instance
+        of the batch separately.
+
+        Args:
+            mel_power (numpy.ndarray): Spectrograms of shape (N, n_mels, n_frames)
+
+        Returns:
+            numpy.ndarray: Mel spectrograms in dB scale
+        """
+        reduce_axes = tuple(range(1, mel_power.ndim)) if mel_power.ndim > 2 else None
+        ref = np.max(mel_power, axis=reduce_axes, keepdims=True)
+        log_spec = 10.0 * np.log10(np.maximum(self.amin, mel_power))
+        log_spec -= 10.0 * np.log10(np.maximum(self.amin, ref))
+        if self.top_db is not None:
+            log_spec = np.maximum(log_spec, np.max(log_spec, axis=reduce_axes, keepdims=True) - self.top_db)
+        return log_spec
+
+    def compute(self, signals):
+        """
+        Computes dB Mel spectrograms for a batch of equal-length signals
+
+        Args:
+            signals (numpy.ndarray): Signals of shape (N, samples) or (samples,)
+
+        Returns:
+            numpy.ndarray: Mel spectrograms in dB scale
+        """
+        return self.power_to_db(self.mel_power(signals))
+
+@lru_cache(maxsize=8)
+def get_mel_frontend(sr=SAMPLE_RATE, n_fft=N_FFT, hop_length=HOP_LENGTH, n_mels=N_MELS):
+    """
+    Returns the shared MelFrontend for a parameter set, building it on first use
+
+    Returns:
+        MelFrontend: Cached front end instance
+    """
+    return MelFrontend(sr=sr, n_fft=n_fft, hop_length=hop_length, n_mels=n_mels)
+
 def compute_mel_spectrogram(audio, sr=SAMPLE_RATE, n_fft=N_FFT, hop_length=HOP_LENGTH, n_mels=N_MELS):
     """
     Computes the Mel spectrogram and converts it to dB scale
@@ -98,11 +317,91 @@ def compute_mel_spectrogram(audio, sr=SAMPLE_RATE, n_fft=N_FFT, hop_length=HOP_L
     Returns:
         numpy.ndarray: Mel spectrogram in dB scale
     """
-    mel_spectrogram = librosa.feature.melspectrogram(
-        y=audio, sr=sr, n_fft=n_fft, hop_length=hop_length, n_mels=n_mels
-    )
-    mel_spectrogram_db = librosa.power_to_db(mel_spectrogram, ref=np.max)
-    return mel_spectrogram_db
+    frontend = get_mel_frontend(sr, n_fft, hop_length, n_mels)
+    return frontend.compute(audio)
+
+def compute_track_mel_power(audio, sr=SAMPLE_RATE, n_fft=N_FFT, hop_length=HOP_LENGTH, n_mels=N_MELS):
+    """
+    Computes the power Mel spectrogram of a whole track in a single pass
+
+    Chunk spectrograms are then sliced from it with slice_chunk_mel_db()
+    instead of running a separate STFT for every overlapping chunk, which
+    transforms each audio frame once instead of about twice.
+
+    The sliced frames differ from a per-chunk STFT in two ways:
+    - Frame alignment: chunk starts (multiples of HOP_SAMPLES_BETWEEN_CHUNKS)
+      are not multiples of hop_length, and slice_chunk_mel_power() starts
+      at frame round(start / hop_length). Every frame of a sliced chunk is
+      therefore shifted by up to hop_length / 2 samples (~12 ms) against
+      the frames a per-chunk STFT would compute.
+    - Chunk boundaries: both STFTs are centered with zero (constant)
+      padding, but for a chunk it is applied at the chunk edges. In the
+      track spectrogram the first and last n_fft / (2 * hop_length) frames
+      of a chunk also cover the neighbouring audio.
+    On 30 s excerpts the normalized model inputs differ from the per-chunk
+    pipeline by about 0.02 mean absolute error (on the [0, 1] scale);
+    single pixels at sharp onsets and at the chunk edges can differ by much
+    more.
+
+    Args:
+        audio (numpy.ndarray): Audio signal of the whole track
+        sr (int): Sample rate
+        n_fft (int): FFT window size
+        hop_length (int): Hop length for STFT
+        n_mels (int): Number of Mel bands
+
+    Returns:
+        numpy.ndarray: Power Mel spectrogram (n_mels, n_frames)
+    """
+    return get_mel_frontend(sr, n_fft, hop_length, n_mels).mel_power(audio)
+
+def slice_chunk_mel_power(track_mel_power, start_sample, chunk_samples=SAMPLES_PER_CHUNK, hop_length=HOP_LENGTH):
+    """
+    Slices one chunk's frames out of a track-level power Mel spectrogram
+
+    Args:
+        track_mel_power (numpy.ndarray): Output of compute_track_mel_power()
+        start_sample (int): First sample of the chunk in the track
+        chunk_samples (int): Number of samples per chunk
+        hop_length (int): Hop length used for the track spectrogram
+
+    Returns:
+        numpy.ndarray: Power Mel spectrogram of the chunk
+    """
+    # Same frame count as a centered STFT over chunk_samples samples
+    frames_per_chunk = 1 + chunk_samples // hop_length
+    num_frames = track_mel_power.shape[1]
+
+    start_frame = int(round(start_sample / hop_length))
+    start_frame = max(0, min(start_frame, num_frames - frames_per_chunk))
+    chunk_power = track_mel_power[:, start_frame:start_frame + frames_per_chunk]
+
+    # Only happens for tracks shorter than one chunk
+    if chunk_power.shape[1] < frames_per_chunk:
+        padding = frames_per_chunk - chunk_power.shape[1]
+        chunk_power = np.pad(chunk_power, ((0, 0), (0, padding)), mode='edge')
+
+    return chunk_power
+
+def slice_chunk_mel_db(track_mel_power, start_sample, chunk_samples=SAMPLES_PER_CHUNK, hop_length=HOP_LENGTH):
+    """
+    Slices one chunk's frames out of a track-level power Mel spectrogram and
+    converts them to dB scale
+
+    power_to_db(ref=np.max) is applied to the slice, so the reference level
+    is the chunk's own maximum exactly as in compute_mel_spectrogram().
+
+    Args:
+        track_mel_power (numpy.ndarray): Output of compute_track_mel_power()
+        start_sample (int): First sample of the chunk in the track
+        chunk_samples (int): Number of samples per chunk
+        hop_length (int): Hop length used for the track spectrogram
+
+    Returns:
+        numpy.ndarray: Mel spectrogram of the chunk in dB scale
+    """
+    chunk_power = slice_chunk_mel_power(track_mel_power, start_sample, chunk_samples, hop_length)
+    return get_mel_frontend().power_to_db(chunk_power)
 
 def normalize_spectrogram(spectrogram):
     """
@@ -145,6 +444,29 @@ def normalize_spectrogram(spectrogram):
 
     return normalized_spec
 
+def normalize_spectrograms(spectrograms):
+    """
+    Batched form of normalize_spectrogram(): instance-based Min-Max
+    normalization of every spectrogram in a (N, H, W) batch
+
+    Args:
+        spectrograms (numpy.ndarray): Spectrograms of shape (N, H, W)
+
+    Returns:
+        numpy.ndarray: Normalized spectrograms with values in [0, 1] range
+    """
+    spectrograms = np.asarray(spectrograms, dtype=np.float32)
+    spec_min = np.min(spectrograms, axis=(1, 2), keepdims=True)
+    spec_max = np.max(spectrograms, axis=(1, 2), keepdims=True)
+    spec_range = spec_max - spec_min
+
+    # Flat spectrograms (e.g., silence) are set to zeros
+    flat = spec_range <= 0
+    if np.any(flat):
+        logger.warning(f"Flat spectrograms detected in batch: {int(np.sum(flat))} of {len(spectrograms)}. Setting to zeros.")
+    normalized = (spectrograms - spec_min) / np.where(flat, 1.0, spec_range)
+    return np.where(flat, 0.0, normalized).astype(np.float32)
+
 # This function has been removed as it was adding an extra preprocessing step
 # that was not present in the training pipeline
 
@@ -158,7 +480,7 @@ def prepare_spectrogram_for_model(audio_data):
     3. Compute Mel Spectrogram (n_mels=128, n_fft=2048, hop_length=512)
     4. Convert to dB (librosa.power_to_db(ref=np.max))
     5. Resize Spectrogram ((128, 128), bilinear)
-    6. Apply the loaded scaler.transform() method
+    6. Min-max normalize the instance to [0, 1] (normalize_spectrogram, no global scaler)
     7. Reshape for model ((1, 128, 128, 1))
 
     Args:
@@ -170,15 +492,47 @@ def prepare_spectrogram_for_model(audio_data):
     # Generate Mel spectrogram
     mel_spectrogram_db = compute_mel_spectrogram(audio_data)
     logger.info(f"Generated mel spectrogram with shape {mel_spectrogram_db.shape}")
+
+    return prepare_mel_for_model(mel_spectrogram_db)
+
+def prepare_chunk_from_track_for_model(track_mel_power, start_sample):
+    """
+    Prepare one chunk's model input from a track-level power Mel spectrogram
+
+    Equivalent to prepare_spectrogram_for_model() on the chunk starting at
+    start_sample, within the tolerance documented in compute_track_mel_power().
+
+    Args:
+        track_mel_power (numpy.ndarray): Output of compute_track_mel_power()
+        start_sample (int): First sample of the chunk in the track
+
+    Returns:
+        numpy.ndarray: Spectrogram prepared for model input
+    """
+    mel_spectrogram_db = slice_chunk_mel_db(track_mel_power, start_sample)
+    logger.info(f"Sliced mel spectrogram at sample {start_sample} with shape {mel_spectrogram_db.shape}")
+
+    return prepare_mel_for_model(mel_spectrogram_db)
+
+def prepare_mel_for_model(mel_spectrogram_db):
+    """
+    Resize, normalize and reshape a dB Mel spectrogram for model input
+    (steps 5-7 of prepare_spectrogram_for_model)
+
+    Args:
+        mel_spectrogram_db (numpy.ndarray): Mel spectrogram in dB scale
+
+    Returns:
+        numpy.ndarray: Spectrogram prepared for model input
+    """
     logger.info(f"Mel spectrogram stats - min: {np.min(mel_spectrogram_db):.4f}, max: {np.max(mel_spectrogram_db):.4f}, mean: {np.mean(mel_spectrogram_db):.4f}")
 
     # Resize spectrogram to target shape
-    resized_spec = resize_spectrogram_tf(mel_spectrogram_db)
+    resized_spec = resize_spectrogram(mel_spectrogram_db)
     logger.info(f"Resized spectrogram to shape {resized_spec.shape}")
     logger.info(f"Resized spectrogram stats - min: {np.min(resized_spec):.4f}, max: {np.max(resized_spec):.4f}, mean: {np.mean(resized_spec):.4f}")
 
-    # Normalize spectrogram using the pre-trained scaler
-    # This is the ONLY scaling step needed, exactly matching the training pipeline
+    # Per-instance min-max normalization, the only scaling step in training
     normalized_spec = normalize_spectrogram(resized_spec)
     logger.info(f"Normalized spectrogram stats - min: {np.min(normalized_spec):.4f}, max: {np.max(normalized_spec):.4f}, mean: {np.mean(normalized_spec):.4f}")
 
@@ -187,3 +541,154 @@ def prepare_spectrogram_for_model(audio_data):
     logger.info(f"Final model input shape: {model_input.shape}")
 
     return model_input
+
+def prepare_spectrograms_for_model(mel_spectrograms_db):
+    """
+    Batched form of prepare_mel_for_model(): resize, normalize and reshape a
+    (N, n_mels, n_frames) batch of dB Mel spectrograms for model input
+
+    Args:
+        mel_spectrograms_db (numpy.ndarray): Mel spectrograms in dB scale
+
+    Returns:
+        numpy.ndarray: Model input batch of shape (N, H, W, 1)
+    """
+    resized_specs = resize_spectrograms(mel_spectrograms_db)
+    normalized_specs = normalize_spectrograms(resized_specs)
+    logger.info(f"Prepared spectrogram batch. Shape: {normalized_specs.shape}, min: {np.min(normalized_specs):.4f}, max: {np.max(normalized_specs):.4f}, mean: {np.mean(normalized_specs):.4f}")
+    return normalized_specs[..., np.newaxis]
+
+def prepare_chunks_for_model(chunks):
+    """
+    Prepare model inputs for a list of equal-length audio chunks in one
+    batched pass through the MelFrontend
+
+    Args:
+        chunks (list): Audio chunks of SAMPLES_PER_CHUNK samples
+
+    Returns:
+        numpy.ndarray: Model input batch of shape (N, H, W, 1)
+    """
+    mel_spectrograms_db = get_mel_frontend().compute(np.stack(chunks))
+    return prepare_spectrograms_for_model(mel_spectrograms_db)
+
+def prepare_track_chunks_for_model(track_mel_power, start_samples):
+    """
+    Prepare model inputs for several chunks sliced from a track-level power
+    Mel spectrogram in one batched pass
+
+    Args:
+        track_mel_power (numpy.ndarray): Output of compute_track_mel_power()
+        start_samples (list): First sample of each chunk in the track
+
+    Returns:
+        numpy.ndarray: Model input batch of shape (N, H, W, 1)
+    """
+    chunk_powers = np.stack([slice_chunk_mel_power(track_mel_power, start) for start in start_samples])
+    mel_spectrograms_db = get_mel_frontend().power_to_db(chunk_powers)
+    return prepare_spectrograms_for_model(mel_spectrograms_db)
+
+def prepare_chunk_batch(chunks, track_mel_power=None, indices=None):
+    """
+    Prepare model inputs for all chunks of a track as one (N, H, W, 1) batch
+
+    The whole batch goes through the MelFrontend in one vectorized pass.
+    Chunks whose input comes out non-finite are dropped, and if the batched
+    pass fails, every chunk is prepared on its own so that a single bad chunk
+    cannot fail the whole track.
+
+    Args:
+        chunks (list): Audio chunks from create_audio_chunks()
+        track_mel_power (numpy.ndarray, optional): Track-level power Mel
+            spectrogram to slice chunk frames from
+        indices (list, optional): Position of each chunk in the track,
+            when only some of a track's chunks are passed. Defaults to
+            range(len(chunks))
+
+    Returns:
+        tuple: (batch_input, chunk_indices) where chunk_indices are the
+        positions of the chunks present in batch_input
+    """
+    indices = list(range(len(chunks))) if indices is None else list(indices)
+    try:
+        if track_mel_power is not None:
+            start_samples = [i * HOP_SAMPLES_BETWEEN_CHUNKS for i in indices]
+            batch_input = prepare_track_chunks_for_model(track_mel_power, start_samples)
+        else:
+            batch_input = prepare_chunks_for_model(chunks)
+
+        valid = np.all(np.isfinite(batch_input), axis=(1, 2, 3))
+        for k in np.flatnonzero(~valid):
+            logger.error(f"Error processing chunk {indices[k]+1}: model input contains non-finite values")
+        return batch_input[valid], [indices[k] for k in np.flatnonzero(valid)]
+    except Exception as batch_error:
+        logger.error(f"Error preparing chunk batch, falling back to per-chunk preparation: {batch_error}")
+
+    chunk_inputs = []
+    chunk_indices = []
+    for i, chunk in zip(indices, chunks):
+        logger.info(f"Processing chunk {i+1}. Chunk length: {len(chunk)}")
+
+        try:
+            # Prepare spectrogram for model input
+            if track_mel_power is not None:
+                chunk_input = prepare_chunk_from_track_for_model(track_mel_power, i * HOP_SAMPLES_BETWEEN_CHUNKS)
+            else:
+                chunk_input = prepare_spectrogram_for_model(chunk)
+            logger.info(f"Prepared spectrogram for chunk {i+1}. Shape: {chunk_input.shape}")
+
+            chunk_inputs.append(chunk_input)
+            chunk_indices.append(i)
+        except Exception as chunk_error:
+            logger.error(f"Error processing chunk {i+1}: {chunk_error}")
+            import traceback
+            logger.error(traceback.format_exc())
+            # Continue with other chunks instead of failing completely
+            continue
+
+    if not chunk_inputs:
+        return None, []
+    # Stack the (1, H, W, 1) inputs into a single (N, H, W, 1) batch
+    return np.concatenate(chunk_inputs, axis=0), chunk_indices
+
+def prepare_audio_chunks_for_model(audio_data, chunks, track_mel_power=None):
+    """
+    Prepare the model input batch for the chunks of a processed track
+
+    In track-level mode (TRACK_LEVEL_MEL) the STFT/mel projection runs once
+    over the whole signal and each chunk's frames are sliced from it. Chunk i
+    then starts at i * HOP_SAMPLES_BETWEEN_CHUNKS, which only holds when the
+    audio is at least one chunk long.
+
+    Args:
+        audio_data (numpy.ndarray): Processed audio signal
+        chunks (list): Audio chunks from create_audio_chunks(audio_data)
+        track_mel_power (numpy.ndarray, optional): Already computed output of
+            compute_track_mel_power(audio_data) to reuse
+
+    Returns:
+        tuple: (batch_input, chunk_indices) as returned by prepare_chunk_batch()
+    """
+    return prepare_chunk_batch(chunks, compute_track_mel_power_if_enabled(audio_data, track_mel_power))
+
+def compute_track_mel_power_if_enabled(audio_data, track_mel_power=None):
+    """
+    Compute the track-level power Mel spectrogram when TRACK_LEVEL_MEL is on
+    and the audio is at least one chunk long
+
+    Args:
+        audio_data (numpy.ndarray): Processed audio signal
+        track_mel_power (numpy.ndarray, optional): Already computed output of
+            compute_track_mel_power(audio_data), returned instead of
+            recomputing it
+
+    Returns:
+        numpy.ndarray: Output of compute_track_mel_power(), or None
+    """
+    if not TRACK_LEVEL_MEL or len(audio_data) < SAMPLES_PER_CHUNK:
+        return None
+
+    if track_mel_power is None:
+        track_mel_power = compute_track_mel_power(audio_data)
+        logger.info(f"Computed track-level mel spectrogram with shape {track_mel_power.shape}")
+    return track_mel_power
@@ -0,0 +1,277 @@
+import io
+import threading
+import logging
+from functools import lru_cache
+import numpy as np
+from PIL import Image, ImageDraw, ImageFont
+from backend.config import SAMPLE_RATE, HOP_LENGTH
+
+logger = logging.getLogger(__name__)
+
+# Same size as the matplotlib figure it replaces (10x4 inches at 100 dpi)
+IMAGE_WIDTH = 1000
+IMAGE_HEIGHT = 400
+
+# Plot area, colorbar and text positions in pixels
+PLOT_LEFT, PLOT_TOP, PLOT_RIGHT, PLOT_BOTTOM = 70, 32, 850, 350
+COLORBAR_LEFT, COLORBAR_RIGHT = 875, 895
+TICK_LENGTH = 5
+FONT_SIZE = 12
+TITLE_FONT_SIZE = 14
+
+# The image is a palette PNG: the first NUM_COLORS entries are the colormap
+# and the last two are the background and text/line colors
+NUM_COLORS = 254
+BACKGROUND_INDEX = 254
+FOREGROUND_INDEX = 255
+BACKGROUND = (255, 255, 255)
+FOREGROUND = (0, 0, 0)
+
+# matplotlib's 'magma' (the colormap specshow picks for dB data) sampled at
+# 17 evenly spaced points; linear interpolation between them stays within
+# 4/255 of the full 256-entry table
+_MAGMA_ANCHORS = np.array([
+    [0, 0, 4], [10, 8, 34], [29, 17, 71], [54, 16, 107], [81, 18, 124], [106, 28, 129],
+    [131, 38, 129], [156, 46, 127], [183, 55, 121], [208, 65, 111], [231, 82, 99],
+    [245, 107, 92], [252, 137, 97], [254, 167, 114], [254, 196, 136], [253, 226, 163],
+    [252, 253, 191]
+], dtype=np.float64)
+
+# Frequencies labelled on the mel axis, as specshow does
+MEL_TICKS_HZ = (0, 512, 1024, 2048, 4096, 8192)
+# Candidate spacings for time ticks, in seconds
+TIME_TICK_STEPS = (0.5, 1, 2, 5, 10, 15, 30, 60, 120, 300)
+MAX_TIME_TICKS = 8
+COLORBAR_STEP_DB = 10
+
+@lru_cache(maxsize=4)
+def build_colormap_lut(num_colors=NUM_COLORS):
+    """
+    Build the RGB lookup table for the spectrogram colormap
+
+    Args:
+        num_colors (int): Number of entries in the table
+
+    Returns:
+        numpy.ndarray: uint8 array of shape (num_colors, 3), read-only
+    """
+    anchor_positions = np.linspace(0.0, 1.0, len(_MAGMA_ANCHORS))
+    positions = np.linspace(0.0, 1.0, num_colors)
+    lut = np.stack([np.interp(positions, anchor_positions, _MAGMA_ANCHORS[:, c]) for c in range(3)], axis=1)
+    lut = np.round(lut).astype(np.uint8)
+    lut.setflags(write=False)
+    return lut
+
+@lru_cache(maxsize=1)
+def _palette():
+    """Flat PNG palette: the colormap followed by background and foreground."""
+    colors = np.vstack([build_colormap_lut(), [BACKGROUND, FOREGROUND]]).astype(np.uint8)
+    return colors.ravel().tobytes()
+
+# FreeType faces are not safe to share between threads, so each thread
+# loads its own fonts
+_fonts = threading.local()
+
+def _get_fonts():
+    if not hasattr(_fonts, 'label'):
+        try:
+            _fonts.label = ImageFont.load_default(size=FONT_SIZE)
+            _fonts.title = ImageFont.load_default(size=TITLE_FONT_SIZE)
+        except TypeError:
+            # Pillow < 10.1 only has the fixed-size bitmap font
+            _fonts.label = _fonts.title = ImageFont.load_default()
+    return _fonts.label, _fonts.title
+
+def _hz_to_mel(frequencies):
+    """Slaney mel scale, as used by librosa's mel filterbank and axes."""
+    frequencies = np.asarray(frequencies, dtype=np.float64)
+    f_sp = 200.0 / 3
+    min_log_hz = 1000.0
+    min_log_mel = min_log_hz / f_sp
+    logstep = np.log(6.4) / 27.0
+    mels = frequencies / f_sp
+    log_region = frequencies >= min_log_hz
+    mels = np.where(log_region, min_log_mel + np.log(np.maximum(frequencies, min_log_hz) / min_log_hz) / logstep, mels)
+    return mels
+
+def _format_time(seconds):
+    minutes, secs = divmod(seconds, 60)
+    if float(secs).is_integer():
+        return f"{int(minutes)}:{int(secs):02d}"
+    return f"{int(minutes)}:{secs:04.1f}"
+
+def _time_ticks(duration):
+    step = next((s for s in TIME_TICK_STEPS if duration / s <= MAX_TIME_TICKS), TIME_TICK_STEPS[-1])
+    return np.arange(0.0, duration + 1e-9, step)
+
+def _draw_text(draw, xy, text, font, align_x='left', align_y='top'):
+    """Draw text positioned by its bounding box (works for bitmap fonts too)."""
+    left, top, right, bottom = draw.textbbox((0, 0), text, font=font)
+    x, y = xy
+    if align_x == 'center':
+        x -= (right - left) / 2
+    elif align_x == 'right':
+        x -= right - left
+    if align_y == 'center':
+        y -= (bottom - top) / 2
+    elif align_y == 'bottom':
+        y -= bottom - top
+    draw.text((x - left, y - top), text, fill=FOREGROUND_INDEX, font=font)
+
+def spectrogram_color_indices(mel_spectrogram_db, width, height, vmin=None, vmax=None):
+    """
+    Map a dB Mel spectrogram to colormap indices at the given pixel size
+
+    Values are quantized to NUM_COLORS levels at the data's own resolution
+    and then scaled to width x height by nearest-neighbour sampling, with
+    low frequencies at the bottom.
+
+    Args:
+        mel_spectrogram_db (numpy.ndarray): Mel spectrogram (n_mels, n_frames)
+        width (int): Output width in pixels
+        height (int): Output height in pixels
+        vmin (float, optional): dB value mapped to the first color. Defaults
+            to the minimum of the data
+        vmax (float, optional): dB value mapped to the last color. Defaults
+            to the maximum of the data
+
+    Returns:
+        numpy.ndarray: uint8 array of shape (height, width); build_colormap_lut()
+        turns it into RGB
+    """
+    spec = np.asarray(mel_spectrogram_db, dtype=np.float32)
+    vmin = float(np.min(spec)) if vmin is None else vmin
+    vmax = float(np.max(spec)) if vmax is None else vmax
+
+    scale = (NUM_COLORS - 1) / (vmax - vmin) if vmax > vmin else 0.0
+    levels = np.clip((spec - vmin) * scale, 0, NUM_COLORS - 1).astype(np.uint8)
+
+    n_mels, n_frames = spec.shape
+    rows = (n_mels - 1) - (np.arange(height) * n_mels) // height
+    cols = (np.arange(width) * n_frames) // width
+    return levels.take(rows, axis=0).take(cols, axis=1)
+
+@lru_cache(maxsize=32)
+def _decorations(duration, vmin, vmax, sr, title):
+    """
+    Draw everything except the spectrogram itself: frame, ticks, labels,
+    colorbar and title
+
+    Depends only on the axis ranges, so it is drawn once per layout and
+    reused (read-only) by every render with the same ranges.
+
+    Returns:
+        numpy.ndarray: uint8 palette-index canvas (IMAGE_HEIGHT, IMAGE_WIDTH)
+    """
+    plot_width, plot_height = PLOT_RIGHT - PLOT_LEFT, PLOT_BOTTOM - PLOT_TOP
+    image = Image.new('L', (IMAGE_WIDTH, IMAGE_HEIGHT), BACKGROUND_INDEX)
+    draw = ImageDraw.Draw(image)
+    # Palette indices are not intensities, so text must not be antialiased
+    draw.fontmode = '1'
+    label_font, title_font = _get_fonts()
+
+    draw.rectangle([PLOT_LEFT - 1, PLOT_TOP - 1, PLOT_RIGHT, PLOT_BOTTOM], outline=FOREGROUND_INDEX)
+    draw.rectangle([COLORBAR_LEFT - 1, PLOT_TOP - 1, COLORBAR_RIGHT, PLOT_BOTTOM], outline=FOREGROUND_INDEX)
+
+    # Time axis
+    for t in _time_ticks(duration):
+        x = PLOT_LEFT + int(round(t / duration * (plot_width - 1))) if duration > 0 else PLOT_LEFT
+        draw.line([x, PLOT_BOTTOM, x, PLOT_BOTTOM + TICK_LENGTH], fill=FOREGROUND_INDEX)
+        _draw_text(draw, (x, PLOT_BOTTOM + TICK_LENGTH + 2), _format_time(t), label_font, align_x='center')
+    _draw_text(draw, ((PLOT_LEFT + PLOT_RIGHT) / 2, IMAGE_HEIGHT - 4), 'Time', label_font,
+               align_x='center', align_y='bottom')
+
+    # Mel axis, labelled in Hz at mel-scaled positions
+    mel_max = float(_hz_to_mel(sr / 2.0))
+    for hz in MEL_TICKS_HZ:
+        if hz > sr / 2.0:
+            continue
+        y = PLOT_BOTTOM - 1 - int(round(float(_hz_to_mel(hz)) / mel_max * (plot_height - 1)))
+        draw.line([PLOT_LEFT - 1 - TICK_LENGTH, y, PLOT_LEFT - 1, y], fill=FOREGROUND_INDEX)
+        _draw_text(draw, (PLOT_LEFT - TICK_LENGTH - 4, y), str(hz), label_font, align_x='right', align_y='center')
+    _draw_text(draw, (8, (PLOT_TOP + PLOT_BOTTOM) / 2), 'Hz', label_font, align_y='center')
+
+    # Colorbar ticks every COLORBAR_STEP_DB dB
+    if vmax > vmin:
+        first = np.ceil(vmin / COLORBAR_STEP_DB) * COLORBAR_STEP_DB
+        for db in np.arange(first, vmax + 1e-6, COLORBAR_STEP_DB):
+            y = PLOT_BOTTOM - 1 - int(round((db - vmin) / (vmax - vmin) * (plot_height - 1)))
+            draw.line([COLORBAR_RIGHT, y, COLORBAR_RIGHT + TICK_LENGTH, y], fill=FOREGROUND_INDEX)
+            _draw_text(draw, (COLORBAR_RIGHT + TICK_LENGTH + 3, y), f"{db:+.0f} dB", label_font, align_y='center')
+
+    _draw_text(draw, ((PLOT_LEFT + PLOT_RIGHT) / 2, 8), title, title_font, align_x='center')
+
+    canvas = np.array(image)
+    # Colorbar: every colormap entry, highest value at the top
+    levels = np.round((NUM_COLORS - 1) * (1.0 - np.arange(plot_height) / max(plot_height - 1, 1)))
+    canvas[PLOT_TOP:PLOT_BOTTOM, COLORBAR_LEFT:COLORBAR_RIGHT] = levels.astype(np.uint8)[:, np.newaxis]
+    canvas.setflags(write=False)
+    return canvas
+
+def render_spectrogram_image(mel_spectrogram_db, sr=SAMPLE_RATE, hop_length=HOP_LENGTH, title='Mel Spectrogram'):
+    """
+    Render a dB Mel spectrogram with time/mel axes and a dB colorbar
+
+    Produces the same layout as librosa.display.specshow(x_axis='time',
+    y_axis='mel') with a colorbar and title, without matplotlib: the data is
+    quantized to colormap indices and written into a palette image whose
+    palette is the colormap lookup table. The decorations are drawn with
+    Pillow once per axis layout and cached. Nothing mutable is shared
+    between calls, so it can run from several threads at once.
+
+    Args:
+        mel_spectrogram_db (numpy.ndarray): Mel spectrogram (n_mels, n_frames)
+        sr (int): Sample rate of the audio
+        hop_length (int): Hop length of the spectrogram frames
+        title (str): Title drawn above the plot
+
+    Returns:
+        PIL.Image.Image: Palette ('P') image of IMAGE_WIDTH x IMAGE_HEIGHT pixels
+    """
+    spec = np.asarray(mel_spectrogram_db, dtype=np.float32)
+    # Rounded so that tracks with the same ranges share cached decorations
+    vmin, vmax = round(float(np.min(spec)), 1), round(float(np.max(spec)), 1)
+    duration = round(spec.shape[1] * hop_length / sr, 3)
+
+    canvas = _decorations(duration, vmin, vmax, sr, title).copy()
+    canvas[PLOT_TOP:PLOT_BOTTOM, PLOT_LEFT:PLOT_RIGHT] = spectrogram_color_indices(
+        spec, PLOT_RIGHT - PLOT_LEFT, PLOT_BOTTOM - PLOT_TOP, vmin, vmax
+    )
+
+    image = Image.fromarray(canvas)
+    image.putpalette(_palette())
+    return image
+
+def encode_png(image, compress_level=1):
+    """
+    Encode an image as PNG
+
+    Args:
+        image (PIL.Image.Image): Image to encode
+        compress_level (int): zlib level; 1 is several times faster than
+            Pillow's default of 6 for a slightly larger file
+
+    Returns:
+        bytes: PNG file contents
+    """
+    buffer = io.BytesIO()
+    image.save(buffer, format='PNG', compress_level=compress_level)
+    return buffer.getvalue()
+
+def render_spectrogram_png(mel_spectrogram_db, image_path, sr=SAMPLE_RATE, hop_length=HOP_LENGTH):
+    """
+    Render a dB Mel spectrogram and write it as a PNG file
+
+    Args:
+        mel_spectrogram_db (numpy.ndarray): Mel spectrogram (n_mels, n_frames)
+        image_path (str): Output path
+        sr (int): Sample rate of the audio
+        hop_length (int): Hop length of the spectrogram frames
+
+    Returns:
+        str: image_path
+    """
+    png = encode_png(render_spectrogram_image(mel_spectrogram_db, sr=sr, hop_length=hop_length))
+    with open(image_path, 'wb') as f:
+        f.write(png)
+    return image_path
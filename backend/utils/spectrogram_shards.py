@@ -0,0 +1,251 @@
+import os
+import json
+import shutil
+import logging
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+# Packed dataset layout: a directory of shard files holding the raw array
+# bytes back to back, plus index.json with each item's shard, byte offset,
+# shape and genre. Written by ShardWriter, read by ShardReader.
+INDEX_NAME = 'index.json'
+INDEX_VERSION = 1
+SHARD_DTYPES = ('float32', 'float16')
+# Item offsets are aligned so every view starts on a cache line
+ALIGNMENT = 64
+
+def _shard_name(number):
+    return f"shard-{number:05d}.bin"
+
+class ShardWriter:
+    """
+    Packs arrays into large shard files with an offset/shape/genre index
+
+    Arrays are converted to the dataset dtype and appended to the current
+    shard, which is closed once it reaches shard_size_bytes. Everything is
+    written into a temporary directory that replaces output_dir on close(),
+    so readers only ever see a complete dataset. Use as a context manager;
+    leaving it through an exception discards the partial output.
+    """
+    def __init__(self, output_dir, dtype='float32', shard_size_bytes=256 * 1024 ** 2, metadata=None):
+        if dtype not in SHARD_DTYPES:
+            raise ValueError(f"Unsupported shard dtype: {dtype} (expected one of {', '.join(SHARD_DTYPES)})")
+        self.output_dir = str(output_dir)
+        self.dtype = np.dtype(dtype)
+        self.shard_size_bytes = shard_size_bytes
+        self.metadata = metadata or {}
+        self._tmp_dir = f"{self.output_dir.rstrip(os.sep)}.{os.getpid()}.tmp"
+        self._items = []
+        self._genres = []
+        self._genre_ids = {}
+        self._shards = []
+        self._file = None
+        self._offset = 0
+
+        shutil.rmtree(self._tmp_dir, ignore_errors=True)
+        os.makedirs(self._tmp_dir)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        if exc_type is None:
+            self.close()
+        else:
+            self.abort()
+        return False
+
+    def __len__(self):
+        return len(self._items)
+
+    def _open_shard(self):
+        name = _shard_name(len(self._shards))
+        self._shards.append(name)
+        self._file = open(os.path.join(self._tmp_dir, name), 'wb')
+        self._offset = 0
+
+    def add(self, array, genre, key=None):
+        """
+        Append one array
+
+        Args:
+            array (numpy.ndarray): Data of any shape
+            genre (str): Label of the item
+            key (str, optional): Identifier such as the source file
+
+        Returns:
+            int: Index of the item
+        """
+        data = np.ascontiguousarray(array, dtype=self.dtype)
+        if self._file is None or (self._offset > 0 and self._offset + data.nbytes > self.shard_size_bytes):
+            if self._file is not None:
+                self._file.close()
+            self._open_shard()
+
+        padding = -self._offset % ALIGNMENT
+        if padding:
+            self._file.write(b'\0' * padding)
+            self._offset += padding
+        self._file.write(data.tobytes())
+
+        if genre not in self._genre_ids:
+            self._genre_ids[genre] = len(self._genres)
+            self._genres.append(genre)
+        self._items.append({
+            'shard': len(self._shards) - 1,
+            'offset': self._offset,
+            'shape': list(data.shape),
+            'genre': self._genre_ids[genre],
+            'key': key,
+        })
+        self._offset += data.nbytes
+        return len(self._items) - 1
+
+    def close(self):
+        """Write the index and move the dataset into place."""
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+        index = {
+            'version': INDEX_VERSION,
+            'dtype': self.dtype.name,
+            'shards': self._shards,
+            'genres': self._genres,
+            'items': self._items,
+            'metadata': self.metadata,
+        }
+        with open(os.path.join(self._tmp_dir, INDEX_NAME), 'w') as f:
+            json.dump(index, f, separators=(',', ':'))
+
+        old_dir = f"{self.output_dir.rstrip(os.sep)}.{os.getpid()}.old"
+        if os.path.exists(self.output_dir):
+            os.replace(self.output_dir, old_dir)
+        os.replace(self._tmp_dir, self.output_dir)
+        shutil.rmtree(old_dir, ignore_errors=True)
+        logger.info(f"Wrote {len(self._items)} items in {len(self._shards)} shards to {self.output_dir}")
+
+    def abort(self):
+        """Discard everything written so far."""
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+        shutil.rmtree(self._tmp_dir, ignore_errors=True)
+
+class ShardReader:
+    """
+    Read-only access to a packed dataset written by ShardWriter
+
+    Every shard is memory-mapped once; items are returned as zero-copy
+    views into the mapping, so reading touches only the pages used and no
+    file is opened per item.
+    """
+    def __init__(self, dataset_dir):
+        self.dataset_dir = str(dataset_dir)
+        with open(os.path.join(self.dataset_dir, INDEX_NAME), 'r') as f:
+            index = json.load(f)
+        if index.get('version') != INDEX_VERSION:
+            raise ValueError(f"Unsupported shard index version: {index.get('version')}")
+
+        self.dtype = np.dtype(index['dtype'])
+        self.genres = index['genres']
+        self.metadata = index.get('metadata', {})
+        self._shard_names = index['shards']
+        self._maps = [None] * len(self._shard_names)
+        items = index['items']
+        self._shard = np.array([item['shard'] for item in items], dtype=np.int32)
+        self._offset = np.array([item['offset'] for item in items], dtype=np.int64)
+        self._shapes = [tuple(item['shape']) for item in items]
+        self._genre = np.array([item['genre'] for item in items], dtype=np.int32)
+        self.keys = [item['key'] for item in items]
+
+    def __len__(self):
+        return len(self._shapes)
+
+    def _map(self, shard):
+        if self._maps[shard] is None:
+            path = os.path.join(self.dataset_dir, self._shard_names[shard])
+            self._maps[shard] = np.memmap(path, dtype=np.uint8, mode='r')
+        return self._maps[shard]
+
+    def __getitem__(self, i):
+        """
+        Item i as a read-only view into its memory-mapped shard
+
+        Args:
+            i (int): Item index
+
+        Returns:
+            numpy.ndarray: Array of the stored shape and dataset dtype
+        """
+        if not -len(self) <= i < len(self):
+            raise IndexError(f"Item index {i} out of range for {len(self)} items")
+        i = i % len(self)
+        shape = self._shapes[i]
+        nbytes = int(np.prod(shape, dtype=np.int64)) * self.dtype.itemsize
+        start = int(self._offset[i])
+        return self._map(int(self._shard[i]))[start:start + nbytes].view(self.dtype).reshape(shape)
+
+    def genre(self, i):
+        """Genre of item i."""
+        return self.genres[self._genre[i]]
+
+    def genre_ids(self):
+        """
+        Genre of every item as an index into self.genres
+
+        Returns:
+            numpy.ndarray: int32 genre ids in item order
+        """
+        return self._genre.copy()
+
+    def shape(self, i):
+        """Shape of item i, without touching its data."""
+        return self._shapes[i]
+
+    @property
+    def num_shards(self):
+        """Number of shard files."""
+        return len(self._shard_names)
+
+    def shard_indices(self, shard):
+        """
+        Indices of the items stored in a shard
+
+        Args:
+            shard (int): Shard number
+
+        Returns:
+            numpy.ndarray: Item indices in storage (file offset) order
+        """
+        return np.flatnonzero(self._shard == shard)
+
+    def indices(self, genre):
+        """
+        Indices of the items of a genre
+
+        Args:
+            genre (str): Genre name
+
+        Returns:
+            numpy.ndarray: Item indices in storage order
+        """
+        if genre not in self.genres:
+            return np.array([], dtype=np.int64)
+        return np.flatnonzero(self._genre == self.genres.index(genre))
+
+    def by_genre(self, genre):
+        """
+        Views of every item of a genre
+
+        Args:
+            genre (str): Genre name
+
+        Returns:
+            list: Arrays in storage order
+        """
+        return [self[int(i)] for i in self.indices(genre)]
+
+    def close(self):
+        """Drop the shard mappings; views handed out keep theirs alive."""
+        self._maps = [None] * len(self._shard_names)
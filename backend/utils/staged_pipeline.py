@@ -0,0 +1,231 @@
+import io
+import math
+import queue
+import logging
+import multiprocessing
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor
+from multiprocessing import shared_memory
+import numpy as np
+from backend.config import SAMPLE_RATE, DURATION, SAMPLES_PER_CHUNK, HOP_SAMPLES_BETWEEN_CHUNKS, TARGET_SHAPE
+from backend.utils.metrics import stage_timer
+
+logger = logging.getLogger(__name__)
+
+class SharedRingBuffer:
+    """
+    Fixed-size slots of float32 arrays in one multiprocessing.shared_memory block
+
+    The owning process hands out slot indices with acquire()/release(); worker
+    processes attach to the block by name and read or write a slot in place,
+    so arrays move between stages without being pickled. acquire() blocks
+    while every slot is in use, which bounds the work in flight.
+    """
+    def __init__(self, num_slots, slot_shape, dtype=np.float32):
+        self.num_slots = num_slots
+        self.slot_shape = tuple(slot_shape)
+        self.dtype = np.dtype(dtype)
+        size = num_slots * int(np.prod(self.slot_shape)) * self.dtype.itemsize
+        self._shm = shared_memory.SharedMemory(create=True, size=size)
+        self.array = np.ndarray((num_slots,) + self.slot_shape, dtype=self.dtype, buffer=self._shm.buf)
+        self._free = queue.Queue()
+        for slot in range(num_slots):
+            self._free.put(slot)
+
+    @property
+    def spec(self):
+        """Picklable description used by worker processes to attach."""
+        return (self._shm.name, self.num_slots, self.slot_shape, self.dtype.str)
+
+    def acquire(self, timeout=None):
+        """
+        Reserve a free slot
+
+        Returns:
+            int: Slot index
+        """
+        return self._free.get(timeout=timeout)
+
+    def release(self, slot):
+        """Return a slot to the free list."""
+        self._free.put(slot)
+
+    def close(self):
+        """Release and destroy the shared memory block."""
+        self.array = None
+        self._shm.close()
+        self._shm.unlink()
+
+# Worker-process cache of attached ring buffers, keyed by shared memory name
+_attached = {}
+
+def _attach(spec):
+    name, num_slots, slot_shape, dtype = spec
+    if name not in _attached:
+        shm = shared_memory.SharedMemory(name=name)
+        _attached[name] = (shm, np.ndarray((num_slots,) + tuple(slot_shape), dtype=np.dtype(dtype), buffer=shm.buf))
+    return _attached[name][1]
+
+def _decode_stage(audio_ring_spec, audio_slot, file_path):
+    """Decode file_path (or encoded bytes) into an audio ring slot and return the sample count."""
+    from backend.utils.audio_processor import process_audio
+
+    audio = process_audio(io.BytesIO(file_path) if isinstance(file_path, bytes) else file_path)
+    ring = _attach(audio_ring_spec)
+    ring[audio_slot, :len(audio)] = audio
+    return len(audio)
+
+def _mel_stage(audio_ring_spec, audio_slot, num_samples, spec_ring_spec, spec_slot, spectrogram_name=None):
+    """
+    Turn an audio ring slot into a model input batch in a spectrogram ring slot
+
+    Returns:
+        tuple: (chunk_indices, spectrogram_filename or None)
+    """
+    from backend.utils.audio_processor import create_audio_chunks
+    from backend.utils.spectrogram_generator import (
+        prepare_audio_chunks_for_model, compute_track_mel_power, save_spectrogram_data
+    )
+
+    audio = _attach(audio_ring_spec)[audio_slot, :num_samples]
+    chunks = create_audio_chunks(audio)
+    if not chunks:
+        raise ValueError("No valid audio chunks could be created")
+
+    # One STFT serves both the stored spectrogram and the model input
+    track_mel_power = compute_track_mel_power(audio) if spectrogram_name is not None else None
+    batch_input, chunk_indices = prepare_audio_chunks_for_model(audio, chunks, track_mel_power)
+    if chunk_indices:
+        _attach(spec_ring_spec)[spec_slot, :len(chunk_indices)] = batch_input
+
+    spectrogram_filename = None
+    if spectrogram_name is not None:
+        spectrogram_filename = save_spectrogram_data(track_mel_power, spectrogram_name)
+    return chunk_indices, spectrogram_filename
+
+def max_chunks_per_track(duration=DURATION, sample_rate=SAMPLE_RATE):
+    """Number of chunks create_audio_chunks() yields for a processed track."""
+    num_samples = duration * sample_rate
+    return max(1, int(math.floor((num_samples - SAMPLES_PER_CHUNK) / HOP_SAMPLES_BETWEEN_CHUNKS)) + 1)
+
+class StagedPipeline:
+    """
+    Decode -> mel -> inference pipeline with a process pool per CPU stage
+
+    Decoding (process_audio) and mel/resize/normalize work run in separate
+    process pools so they are not serialized by the GIL; inference runs in the
+    calling process through the given predictor (the model or an
+    InferenceDispatcher). Decoded audio and spectrogram batches are handed
+    between stages through SharedRingBuffer slots, and max_in_flight bounds
+    how many tracks are between stages at once. With early_exit, the
+    prepared chunks are evaluated in rounds through evaluate_chunks_adaptive()
+    as on the in-process path, so only the forward passes are saved.
+
+    The pools are created once the server process already runs TensorFlow
+    and several threads, where fork() can leave a child stuck on a lock held
+    by another thread at fork time. Workers are therefore started through a
+    forkserver by default (a clean single-threaded process that preloads
+    this module); like 'spawn', it imports the entry script in every worker,
+    which must keep its start-up code under `if __name__ == '__main__'`.
+    """
+    def __init__(self, predictor, decode_workers=2, mel_workers=2, max_in_flight=8, start_method='forkserver',
+                 early_exit=False):
+        self.predictor = predictor
+        self.early_exit = early_exit
+        context = multiprocessing.get_context(start_method)
+        if start_method == 'forkserver':
+            context.set_forkserver_preload([__name__])
+        self.audio_ring = SharedRingBuffer(max_in_flight, (SAMPLE_RATE * DURATION,))
+        self.spec_ring = SharedRingBuffer(max_in_flight, (max_chunks_per_track(),) + tuple(TARGET_SHAPE) + (1,))
+        self._decode_pool = ProcessPoolExecutor(max_workers=decode_workers, mp_context=context)
+        self._mel_pool = ProcessPoolExecutor(max_workers=mel_workers, mp_context=context)
+        self._drivers = ThreadPoolExecutor(max_workers=max_in_flight, thread_name_prefix='pipeline-driver')
+
+        # Start every worker now rather than on the first uploads
+        for pool, workers in ((self._decode_pool, decode_workers), (self._mel_pool, mel_workers)):
+            for future in [pool.submit(int) for _ in range(workers)]:
+                future.result()
+
+    def submit(self, file_path, spectrogram_name=None):
+        """
+        Queue a file for classification
+
+        Args:
+            file_path (str or bytes): Path to the audio file, or its encoded
+                content (copied to the decode worker instead of re-read from disk)
+            spectrogram_name (str, optional): If given, the mel stage also
+                stores the spectrogram data under this name
+
+        Returns:
+            concurrent.futures.Future: Resolves to the result of classify()
+        """
+        return self._drivers.submit(self._classify, file_path, spectrogram_name)
+
+    def classify(self, file_path, spectrogram_name=None):
+        """
+        Classify a file through all stages
+
+        Args:
+            file_path (str or bytes): Path to the audio file, or its encoded content
+            spectrogram_name (str, optional): Name to store the spectrogram under
+
+        Returns:
+            dict: 'genre', 'confidence', 'spectrogram' and 'chunks' used
+        """
+        return self.submit(file_path, spectrogram_name).result()
+
+    def _classify(self, file_path, spectrogram_name):
+        from backend.models.model_loader import average_chunk_predictions, predict_chunks, evaluate_chunks_adaptive
+
+        audio_slot = self.audio_ring.acquire()
+        spec_slot = None
+        try:
+            # Worker processes record into their own copy of the metrics, so
+            # the stages are timed here (including the wait for a worker);
+            # 'mel' covers the whole worker stage, resizing included
+            with stage_timer('decode'):
+                num_samples = self._decode_pool.submit(
+                    _decode_stage, self.audio_ring.spec, audio_slot, file_path
+                ).result()
+
+            spec_slot = self.spec_ring.acquire()
+            with stage_timer('mel'):
+                chunk_indices, spectrogram_filename = self._mel_pool.submit(
+                    _mel_stage, self.audio_ring.spec, audio_slot, num_samples,
+                    self.spec_ring.spec, spec_slot, spectrogram_name
+                ).result()
+            self.audio_ring.release(audio_slot)
+            audio_slot = None
+
+            used_indices, batch_predictions = chunk_indices, []
+            if chunk_indices:
+                batch_input = self.spec_ring.array[spec_slot, :len(chunk_indices)]
+                if self.early_exit:
+                    # Rounds pick rows of the prepared batch, in spread order
+                    def prepare_round(rows):
+                        return batch_input[rows], [chunk_indices[row] for row in rows]
+                    used_indices, batch_predictions, _ = evaluate_chunks_adaptive(
+                        self.predictor, len(chunk_indices), prepare_round
+                    )
+                else:
+                    batch_predictions = predict_chunks(self.predictor, batch_input)
+            genre, confidence = average_chunk_predictions(used_indices, batch_predictions)
+        finally:
+            if audio_slot is not None:
+                self.audio_ring.release(audio_slot)
+            if spec_slot is not None:
+                self.spec_ring.release(spec_slot)
+
+        return {
+            'genre': genre,
+            'confidence': confidence,
+            'spectrogram': spectrogram_filename,
+            'chunks': len(used_indices)
+        }
+
+    def close(self):
+        """Shut down the worker pools and free the shared memory."""
+        self._drivers.shutdown(wait=True)
+        self._decode_pool.shutdown(wait=True)
+        self._mel_pool.shutdown(wait=True)
+        self.audio_ring.close()
+        self.spec_ring.close()
@@ -0,0 +1,87 @@
+import os
+import time
+import logging
+import tempfile
+import numpy as np
+from backend.config import SAMPLE_RATE, DURATION
+
+logger = logging.getLogger(__name__)
+
+def synthetic_track(duration=DURATION, sample_rate=SAMPLE_RATE, seed=0):
+    """
+    Build a synthetic track to warm up the serving path with
+
+    A few tones plus noise, so that every stage sees realistic,
+    non-degenerate input (silence would take the flat-spectrogram shortcuts).
+
+    Args:
+        duration (float): Length in seconds
+        sample_rate (int): Sample rate
+        seed (int): Seed for the noise
+
+    Returns:
+        numpy.ndarray: float32 audio signal
+    """
+    t = np.arange(int(duration * sample_rate)) / sample_rate
+    rng = np.random.RandomState(seed)
+    audio = sum(0.1 * np.sin(2 * np.pi * f * t) for f in (110.0, 440.0, 1760.0))
+    audio = audio + 0.02 * rng.randn(len(t))
+    return audio.astype(np.float32)
+
+def warm_up(predictor, pipeline=None):
+    """
+    Run the whole serving path once on a synthetic track
+
+    Decodes a synthetic wav file with process_audio(), computes the track
+    mel spectrogram, prepares the chunk batch (resize and normalize), runs
+    the forward pass and renders the spectrogram image. This imports the
+    heavy libraries and pays one-off costs (graph tracing, numba/FFT plan
+    setup, font loading) before real requests arrive.
+
+    Args:
+        predictor: The model, or an InferenceDispatcher wrapping it
+        pipeline (StagedPipeline, optional): Also classify the track through
+            the pipeline to warm up its worker processes
+
+    Returns:
+        dict: Seconds spent in each stage
+    """
+    import soundfile as sf
+    from backend.utils.audio_processor import process_audio, create_audio_chunks
+    from backend.utils.spectrogram_generator import (
+        compute_track_mel_power, prepare_audio_chunks_for_model, get_mel_frontend
+    )
+    from backend.utils.spectrogram_renderer import render_spectrogram_image, encode_png
+
+    timings = {}
+
+    def timed(stage, fn, *args, **kwargs):
+        start = time.perf_counter()
+        result = fn(*args, **kwargs)
+        timings[stage] = time.perf_counter() - start
+        return result
+
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, 'warmup.wav')
+        sf.write(path, synthetic_track(), SAMPLE_RATE)
+
+        audio = timed('decode', process_audio, path)
+        track_mel_power = timed('mel', compute_track_mel_power, audio)
+        batch_input, chunk_indices = timed(
+            'prepare', prepare_audio_chunks_for_model, audio, create_audio_chunks(audio), track_mel_power
+        )
+        if not chunk_indices:
+            raise ValueError("Warm-up track produced no model inputs")
+
+        # Full track batch, then a single chunk as early exit sends
+        timed('predict', predictor.predict, batch_input, batch_size=len(chunk_indices), verbose=0)
+        timed('predict_single', predictor.predict, batch_input[:1], batch_size=1, verbose=0)
+
+        mel_db = get_mel_frontend().power_to_db(track_mel_power)
+        timed('render', lambda: encode_png(render_spectrogram_image(mel_db)))
+
+        if pipeline is not None:
+            timed('pipeline', pipeline.classify, path)
+
+    logger.info("Warm-up finished: " + ", ".join(f"{stage} {seconds * 1000:.0f} ms" for stage, seconds in timings.items()))
+    return timings
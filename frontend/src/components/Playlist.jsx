@@ -25,7 +25,7 @@ const Playlist = () => {
   }, [])
   
   const handlePlayTrack = (track) => {
-    setCurrentTrack(`/api/audio/${track}`)
+    setCurrentTrack(`/api/audio/${track}/preview`)
   }
   
   if (loading) {
@@ -0,0 +1,106 @@
+#!/usr/bin/env python3
+"""
+Benchmark bounded decoding (process_audio) against decoding the whole file.
+
+Writes synthetic tracks of several lengths as wav and mp3, then times both
+strategies and records their peak Python-allocated memory:
+  full     librosa.load of the entire file, then trim to DURATION seconds
+           (what process_audio did before it decoded only the window)
+  bounded  process_audio, which only decodes the first DURATION seconds
+"""
+
+import os
+import sys
+import json
+import time
+import argparse
+import tempfile
+import tracemalloc
+
+import numpy as np
+import soundfile as sf
+import librosa
+
+# Make the backend package importable when run from the scripts directory
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from backend.config import SAMPLE_RATE, DURATION, MONO
+from backend.utils.audio_processor import process_audio
+
+def decode_full(file_path):
+    """Decode the whole file and keep the first DURATION seconds."""
+    y, _ = librosa.load(file_path, sr=SAMPLE_RATE, mono=MONO)
+    return y[:SAMPLE_RATE * DURATION]
+
+def measure(fn, file_path, repeats):
+    """
+    Run fn(file_path) repeatedly
+
+    Returns:
+        tuple: (best wall time in seconds, peak traced memory in MiB)
+    """
+    timings = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        fn(file_path)
+        timings.append(time.perf_counter() - start)
+
+    tracemalloc.start()
+    fn(file_path)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return min(timings), peak / (1024 * 1024)
+
+def write_track(directory, seconds, file_format, source_rate):
+    """Write a synthetic stereo track and return its path."""
+    rng = np.random.RandomState(seconds)
+    t = np.arange(int(seconds * source_rate)) / source_rate
+    mono = 0.2 * np.sin(2 * np.pi * 440.0 * t) + 0.05 * rng.randn(len(t))
+    stereo = np.stack([mono, np.roll(mono, 100)], axis=1).astype(np.float32)
+    path = os.path.join(directory, f"track_{seconds}s.{file_format}")
+    sf.write(path, stereo, source_rate)
+    return path
+
+def main(args):
+    results = []
+    with tempfile.TemporaryDirectory() as directory:
+        for file_format in args.formats:
+            for seconds in args.lengths:
+                path = write_track(directory, seconds, file_format, args.source_rate)
+                # Warm up librosa/numba and the resampler before timing
+                process_audio(path)
+
+                full_time, full_mem = measure(decode_full, path, args.repeats)
+                bounded_time, bounded_mem = measure(process_audio, path, args.repeats)
+                results.append({
+                    'format': file_format,
+                    'track_seconds': seconds,
+                    'full_s': full_time,
+                    'bounded_s': bounded_time,
+                    'speedup': full_time / bounded_time if bounded_time else None,
+                    'full_peak_mib': full_mem,
+                    'bounded_peak_mib': bounded_mem,
+                })
+
+    print(f"{'format':<7}{'track':>8}{'full s':>10}{'bounded s':>11}{'speedup':>9}{'full MiB':>10}{'bounded MiB':>13}")
+    for r in results:
+        print(f"{r['format']:<7}{r['track_seconds']:>7}s{r['full_s']:>10.3f}{r['bounded_s']:>11.3f}"
+              f"{r['speedup']:>8.1f}x{r['full_peak_mib']:>10.1f}{r['bounded_peak_mib']:>13.1f}")
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(results, f, indent=2)
+        print(f"Results written to: {args.output}")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark bounded audio decoding against full-file decoding.")
+    parser.add_argument("--lengths", type=int, nargs='+', default=[30, 120, 360],
+                        help="Synthetic track lengths in seconds. Default: 30 120 360")
+    parser.add_argument("--formats", nargs='+', default=['wav', 'mp3'], choices=['wav', 'mp3'],
+                        help="File formats to benchmark. Default: wav mp3")
+    parser.add_argument("--source-rate", type=int, default=44100, help="Sample rate of the synthetic files. Default: 44100")
+    parser.add_argument("--repeats", type=int, default=3, help="Timed runs per case (best is reported). Default: 3")
+    parser.add_argument("--output", type=str, default=None, help="Optional path to write the results as JSON")
+
+    args = parser.parse_args()
+    main(args)
@@ -0,0 +1,254 @@
+#!/usr/bin/env python3
+"""
+Time each stage of the serving path on synthetic audio and catch regressions.
+
+Stages (each timed on its own, with the output of the previous one):
+  process_audio                  decode a 30 s wav file
+  create_audio_chunks            split the track into overlapping chunks
+  compute_mel_spectrogram        dB Mel spectrogram of one chunk
+  compute_track_mel_power        track-level power Mel spectrogram
+  resize_spectrogram_tf          TensorFlow bilinear resize of one chunk
+  resize_spectrogram             NumPy resize used by the serving path
+  normalize_spectrogram          min-max normalization of one chunk
+  prepare_audio_chunks_for_model every chunk's model input, batched
+  predict_genre                  full prediction from audio (only with a trained
+                                 model at MODEL_PATH; the committed baseline has
+                                 no entry for it, so it is reported as 'new')
+  generate_spectrogram           store and render the spectrogram image
+  playlist_add@N                 add one song to a library of N songs
+  playlist_get@N                 all playlists right after a write (snapshot rebuild)
+  playlist_get_cached@N          all playlists with no write in between
+
+Results (median, min and p90 wall time per stage) are written as JSON with
+--output. With --baseline, each median is compared with the baseline median
+and the script exits with status 1 if any stage is slower by more than its
+threshold. benchmark_baseline.json holds the reference timings; its
+environment section says where they were measured. Re-record it on the
+machine that runs the comparison, and after an intended change in speed:
+
+  python benchmark_stages.py --save-baseline benchmark_baseline.json
+  python benchmark_stages.py --baseline benchmark_baseline.json --threshold 0.2
+"""
+
+import os
+import sys
+import json
+import time
+import fnmatch
+import logging
+import argparse
+import platform
+import tempfile
+
+import numpy as np
+import soundfile as sf
+
+# Make the backend package importable when run from the scripts directory
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from backend.config import SAMPLE_RATE, DURATION, MODEL_PATH, GENRES
+from backend.utils.audio_processor import process_audio, create_audio_chunks
+from backend.utils.spectrogram_generator import (
+    compute_mel_spectrogram, compute_track_mel_power, resize_spectrogram_tf, resize_spectrogram,
+    normalize_spectrogram, prepare_audio_chunks_for_model, generate_spectrogram
+)
+from backend.api.playlist import PlaylistStore
+from backend.utils.warmup import synthetic_track
+
+RESULTS_VERSION = 1
+
+def time_stage(fn, repeats, setup=None, warmup=1):
+    """
+    Time fn() after warmup untimed calls; setup() runs untimed before each call
+
+    Returns:
+        dict: median_s, min_s, p90_s and repeats
+    """
+    for _ in range(warmup):
+        if setup:
+            setup()
+        fn()
+    timings = []
+    for _ in range(repeats):
+        if setup:
+            setup()
+        start = time.perf_counter()
+        fn()
+        timings.append(time.perf_counter() - start)
+    return {
+        'median_s': float(np.median(timings)),
+        'min_s': float(np.min(timings)),
+        'p90_s': float(np.percentile(timings, 90)),
+        'repeats': repeats,
+    }
+
+def audio_stages(directory, repeats, with_model):
+    """(name, fn, setup, repeats) for the audio and model stages."""
+    audio_path = os.path.join(directory, 'benchmark.wav')
+    sf.write(audio_path, synthetic_track(DURATION), SAMPLE_RATE)
+    audio = process_audio(audio_path)
+    chunks = create_audio_chunks(audio)
+    chunk_mel = compute_mel_spectrogram(chunks[0])
+    resized = resize_spectrogram(chunk_mel)
+    spectrogram_dir = os.path.join(directory, 'spectrograms')
+    os.makedirs(spectrogram_dir)
+
+    def clear_spectrograms():
+        for name in os.listdir(spectrogram_dir):
+            os.remove(os.path.join(spectrogram_dir, name))
+
+    stages = [
+        ('process_audio', lambda: process_audio(audio_path), None, repeats),
+        ('create_audio_chunks', lambda: create_audio_chunks(audio), None, repeats),
+        ('compute_mel_spectrogram', lambda: compute_mel_spectrogram(chunks[0]), None, repeats),
+        ('compute_track_mel_power', lambda: compute_track_mel_power(audio), None, repeats),
+        ('resize_spectrogram_tf', lambda: resize_spectrogram_tf(chunk_mel), None, repeats),
+        ('resize_spectrogram', lambda: resize_spectrogram(chunk_mel), None, repeats),
+        ('normalize_spectrogram', lambda: normalize_spectrogram(resized), None, repeats),
+        ('prepare_audio_chunks_for_model', lambda: prepare_audio_chunks_for_model(audio, chunks), None, repeats),
+        ('generate_spectrogram', lambda: generate_spectrogram(audio, 'benchmark.wav', spectrogram_dir),
+         clear_spectrograms, repeats),
+    ]
+    if with_model:
+        from backend.models.model_loader import load_model, predict_genre
+        model = load_model(MODEL_PATH)
+        stages.append(('predict_genre', lambda: predict_genre(model, audio_data=audio), None, repeats))
+    return stages
+
+def playlist_stages(directory, sizes, repeats):
+    """(name, fn, setup, repeats) for playlist writes and reads at each library size."""
+    stages = []
+    for size in sizes:
+        store = PlaylistStore(os.path.join(directory, f"playlists_{size}.db"))
+        for i in range(size):
+            store.add(GENRES[i % len(GENRES)], f"song_{i}.wav")
+        counter = iter(range(size, size + 10 * (repeats + 2)))
+
+        def add_song(store=store, counter=counter):
+            i = next(counter)
+            store.add(GENRES[i % len(GENRES)], f"song_{i}.wav")
+
+        stages += [
+            (f"playlist_add@{size}", add_song, None, repeats),
+            (f"playlist_get@{size}", store.all, add_song, repeats),
+            (f"playlist_get_cached@{size}", store.all, None, repeats),
+        ]
+    return stages
+
+def environment():
+    """Where the results were measured; compare only results from the same machine."""
+    return {
+        'python': platform.python_version(),
+        'numpy': np.__version__,
+        'platform': platform.platform(),
+        'machine': platform.machine(),
+        'cpu_count': os.cpu_count(),
+    }
+
+def parse_thresholds(items):
+    """Parse NAME=FRACTION overrides (NAME may be a glob pattern)."""
+    thresholds = {}
+    for item in items:
+        name, _, value = item.partition('=')
+        if not value:
+            raise SystemExit(f"ERROR: Expected NAME=FRACTION, got: {item}")
+        thresholds[name] = float(value)
+    return thresholds
+
+def stage_threshold(name, threshold, overrides):
+    for pattern, value in overrides.items():
+        if fnmatch.fnmatch(name, pattern):
+            return value
+    return threshold
+
+def compare(results, baseline, threshold, overrides):
+    """
+    Compare medians with a baseline
+
+    Returns:
+        list: (name, baseline_s, current_s, ratio, status) rows; status is
+        'ok', 'REGRESSION', 'new' or 'missing'
+    """
+    rows = []
+    for name, result in results.items():
+        if name not in baseline:
+            rows.append((name, None, result['median_s'], None, 'new'))
+            continue
+        base = baseline[name]['median_s']
+        ratio = result['median_s'] / base if base > 0 else float('inf')
+        limit = 1 + stage_threshold(name, threshold, overrides)
+        rows.append((name, base, result['median_s'], ratio, 'REGRESSION' if ratio > limit else 'ok'))
+    for name in baseline:
+        if name not in results:
+            rows.append((name, baseline[name]['median_s'], None, None, 'missing'))
+    return rows
+
+def main(args):
+    # Per-chunk INFO logs would drown the timings and slow the stages down
+    logging.getLogger('backend').setLevel(logging.ERROR)
+    with_model = not args.skip_model and os.path.exists(MODEL_PATH)
+    if not with_model:
+        print(f"Skipping predict_genre: {'--skip-model given' if args.skip_model else f'no model at {MODEL_PATH}'}")
+
+    results = {}
+    with tempfile.TemporaryDirectory() as directory:
+        stages = audio_stages(directory, args.repeats, with_model) + playlist_stages(directory, args.playlist_sizes, args.repeats)
+        for name, fn, setup, repeats in stages:
+            if args.only and not any(fnmatch.fnmatch(name, pattern) for pattern in args.only):
+                continue
+            results[name] = time_stage(fn, repeats, setup)
+            r = results[name]
+            print(f"{name:<34}{r['median_s'] * 1000:>10.3f} ms median{r['min_s'] * 1000:>10.3f} ms min{r['p90_s'] * 1000:>10.3f} ms p90")
+
+    report = {'version': RESULTS_VERSION, 'environment': environment(), 'results': results}
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(report, f, indent=2)
+        print(f"Results written to: {args.output}")
+    if args.save_baseline:
+        with open(args.save_baseline, 'w') as f:
+            json.dump(report, f, indent=2)
+        print(f"Baseline written to: {args.save_baseline}")
+
+    if not args.baseline:
+        return 0
+    with open(args.baseline, 'r') as f:
+        baseline = json.load(f)
+    if baseline.get('environment') != report['environment']:
+        print("WARNING: The baseline was recorded in a different environment; timings may not be comparable")
+    if args.only:
+        baseline['results'] = {name: r for name, r in baseline['results'].items()
+                               if any(fnmatch.fnmatch(name, pattern) for pattern in args.only)}
+
+    rows = compare(results, baseline['results'], args.threshold, parse_thresholds(args.stage_threshold))
+    print(f"\n{'stage':<34}{'baseline ms':>12}{'current ms':>12}{'ratio':>8}  status")
+    for name, base, current, ratio, status in rows:
+        base_text = f"{base * 1000:.3f}" if base is not None else '-'
+        current_text = f"{current * 1000:.3f}" if current is not None else '-'
+        ratio_text = f"{ratio:.2f}" if ratio is not None else '-'
+        print(f"{name:<34}{base_text:>12}{current_text:>12}{ratio_text:>8}  {status}")
+
+    regressions = [row[0] for row in rows if row[4] == 'REGRESSION']
+    if regressions:
+        print(f"\n{len(regressions)} stage(s) regressed beyond their threshold: {', '.join(regressions)}")
+        return 1
+    print("\nNo regressions")
+    return 0
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark each serving stage and compare with a baseline.")
+    parser.add_argument("--repeats", type=int, default=10, help="Timed runs per stage (the median is compared). Default: 10")
+    parser.add_argument("--playlist-sizes", type=int, nargs='+', default=[100, 1000, 10000],
+                        help="Library sizes for the playlist stages. Default: 100 1000 10000")
+    parser.add_argument("--only", nargs='+', default=None, help="Run only stages matching these glob patterns")
+    parser.add_argument("--skip-model", action="store_true", help="Skip predict_genre (no model load)")
+    parser.add_argument("--output", type=str, default=None, help="Optional path to write the results as JSON")
+    parser.add_argument("--save-baseline", type=str, default=None, help="Write the results as a new baseline to this path")
+    parser.add_argument("--baseline", type=str, default=None, help="Baseline JSON to compare the results with")
+    parser.add_argument("--threshold", type=float, default=0.25,
+                        help="Allowed slowdown of a median over the baseline, as a fraction. Default: 0.25")
+    parser.add_argument("--stage-threshold", nargs='+', default=[], metavar="NAME=FRACTION",
+                        help="Per-stage thresholds, e.g. predict_genre=0.5 'playlist_*=0.5'")
+
+    args = parser.parse_args()
+    sys.exit(main(args))
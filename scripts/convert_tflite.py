@@ -0,0 +1,202 @@
+#!/usr/bin/env python3
+"""
+Convert the trained Keras model to TFLite and report accuracy and latency.
+
+Writes one .tflite file per variant next to the Keras model (or into
+--output-dir):
+  float32  plain conversion
+  float16  float16 weights
+  dynamic  int8 weights, dynamic-range activations
+  int8     full integer model, calibrated on spectrograms produced by the
+           serving preprocessing (process_audio -> chunks -> mel -> resize ->
+           normalize) from --calibration-dir
+
+Every variant is then compared with the Keras model on the tracks in
+--eval-dir (genre subfolders, as in GTZAN): track-level accuracy when labels
+are known, top-1 agreement with Keras, probability deltas, file size and
+median predict() latency for a full track batch and for a single chunk.
+
+Serve a variant by setting INFERENCE_BACKEND = 'tflite' and TFLITE_VARIANT
+in backend/config.py.
+"""
+
+import os
+import sys
+import json
+import time
+import logging
+import argparse
+import warnings
+from pathlib import Path
+
+import numpy as np
+
+# Make the backend package importable when run from the scripts directory
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from backend.config import MODEL_PATH, GENRES, ALLOWED_EXTENSIONS
+from backend.models.model_loader import load_model, average_chunk_predictions
+from backend.models.tflite_backend import TFLITE_VARIANTS, TFLiteModel, convert_to_tflite, tflite_model_path
+from backend.utils.audio_processor import process_audio, create_audio_chunks
+from backend.utils.spectrogram_generator import prepare_audio_chunks_for_model
+from backend.utils.warmup import synthetic_track
+
+def find_audio_files(directory, limit):
+    """Up to limit audio files under directory, spread evenly over the sorted list."""
+    files = sorted(p for p in Path(directory).rglob('*') if p.suffix.lower().lstrip('.') in ALLOWED_EXTENSIONS)
+    if limit and len(files) > limit:
+        files = [files[i] for i in np.linspace(0, len(files) - 1, limit).astype(int)]
+    return files
+
+def prepare_tracks(files):
+    """
+    Run the serving preprocessing on each file
+
+    Returns:
+        list: (batch_input, chunk_indices, label) per track; label is the
+        parent folder name when it is a genre, else None
+    """
+    tracks = []
+    for path in files:
+        try:
+            audio = process_audio(str(path))
+            batch_input, chunk_indices = prepare_audio_chunks_for_model(audio, create_audio_chunks(audio))
+        except Exception as e:
+            print(f"Skipping {path}: {e}")
+            continue
+        if chunk_indices:
+            label = path.parent.name if path.parent.name in GENRES else None
+            tracks.append((batch_input, chunk_indices, label))
+    return tracks
+
+def synthetic_tracks(count, seed_offset):
+    """Model inputs for synthetic tracks, used when no audio directory is given."""
+    tracks = []
+    for seed in range(seed_offset, seed_offset + count):
+        rng = np.random.RandomState(seed)
+        audio = synthetic_track(seed=seed) * rng.uniform(0.5, 2.0)
+        audio = audio + rng.uniform(0.0, 0.2) * rng.randn(len(audio)).astype(np.float32)
+        batch_input, chunk_indices = prepare_audio_chunks_for_model(audio, create_audio_chunks(audio))
+        tracks.append((batch_input, chunk_indices, None))
+    return tracks
+
+def track_probabilities(model, tracks):
+    """Averaged genre probabilities per track, as predict_genre() computes them."""
+    probabilities = []
+    for batch_input, chunk_indices, _ in tracks:
+        predictions = model.predict(batch_input, batch_size=len(chunk_indices), verbose=0)
+        _, confidence = average_chunk_predictions(chunk_indices, predictions)
+        probabilities.append([confidence[genre] for genre in GENRES])
+    return np.array(probabilities)
+
+def median_latency_ms(model, inputs, repeats):
+    """Median predict() wall time after one untimed call."""
+    model.predict(inputs, batch_size=len(inputs), verbose=0)
+    timings = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        model.predict(inputs, batch_size=len(inputs), verbose=0)
+        timings.append(time.perf_counter() - start)
+    return float(np.median(timings) * 1000)
+
+def evaluate(name, model, tracks, reference, size_bytes, repeats):
+    """Accuracy, agreement with the reference probabilities and latency for one model."""
+    probabilities = track_probabilities(model, tracks)
+    predicted = probabilities.argmax(axis=1)
+    labels = [GENRES.index(label) if label is not None else None for _, _, label in tracks]
+    labelled = [(p, l) for p, l in zip(predicted, labels) if l is not None]
+
+    full_batch = tracks[0][0]
+    return {
+        'model': name,
+        'size_bytes': size_bytes,
+        'accuracy': float(np.mean([p == l for p, l in labelled])) if labelled else None,
+        'top1_agreement': float(np.mean(predicted == reference.argmax(axis=1))),
+        'mean_abs_prob_delta': float(np.mean(np.abs(probabilities - reference))),
+        'max_abs_prob_delta': float(np.max(np.abs(probabilities - reference))),
+        'latency_track_ms': median_latency_ms(model, full_batch, repeats),
+        'latency_chunk_ms': median_latency_ms(model, full_batch[:1], repeats),
+    }
+
+def main(args):
+    warnings.filterwarnings('ignore', message='.*tf.lite.Interpreter is deprecated.*')
+    # Per-chunk prediction warnings would drown the report
+    logging.getLogger('backend').setLevel(logging.ERROR)
+    keras_model = load_model(args.model, backend='keras', optimize=False)
+    output_dir = args.output_dir or os.path.dirname(os.path.abspath(args.model))
+    os.makedirs(output_dir, exist_ok=True)
+
+    if args.calibration_dir:
+        calibration_tracks = prepare_tracks(find_audio_files(args.calibration_dir, args.calibration_tracks))
+    else:
+        print("No --calibration-dir given: calibrating on synthetic audio, int8 accuracy will be pessimistic")
+        calibration_tracks = synthetic_tracks(args.calibration_tracks, seed_offset=0)
+    if not calibration_tracks:
+        raise SystemExit("No calibration inputs could be prepared")
+
+    calibration_inputs = np.concatenate([batch for batch, _, _ in calibration_tracks])
+    if len(calibration_inputs) > args.calibration_samples:
+        rng = np.random.RandomState(0)
+        calibration_inputs = calibration_inputs[rng.choice(len(calibration_inputs), args.calibration_samples, replace=False)]
+    print(f"Calibration inputs: {calibration_inputs.shape}")
+
+    if args.eval_dir:
+        eval_tracks = prepare_tracks(find_audio_files(args.eval_dir, args.eval_tracks))
+        eval_source = str(args.eval_dir)
+    else:
+        eval_tracks = synthetic_tracks(args.eval_tracks, seed_offset=10000)
+        eval_source = 'synthetic'
+    if not eval_tracks:
+        raise SystemExit("No evaluation tracks could be prepared")
+
+    keras_size = os.path.getsize(args.model) if os.path.exists(args.model) else None
+    reference = track_probabilities(keras_model, eval_tracks)
+    keras_result = evaluate('keras', keras_model, eval_tracks, reference, keras_size, args.repeats)
+    results = [keras_result]
+
+    for variant in args.variants:
+        start = time.perf_counter()
+        content = convert_to_tflite(keras_model, variant, calibration_inputs if variant == 'int8' else None)
+        path = os.path.join(output_dir, os.path.basename(tflite_model_path(args.model, variant)))
+        with open(path, 'wb') as f:
+            f.write(content)
+        print(f"Wrote {variant} model to {path} in {time.perf_counter() - start:.1f}s")
+
+        result = evaluate(variant, TFLiteModel(model_path=path, num_threads=args.num_threads),
+                          eval_tracks, reference, len(content), args.repeats)
+        result['path'] = path
+        results.append(result)
+
+    print(f"\nEvaluated on {len(eval_tracks)} tracks ({eval_source})")
+    print(f"{'model':<9}{'size MB':>9}{'accuracy':>10}{'agree':>8}{'mean dp':>10}{'max dp':>9}{'track ms':>10}{'chunk ms':>10}")
+    for r in results:
+        accuracy = f"{r['accuracy']:.3f}" if r['accuracy'] is not None else '-'
+        size = f"{r['size_bytes'] / 1e6:.2f}" if r['size_bytes'] else '-'
+        print(f"{r['model']:<9}{size:>9}{accuracy:>10}{r['top1_agreement']:>8.3f}{r['mean_abs_prob_delta']:>10.2e}"
+              f"{r['max_abs_prob_delta']:>9.2e}{r['latency_track_ms']:>10.1f}{r['latency_chunk_ms']:>10.1f}")
+
+    report_path = args.report or os.path.join(output_dir, 'tflite_report.json')
+    with open(report_path, 'w') as f:
+        json.dump({'eval_source': eval_source, 'eval_tracks': len(eval_tracks),
+                   'calibration_inputs': len(calibration_inputs), 'results': results}, f, indent=2)
+    print(f"Report written to: {report_path}")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Convert the Keras model to TFLite and compare accuracy and latency.")
+    parser.add_argument("--model", type=str, default=MODEL_PATH, help=f"Keras model to convert. Default: {MODEL_PATH}")
+    parser.add_argument("--variants", nargs='+', default=list(TFLITE_VARIANTS), choices=TFLITE_VARIANTS,
+                        help=f"Variants to produce. Default: {' '.join(TFLITE_VARIANTS)}")
+    parser.add_argument("--output-dir", type=str, default=None, help="Where to write .tflite files. Default: next to the model")
+    parser.add_argument("--calibration-dir", type=Path, default=None,
+                        help="Audio files (searched recursively) whose spectrograms calibrate the int8 model")
+    parser.add_argument("--calibration-tracks", type=int, default=50, help="Tracks to take calibration chunks from. Default: 50")
+    parser.add_argument("--calibration-samples", type=int, default=500, help="Chunk inputs used for calibration. Default: 500")
+    parser.add_argument("--eval-dir", type=Path, default=None,
+                        help="Audio files for the comparison, in genre subfolders for accuracy. Default: synthetic tracks")
+    parser.add_argument("--eval-tracks", type=int, default=100, help="Maximum tracks to evaluate. Default: 100")
+    parser.add_argument("--repeats", type=int, default=20, help="Timed predict() calls per latency figure. Default: 20")
+    parser.add_argument("--num-threads", type=int, default=None, help="TFLite interpreter threads. Default: TFLite's choice")
+    parser.add_argument("--report", type=str, default=None, help="Path of the JSON report. Default: <output-dir>/tflite_report.json")
+
+    args = parser.parse_args()
+    main(args)
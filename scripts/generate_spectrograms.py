@@ -1,16 +1,26 @@
 import librosa
-import librosa.display
 import numpy as np
-import matplotlib.pyplot as plt
 import os
+import sys
+import json
+import time
+import hashlib
+from concurrent.futures import ProcessPoolExecutor, as_completed
 from pathlib import Path
 import tqdm  # For progress bar
 import argparse
 
+# Make the backend package importable when run from the scripts directory
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from backend.utils.spectrogram_shards import ShardWriter, SHARD_DTYPES
+
 # --- Configuration Defaults ---
 # These can be overridden by command-line arguments
 DEFAULT_DATASET_PATH = Path("../data/raw/GTZAN/genres_original")
 DEFAULT_OUTPUT_PATH_NPY = Path("../data/processed/spectrograms_npy")
+DEFAULT_OUTPUT_PATH_SHARDS = Path("../data/processed/spectrograms_shards")
+DEFAULT_SHARD_SIZE_MB = 256
 # DEFAULT_OUTPUT_PATH_IMG = Path("../data/processed/spectrograms_img") # Uncomment if saving images
 
 # Spectrogram parameters
@@ -21,30 +31,59 @@ DEFAULT_N_MELS = 128
 DEFAULT_FMIN = 0
 DEFAULT_FMAX = None # Use Nyquist frequency
 
+# Manifest of processed sources, kept in the output directory
+MANIFEST_NAME = "manifest.json"
+MANIFEST_VERSION = 1
+# Save the manifest at least this often so an interrupted run resumes close to where it stopped
+MANIFEST_SAVE_INTERVAL_S = 10
+
+def file_sha256(path):
+    """SHA-256 of a file's content."""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(1024 * 1024), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+def atomic_save_npy(output_path_npy, array):
+    """Save an array so that output_path_npy is either absent, the old file or the complete new file."""
+    tmp_path = output_path_npy.with_name(f"{output_path_npy.name}.{os.getpid()}.tmp")
+    try:
+        with open(tmp_path, 'wb') as f:
+            np.save(f, array)
+        os.replace(tmp_path, output_path_npy)
+    finally:
+        if tmp_path.exists():
+            tmp_path.unlink()
+
+def compute_spectrogram(audio_path, sample_rate, n_fft, hop_length, n_mels, fmin, fmax):
+    """Computes the Mel spectrogram (in dB) of a single audio file."""
+    # Load audio file - Convert Path to string for wider compatibility
+    y, sr = librosa.load(str(audio_path), sr=sample_rate)
+
+    # Compute Mel spectrogram
+    mel_spec = librosa.feature.melspectrogram(
+        y=y,
+        sr=sr,
+        n_fft=n_fft,
+        hop_length=hop_length,
+        n_mels=n_mels,
+        fmin=fmin,
+        fmax=fmax
+    )
+
+    # Convert to decibels (log scale)
+    return librosa.power_to_db(mel_spec, ref=np.max)
+
 def compute_and_save_spectrogram(audio_path, output_path_npy, sample_rate, n_fft, hop_length, n_mels, fmin, fmax):
     """Computes and saves the Mel spectrogram for a single audio file."""
     try:
-        # Load audio file - Convert Path to string for wider compatibility
-        y, sr = librosa.load(str(audio_path), sr=sample_rate)
-
-        # Compute Mel spectrogram
-        mel_spec = librosa.feature.melspectrogram(
-            y=y,
-            sr=sr,
-            n_fft=n_fft,
-            hop_length=hop_length,
-            n_mels=n_mels,
-            fmin=fmin,
-            fmax=fmax
-        )
-
-        # Convert to decibels (log scale)
-        mel_spec_db = librosa.power_to_db(mel_spec, ref=np.max)
-
-        # Save as NumPy array
-        np.save(output_path_npy, mel_spec_db)
-
-        # --- Optional: Save as Image ---
+        mel_spec_db = compute_spectrogram(audio_path, sample_rate, n_fft, hop_length, n_mels, fmin, fmax)
+
+        # Save as NumPy array (written to a temporary file and renamed into place)
+        atomic_save_npy(output_path_npy, mel_spec_db)
+
+        # --- Optional: Save as Image (needs: import librosa.display, matplotlib.pyplot as plt) ---
         # output_path_img = Path(str(output_path_npy).replace("spectrograms_npy", "spectrograms_img").replace(".npy", ".png"))
         # output_path_img.parent.mkdir(parents=True, exist_ok=True)
         # plt.figure(figsize=(10, 4))
@@ -62,61 +101,241 @@ def compute_and_save_spectrogram(audio_path, output_path_npy, sample_rate, n_fft
         print(f"Error processing {audio_path}: {e}")
         return False
 
+def spectrogram_params(args):
+    """Parameters that determine the output; a change invalidates every manifest entry."""
+    return {
+        'sample_rate': args.sample_rate,
+        'n_fft': args.n_fft,
+        'hop_length': args.hop_length,
+        'n_mels': args.n_mels,
+        'fmin': args.fmin,
+        'fmax': args.fmax,
+        'librosa': librosa.__version__,
+    }
+
+def load_manifest(manifest_path, params):
+    """
+    Manifest entries that are still valid for params
+
+    Returns:
+        dict: Source path (relative to the dataset) -> {size, mtime_ns, sha256, output}
+    """
+    if not manifest_path.exists():
+        return {}
+    try:
+        with open(manifest_path, 'r') as f:
+            manifest = json.load(f)
+    except Exception as e:
+        print(f"Ignoring unreadable manifest {manifest_path}: {e}")
+        return {}
+    if manifest.get('version') != MANIFEST_VERSION or manifest.get('params') != params:
+        print("Spectrogram parameters changed since the last run: recomputing everything")
+        return {}
+    return manifest.get('entries', {})
+
+def save_manifest(manifest_path, params, entries):
+    """Write the manifest atomically."""
+    tmp_path = manifest_path.with_name(f"{manifest_path.name}.tmp")
+    with open(tmp_path, 'w') as f:
+        json.dump({'version': MANIFEST_VERSION, 'params': params, 'entries': entries}, f, indent=1, sort_keys=True)
+    os.replace(tmp_path, manifest_path)
+
+def is_up_to_date(entry, audio_file, output_file):
+    """
+    Whether a manifest entry still describes audio_file and its output exists
+
+    Size and mtime decide without reading the file. A file whose mtime
+    changed but whose content did not (e.g. after a copy) is recognized by
+    its hash; the entry is then updated in place.
+    """
+    if entry is None or not output_file.exists():
+        return False
+    stat = audio_file.stat()
+    if entry['size'] == stat.st_size and entry['mtime_ns'] == stat.st_mtime_ns:
+        return True
+    if entry['size'] == stat.st_size and entry['sha256'] == file_sha256(audio_file):
+        entry['mtime_ns'] = stat.st_mtime_ns
+        return True
+    return False
+
+def process_file(audio_file, output_file, params):
+    """
+    Worker task: compute one spectrogram and describe its source
+
+    Returns:
+        dict: Manifest entry, or None if processing failed
+    """
+    stat = audio_file.stat()
+    if not compute_and_save_spectrogram(
+        audio_file,
+        output_file,
+        params['sample_rate'],
+        params['n_fft'],
+        params['hop_length'],
+        params['n_mels'],
+        params['fmin'],
+        params['fmax']):
+        return None
+    return {
+        'size': stat.st_size,
+        'mtime_ns': stat.st_mtime_ns,
+        'sha256': file_sha256(audio_file),
+        'output': str(output_file),
+    }
+
+def spectrogram_or_none(audio_file, params):
+    """Worker task for the shard format: the spectrogram, or None if it failed."""
+    try:
+        return compute_spectrogram(
+            audio_file,
+            params['sample_rate'],
+            params['n_fft'],
+            params['hop_length'],
+            params['n_mels'],
+            params['fmin'],
+            params['fmax'])
+    except Exception as e:
+        print(f"Error processing {audio_file}: {e}")
+        return None
+
+def write_shards(args, tasks, dataset_path):
+    """
+    Pack every spectrogram into shard files (see backend/utils/spectrogram_shards.py)
+
+    Shards are always rebuilt in full and replace the previous dataset
+    only once complete; items keep the sorted source order.
+    """
+    params = spectrogram_params(args)
+    shard_size_bytes = args.shard_size_mb * 1024 * 1024
+    processed_count = 0
+    error_count = 0
+    print(f"Packing {len(tasks)} spectrograms as {args.dtype} into: {args.output_dir_shards}")
+
+    with ShardWriter(args.output_dir_shards, dtype=args.dtype, shard_size_bytes=shard_size_bytes,
+                     metadata={'params': params}) as writer:
+        audio_files = [audio_file for audio_file, _ in tasks]
+        with tqdm.tqdm(total=len(audio_files), desc="Processing files", unit="file") as pbar:
+            if args.workers > 1:
+                executor = ProcessPoolExecutor(max_workers=args.workers)
+                results = executor.map(spectrogram_or_none, audio_files, [params] * len(audio_files), chunksize=4)
+            else:
+                executor = None
+                results = (spectrogram_or_none(audio_file, params) for audio_file in audio_files)
+            try:
+                for audio_file, mel_spec_db in zip(audio_files, results):
+                    if mel_spec_db is None:
+                        error_count += 1
+                    else:
+                        writer.add(mel_spec_db, audio_file.parent.name, key=str(audio_file.relative_to(dataset_path)))
+                        processed_count += 1
+                    pbar.update(1)
+            finally:
+                if executor is not None:
+                    executor.shutdown(cancel_futures=True)
+
+    print(f"\nFinished processing.")
+    print(f"Successfully processed: {processed_count} files.")
+    print(f"Errors encountered: {error_count} files.")
+
 def main(args):
     """Main function to process all audio files."""
     dataset_path = args.dataset_dir
     output_path_npy_base = args.output_dir_npy
 
-    # Ensure output directory exists
-    output_path_npy_base.mkdir(parents=True, exist_ok=True)
-
     # Iterate through genres and audio files
     print(f"Starting spectrogram generation from: {dataset_path}")
-    print(f"Saving NumPy arrays to: {output_path_npy_base}")
+    if args.format == 'shards':
+        print(f"Saving shards to: {args.output_dir_shards}")
+    else:
+        print(f"Saving NumPy arrays to: {output_path_npy_base}")
 
     if not dataset_path.exists():
         print(f"ERROR: Dataset path does not exist: {dataset_path}")
         return
 
-    genres = [d for d in dataset_path.iterdir() if d.is_dir()]
+    genres = sorted(d for d in dataset_path.iterdir() if d.is_dir())
     if not genres:
         print(f"ERROR: No genre subdirectories found in {dataset_path}")
         return
     print(f"Found genres: {[g.name for g in genres]}")
 
-    total_files = sum(len(list(g.glob('*.wav'))) for g in genres)
-    if total_files == 0:
+    # One listing serves both the progress total and the work list
+    tasks = []
+    for genre_path in genres:
+        output_genre_path_npy = output_path_npy_base / genre_path.name
+        for audio_file in sorted(genre_path.glob('*.wav')):
+            tasks.append((audio_file, output_genre_path_npy / f"{audio_file.stem}.npy"))
+    if not tasks:
         print("ERROR: No .wav files found in the genre subdirectories.")
         return
 
+    if args.format == 'shards':
+        write_shards(args, tasks, dataset_path)
+        return
+
+    # Ensure the output directories exist
+    for genre_path in genres:
+        (output_path_npy_base / genre_path.name).mkdir(parents=True, exist_ok=True)
+
+    params = spectrogram_params(args)
+    manifest_path = output_path_npy_base / MANIFEST_NAME
+    entries = {} if args.force else load_manifest(manifest_path, params)
+
+    source_keys = {str(audio_file.relative_to(dataset_path)) for audio_file, _ in tasks}
+    removed = [key for key in entries if key not in source_keys]
+    for key in removed:
+        del entries[key]
+
+    pending = []
+    for audio_file, output_file in tasks:
+        key = str(audio_file.relative_to(dataset_path))
+        if not is_up_to_date(entries.get(key), audio_file, output_file):
+            entries.pop(key, None)
+            pending.append((key, audio_file, output_file))
+    skipped_count = len(tasks) - len(pending)
+    print(f"{len(tasks)} files: {skipped_count} up to date, {len(pending)} to process"
+          + (f", {len(removed)} removed sources dropped from the manifest" if removed else ""))
+
     processed_count = 0
     error_count = 0
+    last_save = time.monotonic()
 
-    with tqdm.tqdm(total=total_files, desc="Processing files", unit="file") as pbar:
-        for genre_path in genres:
-            genre_name = genre_path.name
-            output_genre_path_npy = output_path_npy_base / genre_name
-            output_genre_path_npy.mkdir(parents=True, exist_ok=True)
-
-            for audio_file in genre_path.glob('*.wav'):
-                output_filename_npy = output_genre_path_npy / f"{audio_file.stem}.npy"
-
-                if compute_and_save_spectrogram(
-                    audio_file,
-                    output_filename_npy,
-                    args.sample_rate,
-                    args.n_fft,
-                    args.hop_length,
-                    args.n_mels,
-                    args.fmin,
-                    args.fmax):
-                    processed_count += 1
-                else:
-                    error_count += 1
-                pbar.update(1)
+    def record(key, entry):
+        nonlocal processed_count, error_count, last_save
+        if entry is None:
+            error_count += 1
+        else:
+            entries[key] = entry
+            processed_count += 1
+        if time.monotonic() - last_save >= MANIFEST_SAVE_INTERVAL_S:
+            save_manifest(manifest_path, params, entries)
+            last_save = time.monotonic()
+
+    try:
+        with tqdm.tqdm(total=len(pending), desc="Processing files", unit="file") as pbar:
+            if args.workers > 1:
+                with ProcessPoolExecutor(max_workers=args.workers) as executor:
+                    futures = {executor.submit(process_file, audio_file, output_file, params): key
+                               for key, audio_file, output_file in pending}
+                    for future in as_completed(futures):
+                        try:
+                            entry = future.result()
+                        except Exception as e:
+                            print(f"Error processing {futures[future]}: {e}")
+                            entry = None
+                        record(futures[future], entry)
+                        pbar.update(1)
+            else:
+                for key, audio_file, output_file in pending:
+                    record(key, process_file(audio_file, output_file, params))
+                    pbar.update(1)
+    finally:
+        # Also on Ctrl-C or a crash in the main process, so the next run resumes
+        save_manifest(manifest_path, params, entries)
 
     print(f"\nFinished processing.")
     print(f"Successfully processed: {processed_count} files.")
+    print(f"Skipped (unchanged): {skipped_count} files.")
     print(f"Errors encountered: {error_count} files.")
 
 if __name__ == "__main__":
@@ -131,6 +350,18 @@ if __name__ == "__main__":
     parser.add_argument("--n-mels", type=int, default=DEFAULT_N_MELS, help=f"Number of Mel bands. Default: {DEFAULT_N_MELS}")
     parser.add_argument("--fmin", type=int, default=DEFAULT_FMIN, help=f"Minimum frequency for Mel bands. Default: {DEFAULT_FMIN}")
     parser.add_argument("--fmax", type=int, default=DEFAULT_FMAX, help="Maximum frequency for Mel bands. Default: Nyquist")
+    parser.add_argument("--format", choices=("npy", "shards"), default="npy",
+                        help="npy: one incremental .npy file per track; shards: large packed shard files with an index. Default: npy")
+    parser.add_argument("--output-dir-shards", type=Path, default=DEFAULT_OUTPUT_PATH_SHARDS,
+                        help=f"Where --format shards writes its dataset. Default: {DEFAULT_OUTPUT_PATH_SHARDS}")
+    parser.add_argument("--dtype", choices=SHARD_DTYPES, default="float32",
+                        help="Data type of the shard format (float16 halves its size). Default: float32")
+    parser.add_argument("--shard-size-mb", type=int, default=DEFAULT_SHARD_SIZE_MB,
+                        help=f"Target size of each shard file. Default: {DEFAULT_SHARD_SIZE_MB}")
+    parser.add_argument("--workers", type=int, default=1,
+                        help="Worker processes computing spectrograms. Default: 1 (in the main process)")
+    parser.add_argument("--force", action="store_true",
+                        help=f"Recompute every spectrogram, ignoring {MANIFEST_NAME} in the output directory")
 
     args = parser.parse_args()
-    main(args)
\ No newline at end of file
+    main(args)
@@ -0,0 +1,248 @@
+"""
+Tests for the Flask endpoints in backend.app, with a stub model and every
+upload, cache, spectrogram, preview and playlist path in a temporary folder.
+"""
+import io
+import sys
+import gzip
+import json
+import time
+import threading
+import functools
+import importlib
+
+import numpy as np
+import pytest
+import soundfile as sf
+
+from backend.config import GENRES, SAMPLE_RATE, TARGET_SHAPE, GZIP_MIN_BYTES
+from backend.models import model_loader
+from backend.api import playlist
+from backend.api.playlist import PlaylistStore
+from backend.utils import spectrogram_generator
+from backend.utils.prediction_cache import PredictionCache
+from backend.utils.audio_delivery import ContentHashIndex, PreviewGenerator
+from backend.utils.warmup import synthetic_track
+
+
+class StubModel:
+    """Stand-in for the Keras model that always favours rock."""
+    input_shape = (None,) + tuple(TARGET_SHAPE) + (1,)
+    output_shape = (None, len(GENRES))
+
+    def __init__(self):
+        self.probabilities = np.full(len(GENRES), 0.5 / (len(GENRES) - 1), dtype=np.float32)
+        self.probabilities[GENRES.index('rock')] = 0.5
+
+    def predict(self, inputs, batch_size=None, verbose=0):
+        return np.tile(self.probabilities, (len(inputs), 1))
+
+
+def _wav(seed, duration=6):
+    buffer = io.BytesIO()
+    sf.write(buffer, synthetic_track(duration, seed=seed), SAMPLE_RATE, format='WAV')
+    return buffer.getvalue()
+
+
+@pytest.fixture(scope='module')
+def backend(tmp_path_factory):
+    """backend.app with a stub model; probes are sampled before startup is let through."""
+    assert 'backend.app' not in sys.modules, "backend.app must be imported with the stub model"
+    root = tmp_path_factory.mktemp('backend')
+    release_startup = threading.Event()
+
+    def load_stub_model(model_path, *args, **kwargs):
+        release_startup.wait(30)
+        return StubModel()
+
+    with pytest.MonkeyPatch.context() as mp:
+        mp.setattr(model_loader, 'load_model', load_stub_model)
+        app_module = importlib.import_module('backend.app')
+        client = app_module.app.test_client()
+        before = {'healthz': client.get('/healthz'), 'readyz': client.get('/readyz')}
+
+        spectrogram_dir = str(root / 'spectrograms')
+        mp.setitem(app_module.app.config, 'UPLOAD_FOLDER', str(root / 'uploads'))
+        (root / 'uploads').mkdir()
+        mp.setattr(app_module, 'SPECTROGRAM_FOLDER', spectrogram_dir)
+        mp.setattr(app_module, 'save_spectrogram_data',
+                   functools.partial(spectrogram_generator.save_spectrogram_data, spectrogram_dir=spectrogram_dir))
+        mp.setattr(app_module, 'render_spectrogram',
+                   functools.partial(spectrogram_generator.render_spectrogram, spectrogram_dir=spectrogram_dir))
+        mp.setattr(app_module, 'prediction_cache', PredictionCache(str(root / 'cache'), 'test-fingerprint'))
+        mp.setattr(app_module, 'content_hash_index', ContentHashIndex())
+        mp.setattr(app_module, 'PREVIEW_FOLDER', str(root / 'previews'))
+        mp.setattr(app_module, 'preview_generator', PreviewGenerator(str(root / 'previews')))
+        mp.setattr(playlist, '_store', PlaylistStore(str(root / 'playlists.db')))
+
+        release_startup.set()
+        assert app_module.backend_ready.wait(120)
+        yield app_module, before
+
+
+@pytest.fixture
+def client(backend):
+    return backend[0].app.test_client()
+
+
+def _upload(client, data, filename, query=''):
+    return client.post(f'/api/upload{query}', data={'file': (io.BytesIO(data), filename)},
+                       content_type='multipart/form-data')
+
+
+def test_probes_before_and_after_warm_up(backend, client):
+    _, before = backend
+    assert before['healthz'].status_code == 200
+    assert before['readyz'].status_code == 503
+    assert before['readyz'].get_json()['status'] == 'starting'
+
+    assert client.get('/healthz').status_code == 200
+    ready = client.get('/readyz')
+    assert ready.status_code == 200
+    assert ready.get_json()['status'] == 'ready'
+    assert ready.get_json()['warmup_s'] is not None
+
+
+def test_upload_is_served_from_cache_the_second_time(client):
+    data = _wav(seed=1)
+    first = _upload(client, data, 'first.wav')
+    assert first.status_code == 200
+    assert first.get_json()['genre'] == 'rock'
+    assert first.get_json()['cached'] is False
+
+    second = _upload(client, data, 'second.wav')
+    assert second.status_code == 200
+    result = second.get_json()
+    assert result['cached'] is True
+    assert result['filename'] == 'second.wav'
+    assert result['spectrogram'] == first.get_json()['spectrogram']
+    assert client.get(result['spectrogram_url']).status_code == 200
+
+
+def test_async_upload_job_can_be_polled_and_cancelled(backend, client, monkeypatch):
+    response = _upload(client, _wav(seed=2), 'async.wav', '?async=1')
+    assert response.status_code == 202
+    status_url = response.get_json()['status_url']
+    deadline = time.time() + 30
+    while (job := client.get(status_url).get_json())['status'] not in ('succeeded', 'failed'):
+        assert time.time() < deadline
+        time.sleep(0.05)
+    assert job['status'] == 'succeeded'
+    assert job['result']['genre'] == 'rock'
+
+    # With the only worker busy, the next upload stays queued and can be cancelled
+    app_module = backend[0]
+    manager = app_module.JobManager(max_workers=1)
+    monkeypatch.setattr(app_module, 'job_manager', manager)
+    busy = threading.Event()
+    manager.submit(lambda checkpoint: busy.wait(10))
+    job_id = _upload(client, _wav(seed=3), 'queued.wav', '?async=1').get_json()['job_id']
+
+    cancelled = client.delete(f'/api/jobs/{job_id}')
+    assert cancelled.status_code == 200
+    assert cancelled.get_json()['status'] == 'cancelled'
+    assert client.get(f'/api/jobs/{job_id}').get_json()['status'] == 'cancelled'
+    busy.set()
+    manager.shutdown()
+
+    assert client.get('/api/jobs/unknown').status_code == 404
+    assert client.delete('/api/jobs/unknown').status_code == 404
+
+
+def test_bulk_upload_streams_ndjson_with_item_errors(client):
+    files = [(io.BytesIO(_wav(seed=4)), 'good.wav'), (io.BytesIO(b'x'), 'notes.txt'),
+             (io.BytesIO(b'not audio'), 'broken.wav')]
+    response = client.post('/api/upload/bulk', data={'files': files}, content_type='multipart/form-data')
+    assert response.status_code == 200
+    assert response.mimetype == 'application/x-ndjson'
+
+    lines = [json.loads(line) for line in response.get_data(as_text=True).splitlines()]
+    assert lines[-1] == {'status': 'done', 'total': 3, 'succeeded': 1, 'failed': 2}
+    items = {line['filename']: line for line in lines[:-1]}
+    assert items['good.wav']['status'] == 'ok'
+    assert items['good.wav']['result']['genre'] == 'rock'
+    assert items['notes.txt'] == {'index': 1, 'filename': 'notes.txt', 'status': 'error', 'error': 'File type not allowed'}
+    assert items['broken.wav']['status'] == 'error'
+
+    assert client.post('/api/upload/bulk', data={}, content_type='multipart/form-data').status_code == 400
+
+
+def test_playlists_paging_caching_and_compression(client, tmp_path, monkeypatch):
+    store = PlaylistStore(str(tmp_path / 'playlists.db'))
+    monkeypatch.setattr(playlist, '_store', store)
+    for i in range(5):
+        store.add('jazz', f'song_{i}.wav')
+
+    songs, cursor = [], None
+    while True:
+        query = '?genre=jazz&limit=2' + (f'&cursor={cursor}' if cursor else '')
+        page = client.get(f'/api/playlists{query}').get_json()['playlists']['jazz']
+        assert page['total'] == 5
+        songs += page['songs']
+        cursor = page['next_cursor']
+        if cursor is None:
+            break
+    assert songs == [f'song_{i}.wav' for i in range(5)]
+
+    for query in ('?limit=0', '?limit=abc', '?cursor=2', '?genre=jazz&cursor=abc'):
+        assert client.get(f'/api/playlists{query}').status_code == 400, query
+
+    response = client.get('/api/playlists', headers={'Accept-Encoding': 'gzip'})
+    assert response.status_code == 200
+    assert 'Content-Encoding' not in response.headers
+    assert response.get_json() == {'jazz': songs}
+    etag = response.headers['ETag']
+    assert client.get('/api/playlists', headers={'Accept-Encoding': 'gzip', 'If-None-Match': etag}).status_code == 304
+
+    # A body over the threshold is compressed, and the ETag changes with the write
+    for i in range(5, 5 + GZIP_MIN_BYTES // 10):
+        store.add('jazz', f'song_{i}.wav')
+    response = client.get('/api/playlists', headers={'Accept-Encoding': 'gzip', 'If-None-Match': etag})
+    assert response.status_code == 200
+    assert response.headers['Content-Encoding'] == 'gzip'
+    assert len(json.loads(gzip.decompress(response.get_data()))['jazz']) == 5 + GZIP_MIN_BYTES // 10
+
+
+def test_audio_ranges_etags_and_preview(backend, client, monkeypatch):
+    data = _wav(seed=5)
+    result = _upload(client, data, 'listen.wav').get_json()
+
+    response = client.get(result['audio_url'], headers={'Range': 'bytes=0-99'})
+    assert response.status_code == 206
+    assert response.get_data() == data[:100]
+    assert response.headers['Content-Range'] == f'bytes 0-99/{len(data)}'
+    assert 'immutable' in response.headers['Cache-Control']
+
+    etag = client.get(result['audio_url']).headers['ETag']
+    assert client.get(result['audio_url'], headers={'If-None-Match': etag}).status_code == 304
+    assert client.get('/api/audio/missing.wav').status_code == 404
+
+    # Without a preview the original is served instead
+    app_module = backend[0]
+    generator = app_module.preview_generator
+    monkeypatch.setattr(app_module, 'preview_generator', None)
+    fallback = client.get(result['preview_url'])
+    assert fallback.status_code == 307
+    assert fallback.headers['Location'].endswith(result['audio_url'])
+    monkeypatch.undo()
+
+    deadline = time.time() + 30
+    while not generator.is_ready(etag.strip('"')):
+        assert time.time() < deadline
+        time.sleep(0.05)
+    preview = client.get(result['preview_url'])
+    assert preview.status_code == 200
+    assert preview.mimetype == 'audio/mpeg'
+
+
+def test_metrics_exposition(client):
+    _upload(client, _wav(seed=6), 'metrics.wav')
+    response = client.get('/metrics')
+    assert response.status_code == 200
+    assert response.headers['Content-Type'].startswith('text/plain; version=0.0.4')
+    text = response.get_data(as_text=True)
+    counts = {line.rsplit(' ', 1)[0]: float(line.rsplit(' ', 1)[1])
+              for line in text.splitlines() if not line.startswith('#')}
+    assert counts['genre_uploads_total{mode="sync"}'] >= 1
+    assert counts['genre_stage_duration_seconds_count{stage="inference"}'] >= 1
+    assert counts['genre_requests_in_flight'] == 1
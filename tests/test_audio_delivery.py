@@ -0,0 +1,44 @@
+"""
+Tests for content-hash ETags and preview encoding in backend.utils.audio_delivery.
+"""
+import os
+import hashlib
+
+import soundfile as sf
+
+from backend.utils.audio_delivery import ContentHashIndex, PreviewGenerator, hash_file
+from backend.utils.warmup import synthetic_track
+
+
+def test_content_hash_index_notices_overwrites(tmp_path):
+    path = tmp_path / 'song.wav'
+    path.write_bytes(b'first upload')
+    index = ContentHashIndex()
+    assert index.get(str(path)) == hashlib.sha256(b'first upload').hexdigest()
+
+    path.write_bytes(b'second, longer upload')
+    assert index.get(str(path)) == hash_file(str(path)) == hashlib.sha256(b'second, longer upload').hexdigest()
+
+    # Recorded hashes are trusted while the file is unchanged
+    index.record(str(path), 'recorded')
+    assert index.get(str(path)) == 'recorded'
+
+
+def test_preview_is_a_small_mono_mp3_encoded_once(tmp_path):
+    source = tmp_path / 'song.wav'
+    sf.write(str(source), synthetic_track(duration=5.0), 22050)
+    generator = PreviewGenerator(str(tmp_path / 'previews'), sample_rate=22050, compression_level=0.8)
+    content_hash = hash_file(str(source))
+
+    assert not generator.is_ready(content_hash)
+    future = generator.submit(str(source), content_hash)
+    assert generator.submit(str(source), content_hash) in (future, None)
+    future.result(timeout=60)
+
+    assert generator.is_ready(content_hash)
+    assert generator.submit(str(source), content_hash) is None
+    info = sf.info(generator.path(content_hash))
+    assert info.channels == 1 and info.samplerate == 22050
+    assert os.path.getsize(generator.path(content_hash)) < os.path.getsize(source) / 5
+    assert os.listdir(tmp_path / 'previews') == [os.path.basename(generator.path(content_hash))]
+    generator.shutdown()
@@ -0,0 +1,55 @@
+"""
+Tests for audio loading in backend.utils.audio_processor.
+"""
+import io
+
+import librosa
+import numpy as np
+import pytest
+import soundfile as sf
+
+from backend.config import SAMPLE_RATE, DURATION
+from backend.utils.audio_processor import process_audio, can_decode_in_memory
+
+
+@pytest.mark.parametrize('file_format', ['wav', 'mp3'])
+def test_process_audio_decodes_only_the_window(tmp_path, file_format):
+    path = str(tmp_path / f"long.{file_format}")
+    rng = np.random.RandomState(0)
+    sf.write(path, (0.1 * rng.randn(SAMPLE_RATE * 70)).astype(np.float32), SAMPLE_RATE)
+    full, _ = librosa.load(path, sr=SAMPLE_RATE)
+
+    window = process_audio(path)
+    shifted = process_audio(path, offset=20.0, duration=10.0)
+
+    assert len(window) == SAMPLE_RATE * DURATION
+    np.testing.assert_allclose(window, full[:len(window)], atol=1e-4)
+    # An mp3 decoder restarted mid-stream needs a couple of frames to settle
+    settle = 2048 if file_format == 'mp3' else 0
+    assert len(shifted) == SAMPLE_RATE * 10
+    np.testing.assert_allclose(shifted[settle:], full[SAMPLE_RATE * 20 + settle:SAMPLE_RATE * 30], atol=1e-4)
+
+
+def test_process_audio_pads_short_files(tmp_path):
+    path = str(tmp_path / "short.wav")
+    sf.write(path, np.ones(SAMPLE_RATE * 5, dtype=np.float32) * 0.1, SAMPLE_RATE)
+
+    audio = process_audio(path)
+
+    assert len(audio) == SAMPLE_RATE * DURATION
+    assert not np.any(audio[SAMPLE_RATE * 5 + 10:])
+
+
+@pytest.mark.parametrize('file_format', ['wav', 'mp3'])
+def test_process_audio_decodes_from_memory(tmp_path, file_format):
+    path = tmp_path / f"song.{file_format}"
+    rng = np.random.RandomState(1)
+    sf.write(str(path), (0.1 * rng.randn(SAMPLE_RATE * 35)).astype(np.float32), SAMPLE_RATE)
+    data = path.read_bytes()
+
+    assert can_decode_in_memory(data)
+    np.testing.assert_array_equal(process_audio(io.BytesIO(data)), process_audio(str(path)))
+
+
+def test_can_decode_in_memory_rejects_unknown_formats():
+    assert not can_decode_in_memory(b'not audio at all')
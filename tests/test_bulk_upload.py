@@ -0,0 +1,82 @@
+"""
+Tests for bulk upload saving and parallel classification in backend.utils.bulk_upload.
+"""
+import io
+import hashlib
+import zipfile
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from backend.utils.bulk_upload import BulkUploadRejected, save_bulk_upload, iter_bulk_results
+
+ALLOWED = {'wav', 'mp3'}
+
+
+def _zip(members):
+    buffer = io.BytesIO()
+    with zipfile.ZipFile(buffer, 'w') as archive:
+        for name, content in members.items():
+            archive.writestr(name, content)
+    buffer.seek(0)
+    return buffer
+
+
+def test_save_expands_zips_and_reports_bad_items(tmp_path):
+    archive = _zip({
+        'album/one.wav': b'one', 'album/two.mp3': b'two', 'album/cover.jpg': b'jpg',
+        '__MACOSX/album/._one.wav': b'meta', 'album/song.wav': b'zipped song',
+    })
+    parts = [('song.wav', io.BytesIO(b'song')), ('notes.txt', io.BytesIO(b'x')),
+             ('album.zip', archive), ('broken.zip', io.BytesIO(b'not a zip'))]
+
+    items = save_bulk_upload(parts, str(tmp_path), ALLOWED)
+
+    assert [item['filename'] for item in items] == ['song.wav', 'notes.txt', 'one.wav', 'two.mp3', 'song_1.wav', 'broken.zip']
+    assert [item['index'] for item in items] == list(range(6))
+    assert 'error' in items[1] and 'error' in items[5]
+    assert (tmp_path / 'song.wav').read_bytes() == b'song'
+    assert (tmp_path / 'song_1.wav').read_bytes() == b'zipped song'
+    assert items[2]['content_hash'] == hashlib.sha256(b'one').hexdigest()
+    assert not (tmp_path / 'cover.jpg').exists()
+
+
+def test_save_rejects_oversized_uploads(tmp_path):
+    parts = [(f'{i}.wav', io.BytesIO(b'x')) for i in range(3)]
+    with pytest.raises(BulkUploadRejected):
+        save_bulk_upload(parts, str(tmp_path), ALLOWED, max_files=2)
+
+    archive = _zip({'big.wav': b'\0' * 10000})
+    with pytest.raises(BulkUploadRejected):
+        save_bulk_upload([('a.zip', archive)], str(tmp_path), ALLOWED, max_uncompressed_bytes=1000)
+
+
+def test_rejected_upload_removes_saved_files(tmp_path):
+    small = _zip({'one.wav': b'one'})
+    big = _zip({'big.wav': b'\0' * 10000})
+    parts = [('song.wav', io.BytesIO(b'song')), ('small.zip', small), ('big.zip', big)]
+    with pytest.raises(BulkUploadRejected):
+        save_bulk_upload(parts, str(tmp_path), ALLOWED, max_uncompressed_bytes=1000)
+    assert list(tmp_path.iterdir()) == []
+
+    parts = [(f'{i}.wav', io.BytesIO(b'x')) for i in range(3)]
+    with pytest.raises(BulkUploadRejected):
+        save_bulk_upload(parts, str(tmp_path), ALLOWED, max_files=2)
+    assert list(tmp_path.iterdir()) == []
+
+
+def test_results_report_errors_per_item(tmp_path):
+    parts = [('good.wav', io.BytesIO(b'a')), ('bad.wav', io.BytesIO(b'b')), ('skip.txt', io.BytesIO(b'c'))]
+    items = save_bulk_upload(parts, str(tmp_path), ALLOWED)
+
+    def classify(path, filename, content_hash):
+        if filename == 'bad.wav':
+            raise ValueError('undecodable')
+        return {'filename': filename, 'genre': 'rock'}
+
+    with ThreadPoolExecutor(max_workers=2) as executor:
+        lines = sorted(iter_bulk_results(items, classify, executor), key=lambda line: line['index'])
+
+    assert [line['status'] for line in lines] == ['ok', 'error', 'error']
+    assert lines[0]['result'] == {'filename': 'good.wav', 'genre': 'rock'}
+    assert lines[1]['error'] == 'undecodable'
@@ -0,0 +1,62 @@
+"""
+Tests for the precomputed training chunk dataset in backend.utils.chunk_dataset.
+"""
+import numpy as np
+import pytest
+import soundfile as sf
+
+from backend.config import SAMPLE_RATE, GENRES
+from backend.utils.audio_processor import process_audio, create_audio_chunks
+from backend.utils.chunk_dataset import build_chunk_dataset, open_chunk_dataset, make_tf_dataset
+from backend.utils.spectrogram_generator import prepare_audio_chunks_for_model
+from backend.utils.spectrogram_shards import ShardWriter
+from backend.utils.warmup import synthetic_track
+
+
+@pytest.fixture
+def audio_dir(tmp_path):
+    for seed, genre in enumerate(['jazz', 'blues', 'jazz']):
+        (tmp_path / 'audio' / genre).mkdir(parents=True, exist_ok=True)
+        sf.write(str(tmp_path / 'audio' / genre / f"{genre}.{seed}.wav"), synthetic_track(10, seed=seed), SAMPLE_RATE)
+    return tmp_path / 'audio'
+
+
+def test_dataset_matches_serving_inputs(audio_dir, tmp_path):
+    stats = build_chunk_dataset(str(audio_dir), str(tmp_path / 'chunks'))
+    reader = open_chunk_dataset(str(tmp_path / 'chunks'))
+
+    audio = process_audio(str(audio_dir / 'jazz' / 'jazz.2.wav'))
+    expected, chunk_indices = prepare_audio_chunks_for_model(audio, create_audio_chunks(audio))
+    assert stats == {'tracks': 3, 'chunks': 3 * len(chunk_indices), 'failed': 0}
+    assert len(reader) == stats['chunks']
+
+    keys = [key for key in reader.keys if key.startswith('jazz/jazz.2.wav#')]
+    assert keys == [f"jazz/jazz.2.wav#{i}" for i in chunk_indices]
+    for i, chunk_index in enumerate(chunk_indices):
+        np.testing.assert_array_equal(reader[reader.keys.index(keys[i])], expected[i, ..., 0])
+
+
+def test_tf_dataset_yields_every_chunk_with_its_label(audio_dir, tmp_path):
+    build_chunk_dataset(str(audio_dir), str(tmp_path / 'chunks'), dtype='float16', shard_size_bytes=200000)
+    reader = open_chunk_dataset(str(tmp_path / 'chunks'))
+    assert reader.num_shards > 1
+
+    inputs, labels = [], []
+    for x, y in make_tf_dataset(str(tmp_path / 'chunks'), batch_size=8, shuffle_buffer=16, cycle_length=2, seed=0):
+        assert x.shape[1:] == (128, 128, 1)
+        inputs.append(x.numpy())
+        labels.append(y.numpy())
+    labels = np.concatenate(labels)
+
+    assert len(labels) == len(reader)
+    expected = sorted(GENRES.index(reader.genre(i)) for i in range(len(reader)))
+    assert sorted(labels.tolist()) == expected
+    np.testing.assert_allclose(np.sort(np.concatenate(inputs).sum(axis=(1, 2, 3))),
+                               np.sort([reader[i].astype(np.float32).sum() for i in range(len(reader))]), rtol=1e-5)
+
+
+def test_open_rejects_other_preprocessing(tmp_path):
+    with ShardWriter(tmp_path / 'chunks', metadata={'preprocessing': {'n_mels': 64}}) as writer:
+        writer.add(np.zeros((128, 128)), 'rock')
+    with pytest.raises(ValueError):
+        open_chunk_dataset(str(tmp_path / 'chunks'))
@@ -0,0 +1,100 @@
+"""
+Tests for the incremental manifest logic of scripts/generate_spectrograms.py.
+"""
+import os
+import argparse
+import importlib.util
+from pathlib import Path
+
+import numpy as np
+import pytest
+import soundfile as sf
+
+SCRIPT = Path(__file__).resolve().parent.parent / 'scripts' / 'generate_spectrograms.py'
+SAMPLE_RATE = 8000
+
+
+@pytest.fixture
+def generator(monkeypatch):
+    spec = importlib.util.spec_from_file_location('generate_spectrograms', SCRIPT)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+
+    # Record which sources are actually recomputed
+    computed = []
+    compute_spectrogram = module.compute_spectrogram
+
+    def counting_compute(audio_path, *args):
+        computed.append(Path(audio_path).name)
+        return compute_spectrogram(audio_path, *args)
+
+    monkeypatch.setattr(module, 'compute_spectrogram', counting_compute)
+    module.computed = computed
+    return module
+
+
+def _write_tone(path, frequency, seconds=0.5):
+    t = np.arange(int(SAMPLE_RATE * seconds)) / SAMPLE_RATE
+    sf.write(str(path), 0.5 * np.sin(2 * np.pi * frequency * t), SAMPLE_RATE)
+
+
+def _args(tmp_path, **overrides):
+    args = dict(
+        dataset_dir=tmp_path / 'dataset', output_dir_npy=tmp_path / 'npy', output_dir_shards=tmp_path / 'shards',
+        format='npy', dtype='float32', shard_size_mb=1, sample_rate=SAMPLE_RATE, n_fft=512, hop_length=128,
+        n_mels=32, fmin=0, fmax=None, workers=1, force=False,
+    )
+    args.update(overrides)
+    return argparse.Namespace(**args)
+
+
+def _run(generator, args):
+    generator.computed.clear()
+    generator.main(args)
+    return sorted(generator.computed)
+
+
+@pytest.fixture
+def dataset(tmp_path):
+    for genre, frequencies in (('blues', (220, 330)), ('rock', (440,))):
+        (tmp_path / 'dataset' / genre).mkdir(parents=True)
+        for i, frequency in enumerate(frequencies):
+            _write_tone(tmp_path / 'dataset' / genre / f'{genre}.{i:05d}.wav', frequency)
+    return tmp_path / 'dataset'
+
+
+def test_second_run_rewrites_only_changed_inputs(generator, dataset, tmp_path):
+    args = _args(tmp_path)
+    assert _run(generator, args) == ['blues.00000.wav', 'blues.00001.wav', 'rock.00000.wav']
+    output = tmp_path / 'npy' / 'blues' / 'blues.00000.npy'
+    assert np.load(output).shape[0] == 32
+    assert (tmp_path / 'npy' / generator.MANIFEST_NAME).exists()
+
+    # Nothing changed
+    assert _run(generator, args) == []
+
+    # New content (different size) and a new source are recomputed
+    _write_tone(dataset / 'rock' / 'rock.00000.wav', 550, seconds=0.75)
+    _write_tone(dataset / 'rock' / 'rock.00001.wav', 660)
+    assert _run(generator, args) == ['rock.00000.wav', 'rock.00001.wav']
+
+    # Same content with a new mtime is recognized by its hash
+    stat = os.stat(dataset / 'blues' / 'blues.00000.wav')
+    os.utime(dataset / 'blues' / 'blues.00000.wav', ns=(stat.st_atime_ns, stat.st_mtime_ns + 10 ** 9))
+    assert _run(generator, args) == []
+
+    # A missing output is recomputed
+    output.unlink()
+    assert _run(generator, args) == ['blues.00000.wav']
+    assert output.exists()
+
+
+def test_parameter_change_and_force_recompute_everything(generator, dataset, tmp_path):
+    everything = ['blues.00000.wav', 'blues.00001.wav', 'rock.00000.wav']
+    _run(generator, _args(tmp_path))
+
+    assert _run(generator, _args(tmp_path, n_mels=16)) == everything
+    assert np.load(tmp_path / 'npy' / 'rock' / 'rock.00000.npy').shape[0] == 16
+    assert _run(generator, _args(tmp_path, n_mels=16)) == []
+
+    assert _run(generator, _args(tmp_path, n_mels=16, force=True)) == everything
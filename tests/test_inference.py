@@ -0,0 +1,133 @@
+"""
+Tests for the chunked inference path in backend.models.model_loader.
+These use a stub model so they run without the trained weights.
+"""
+import numpy as np
+import pytest
+
+from backend.config import GENRES, SAMPLE_RATE, DURATION, HOP_SAMPLES_BETWEEN_CHUNKS
+from backend.models import model_loader
+from backend.utils import spectrogram_generator
+from backend.utils.audio_processor import create_audio_chunks
+
+
+class StubModel:
+    """Minimal stand-in for a Keras model that records predict() calls."""
+    input_shape = (None, 128, 128, 1)
+    output_shape = (None, len(GENRES))
+
+    def __init__(self, favoured_index=0):
+        self.favoured_index = favoured_index
+        self.batch_sizes = []
+
+    def predict(self, inputs, batch_size=None, verbose=0):
+        self.batch_sizes.append(inputs.shape[0])
+        prediction = np.full((inputs.shape[0], len(GENRES)), 0.02, dtype=np.float32)
+        prediction[:, self.favoured_index] = 1.0 - 0.02 * (len(GENRES) - 1)
+        return prediction
+
+
+def _synthetic_audio(seed=0):
+    rng = np.random.RandomState(seed)
+    return (0.1 * rng.randn(SAMPLE_RATE * DURATION)).astype(np.float32)
+
+
+def test_predict_genre_runs_single_forward_pass():
+    model = StubModel(favoured_index=GENRES.index('jazz'))
+    genre, confidence = model_loader.predict_genre(model, audio_data=_synthetic_audio())
+
+    assert genre == 'jazz'
+    assert model.batch_sizes == [14]
+    assert set(confidence) == set(GENRES)
+    assert sum(confidence.values()) == pytest.approx(1.0, abs=1e-5)
+
+
+@pytest.mark.parametrize('track_level_mel', [True, False])
+def test_predict_genre_falls_back_to_per_chunk_preparation(monkeypatch, track_level_mel):
+    name = 'prepare_chunk_from_track_for_model' if track_level_mel else 'prepare_spectrogram_for_model'
+    original = getattr(spectrogram_generator, name)
+    calls = {'count': 0}
+
+    def flaky_prepare(*args):
+        calls['count'] += 1
+        if calls['count'] == 2:
+            raise RuntimeError("bad chunk")
+        return original(*args)
+
+    def failing_batch(*args):
+        raise RuntimeError("batch failed")
+
+    monkeypatch.setattr(spectrogram_generator, 'TRACK_LEVEL_MEL', track_level_mel)
+    monkeypatch.setattr(spectrogram_generator, name, flaky_prepare)
+    monkeypatch.setattr(spectrogram_generator, 'prepare_track_chunks_for_model', failing_batch)
+    monkeypatch.setattr(spectrogram_generator, 'prepare_chunks_for_model', failing_batch)
+    model = StubModel()
+    model_loader.predict_genre(model, audio_data=_synthetic_audio())
+
+    assert model.batch_sizes == [13]
+
+
+@pytest.mark.parametrize('track_level_mel', [True, False])
+def test_batched_preparation_matches_per_chunk(monkeypatch, track_level_mel):
+    audio = _synthetic_audio()
+    chunks = create_audio_chunks(audio)
+    track_mel_power = spectrogram_generator.compute_track_mel_power(audio) if track_level_mel else None
+
+    batch_input, chunk_indices = spectrogram_generator.prepare_chunk_batch(chunks, track_mel_power)
+    if track_level_mel:
+        expected = [spectrogram_generator.prepare_chunk_from_track_for_model(track_mel_power, i * HOP_SAMPLES_BETWEEN_CHUNKS)
+                    for i in range(len(chunks))]
+    else:
+        expected = [spectrogram_generator.prepare_spectrogram_for_model(c) for c in chunks]
+
+    assert chunk_indices == list(range(len(chunks)))
+    np.testing.assert_allclose(batch_input, np.concatenate(expected), atol=1e-5)
+
+
+def _tonal_audio():
+    t = np.arange(SAMPLE_RATE * DURATION) / SAMPLE_RATE
+    tones = sum(0.1 * np.sin(2 * np.pi * f * t) for f in (110.0, 440.0, 1250.0))
+    return (tones + 0.01 * np.random.RandomState(0).randn(len(t))).astype(np.float32)
+
+
+def test_track_level_mel_matches_per_chunk_pipeline():
+    audio = _tonal_audio()
+    chunks = create_audio_chunks(audio)
+    track_mel_power = spectrogram_generator.compute_track_mel_power(audio)
+
+    per_chunk = np.concatenate([spectrogram_generator.prepare_spectrogram_for_model(c) for c in chunks])
+    sliced = np.concatenate([
+        spectrogram_generator.prepare_chunk_from_track_for_model(track_mel_power, i * HOP_SAMPLES_BETWEEN_CHUNKS)
+        for i in range(len(chunks))
+    ])
+
+    assert sliced.shape == per_chunk.shape
+    assert np.mean(np.abs(sliced - per_chunk)) < 0.03
+
+
+def test_spread_chunk_order_covers_track():
+    order = model_loader.spread_chunk_order(14)
+
+    assert sorted(order) == list(range(14))
+    assert order[:3] == [7, 0, 13]
+
+
+def test_adaptive_prediction_stops_early_on_clear_tracks():
+    model = StubModel(favoured_index=GENRES.index('metal'))
+    genre, confidence, details = model_loader.predict_genre_adaptive(model, _synthetic_audio(), min_chunks=4, step=2)
+
+    assert genre == 'metal'
+    assert details == {'chunks_used': 6, 'chunks_total': 14, 'early_exit': True}
+    assert model.batch_sizes == [4, 2]
+
+
+def test_adaptive_prediction_uses_every_chunk_when_ambiguous():
+    class UniformModel(StubModel):
+        def predict(self, inputs, batch_size=None, verbose=0):
+            self.batch_sizes.append(inputs.shape[0])
+            return np.full((inputs.shape[0], len(GENRES)), 1.0 / len(GENRES), dtype=np.float32)
+
+    model = UniformModel()
+    _, _, details = model_loader.predict_genre_adaptive(model, _synthetic_audio(), min_chunks=4, step=2)
+
+    assert details == {'chunks_used': 14, 'chunks_total': 14, 'early_exit': False}
@@ -0,0 +1,80 @@
+"""
+Tests for cross-request batching in backend.models.inference_dispatcher.
+"""
+import threading
+
+import numpy as np
+import pytest
+
+from backend.models.inference_dispatcher import InferenceDispatcher
+from backend.models.model_loader import predict_chunks
+from backend.utils.metrics import STAGE_DURATION, INFERENCE_QUEUE_WAIT, CHUNKS_EVALUATED
+
+
+class SumModel:
+    """Stub model whose output row is the sum of its input row."""
+    input_shape = (None, 4, 4, 1)
+    output_shape = (None, 1)
+
+    def __init__(self, fail=False):
+        self.fail = fail
+        self.batch_sizes = []
+
+    def predict(self, inputs, batch_size=None, verbose=0):
+        self.batch_sizes.append(len(inputs))
+        if self.fail:
+            raise RuntimeError("forward pass failed")
+        return inputs.reshape(len(inputs), -1).sum(axis=1, keepdims=True)
+
+
+def test_concurrent_requests_share_batches_and_get_their_own_rows():
+    model = SumModel()
+    dispatcher = InferenceDispatcher(model, max_batch_size=32, max_delay_ms=200)
+    results = {}
+
+    def call(i):
+        inputs = np.full((4, 4, 4, 1), float(i), dtype=np.float32)
+        results[i] = dispatcher.predict(inputs)
+
+    threads = [threading.Thread(target=call, args=(i,)) for i in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    dispatcher.stop()
+
+    for i in range(8):
+        np.testing.assert_allclose(results[i], np.full((4, 1), 16.0 * i))
+    assert max(model.batch_sizes) <= 32
+    assert len(model.batch_sizes) < 8
+    stats = dispatcher.stats()
+    assert stats['requests'] == 8
+    assert stats['rows'] == 32
+    assert stats['max_queue_wait_ms'] >= 0.0
+
+
+def test_forward_pass_errors_reach_every_caller():
+    dispatcher = InferenceDispatcher(SumModel(fail=True), max_delay_ms=1)
+    with pytest.raises(RuntimeError, match="forward pass failed"):
+        dispatcher.predict(np.zeros((2, 4, 4, 1), dtype=np.float32))
+    dispatcher.stop()
+
+
+def _count(histogram):
+    return sum(histogram.counts)
+
+
+def test_inference_metrics_are_recorded_once_per_forward_pass():
+    inference = STAGE_DURATION.labels('inference')
+    before_inference = _count(inference)
+    before_wait = _count(INFERENCE_QUEUE_WAIT.labels())
+    before_chunks = CHUNKS_EVALUATED.labels().value
+
+    dispatcher = InferenceDispatcher(SumModel(), max_delay_ms=1)
+    predict_chunks(dispatcher, np.zeros((3, 4, 4, 1), dtype=np.float32))
+    dispatcher.stop()
+
+    # The dispatcher times the forward pass; the caller does not time it again
+    assert _count(inference) == before_inference + 1
+    assert _count(INFERENCE_QUEUE_WAIT.labels()) == before_wait + 1
+    assert CHUNKS_EVALUATED.labels().value == before_chunks + 3
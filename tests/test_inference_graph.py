@@ -0,0 +1,74 @@
+"""
+Tests for the inference-graph optimizer in backend.models.inference_graph.
+"""
+import numpy as np
+import pytest
+
+tf = pytest.importorskip('tensorflow')
+
+from backend.models.architecture import FrequencyMasking, TimeMasking
+from backend.models.inference_graph import (
+    CompiledModel, build_inference_model, optimize_for_inference, verify_inference_model
+)
+
+
+@pytest.fixture(scope='module')
+def trained_like_model():
+    model = tf.keras.Sequential([
+        tf.keras.layers.Input(shape=(16, 16, 1)),
+        FrequencyMasking(2, name="FreqMask"),
+        TimeMasking(2, name="TimeMask"),
+        tf.keras.layers.Conv2D(4, (3, 3), padding='same', use_bias=False),
+        tf.keras.layers.BatchNormalization(),
+        tf.keras.layers.Activation('relu'),
+        tf.keras.layers.MaxPooling2D((2, 2)),
+        tf.keras.layers.Dropout(0.3),
+        # Not foldable: the activation sits between the convolution and BN
+        tf.keras.layers.Conv2D(4, (3, 3), padding='same', activation='relu'),
+        tf.keras.layers.BatchNormalization(),
+        tf.keras.layers.GlobalAveragePooling2D(),
+        tf.keras.layers.Dense(3, activation='softmax'),
+    ])
+    rng = np.random.RandomState(0)
+    for layer in model.layers:
+        if isinstance(layer, tf.keras.layers.BatchNormalization):
+            layer.moving_mean.assign(rng.randn(4).astype(np.float32) * 0.2)
+            layer.moving_variance.assign(rng.uniform(0.5, 2.0, 4).astype(np.float32))
+            layer.gamma.assign(rng.uniform(0.5, 1.5, 4).astype(np.float32))
+            layer.beta.assign(rng.randn(4).astype(np.float32) * 0.1)
+    return model
+
+
+def test_training_layers_are_stripped_and_batch_norm_folded(trained_like_model):
+    inference_model = build_inference_model(trained_like_model)
+    layer_types = [type(layer).__name__ for layer in inference_model.layers]
+
+    assert 'FrequencyMasking' not in layer_types and 'TimeMasking' not in layer_types
+    assert 'Dropout' not in layer_types
+    assert layer_types.count('BatchNormalization') == 1
+
+    inputs = np.random.RandomState(1).rand(5, 16, 16, 1).astype(np.float32)
+    np.testing.assert_allclose(inference_model(inputs, training=False),
+                               trained_like_model(inputs, training=False), atol=1e-5)
+
+
+def test_compiled_model_pads_and_splits_batches_across_buckets(trained_like_model):
+    compiled = optimize_for_inference(trained_like_model, (1, 2, 4, 8), tolerance=1e-4)
+    inputs = np.random.RandomState(2).rand(20, 16, 16, 1).astype(np.float32)
+    expected = trained_like_model(inputs, training=False).numpy()
+
+    for batch in (inputs[:1], inputs[:3], inputs):
+        np.testing.assert_allclose(compiled.predict(batch), expected[:len(batch)], atol=1e-5)
+    assert compiled.input_shape == (None, 16, 16, 1)
+    # 20 rows run as 8 + 8 + 4
+    counts = compiled.bucket_counts()
+    assert counts[8] >= 2 and counts[4] >= 2
+
+
+def test_verification_rejects_a_mismatching_model(trained_like_model):
+    class Wrong:
+        def predict(self, inputs, batch_size=None, verbose=0):
+            return np.zeros((len(inputs), 3), dtype=np.float32)
+
+    with pytest.raises(ValueError):
+        verify_inference_model(trained_like_model, Wrong(), np.ones((2, 16, 16, 1), dtype=np.float32), 1e-4)
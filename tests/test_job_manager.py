@@ -0,0 +1,111 @@
+"""
+Tests for the background upload jobs in backend.utils.job_manager.
+"""
+import time
+import threading
+
+import pytest
+
+from backend.utils.job_manager import JobManager, JobQueueFull
+
+
+def _wait_for(manager, job_id, states, timeout=5.0):
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        job = manager.get(job_id)
+        if job['status'] in states:
+            return job
+        time.sleep(0.01)
+    raise AssertionError(f"Job {job_id} did not reach {states}")
+
+
+def test_job_succeeds_with_result():
+    manager = JobManager(max_workers=1)
+    job_id = manager.submit(lambda x, checkpoint: x * 2, 21)
+
+    job = _wait_for(manager, job_id, {'succeeded'})
+    assert job['result'] == 42
+    assert job['error'] is None
+
+
+def test_job_failure_is_reported():
+    def fail(checkpoint):
+        raise ValueError("bad audio")
+
+    manager = JobManager(max_workers=1)
+    job = _wait_for(manager, manager.submit(fail), {'failed'})
+    assert job['error'] == 'bad audio'
+
+
+def test_running_job_is_cancelled_at_checkpoint():
+    started = threading.Event()
+    release = threading.Event()
+    reached_end = []
+
+    def work(checkpoint):
+        started.set()
+        release.wait(5)
+        checkpoint()
+        reached_end.append(True)
+
+    manager = JobManager(max_workers=1)
+    job_id = manager.submit(work)
+    started.wait(5)
+    assert manager.cancel(job_id)['status'] == 'cancelled'
+    release.set()
+    manager.shutdown()
+
+    assert manager.get(job_id)['status'] == 'cancelled'
+    assert not reached_end
+
+
+def test_running_job_times_out():
+    def slow(checkpoint):
+        time.sleep(0.2)
+        checkpoint()
+
+    manager = JobManager(max_workers=1, timeout_s=0.05)
+    job = _wait_for(manager, manager.submit(slow), {'timed_out'})
+    assert 'timeout' in job['error']
+
+
+def test_queue_is_bounded_and_results_expire():
+    release = threading.Event()
+    manager = JobManager(max_workers=1, max_pending=1, retention_s=0.05)
+    job_id = manager.submit(lambda checkpoint: release.wait(5))
+    with pytest.raises(JobQueueFull):
+        manager.submit(lambda checkpoint: None)
+
+    release.set()
+    _wait_for(manager, job_id, {'succeeded'})
+    time.sleep(0.1)
+    assert manager.get(job_id) is None
+
+
+def test_cancelled_job_holds_its_slot_until_it_stops():
+    started = threading.Event()
+    release = threading.Event()
+
+    def work(checkpoint):
+        started.set()
+        release.wait(5)
+        checkpoint()
+
+    manager = JobManager(max_workers=1, max_pending=1)
+    job_id = manager.submit(work)
+    started.wait(5)
+    manager.cancel(job_id)
+    with pytest.raises(JobQueueFull):
+        manager.submit(lambda checkpoint: None)
+
+    release.set()
+    deadline = time.time() + 5
+    while True:
+        try:
+            next_id = manager.submit(lambda checkpoint: 'done')
+            break
+        except JobQueueFull:
+            assert time.time() < deadline
+            time.sleep(0.01)
+    assert _wait_for(manager, next_id, {'succeeded'})['result'] == 'done'
+    assert manager.get(job_id)['status'] == 'cancelled'
@@ -0,0 +1,76 @@
+"""
+Tests for the Prometheus metrics in backend.utils.metrics.
+"""
+import pytest
+
+from backend.utils.metrics import (
+    MetricsRegistry, Counter, Gauge, Histogram, REGISTRY, STAGE_DURATION, STAGE_ERRORS, stage_timer,
+    reset_serving_metrics
+)
+
+
+def _sample(text, line_prefix):
+    lines = [line for line in text.splitlines() if line.startswith(line_prefix + ' ')]
+    assert len(lines) == 1, line_prefix
+    return float(lines[0].rsplit(' ', 1)[1])
+
+
+def test_exposition_format():
+    registry = MetricsRegistry()
+    uploads = Counter('test_uploads_total', 'Uploads', ('mode',), registry=registry)
+    in_flight = Gauge('test_in_flight', 'In flight', registry=registry)
+    latency = Histogram('test_latency_seconds', 'Latency', buckets=(0.1, 1.0), registry=registry)
+
+    uploads.labels('sync').inc()
+    uploads.labels('sync').inc(2)
+    uploads.labels('say "hi"').inc()
+    in_flight.inc()
+    in_flight.inc()
+    in_flight.dec()
+    for value in (0.05, 0.1, 0.5, 3.0):
+        latency.observe(value)
+
+    text = registry.exposition()
+    assert '# TYPE test_uploads_total counter' in text
+    assert _sample(text, 'test_uploads_total{mode="sync"}') == 3
+    assert _sample(text, r'test_uploads_total{mode="say \"hi\""}') == 1
+    assert _sample(text, 'test_in_flight') == 1
+    assert '# TYPE test_latency_seconds histogram' in text
+    assert _sample(text, 'test_latency_seconds_bucket{le="0.1"}') == 2
+    assert _sample(text, 'test_latency_seconds_bucket{le="1"}') == 3
+    assert _sample(text, 'test_latency_seconds_bucket{le="+Inf"}') == 4
+    assert _sample(text, 'test_latency_seconds_count') == 4
+    assert _sample(text, 'test_latency_seconds_sum') == pytest.approx(3.65)
+
+    with pytest.raises(ValueError):
+        uploads.labels("sync").inc(-1)
+    with pytest.raises(ValueError):
+        Counter('test_uploads_total', 'Duplicate', registry=registry)
+
+
+def test_stage_timer_records_duration_and_errors():
+    before = REGISTRY.exposition()
+    with stage_timer('render'):
+        pass
+    with pytest.raises(RuntimeError):
+        with stage_timer('render'):
+            raise RuntimeError('render failed')
+    after = REGISTRY.exposition()
+
+    count = 'genre_stage_duration_seconds_count{stage="render"}'
+    errors = 'genre_stage_errors_total{stage="render"}'
+    assert _sample(after, count) == _sample(before, count) + 2
+    assert _sample(after, errors) == _sample(before, errors) + 1
+    assert _sample(after, 'genre_stage_errors_total{stage="decode"}') >= 0
+
+
+def test_reset_serving_metrics_drops_warmup_samples():
+    with stage_timer('inference'):
+        pass
+    reset_serving_metrics()
+
+    text = REGISTRY.exposition()
+    assert _sample(text, 'genre_stage_duration_seconds_count{stage="inference"}') == 0
+    assert _sample(text, 'genre_stage_duration_seconds_bucket{stage="inference",le="+Inf"}') == 0
+    assert _sample(text, 'genre_stage_errors_total{stage="inference"}') == 0
+    assert _sample(text, 'genre_inference_queue_wait_seconds_count') == 0
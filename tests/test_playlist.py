@@ -0,0 +1,98 @@
+"""
+Tests for the SQLite playlist store in backend.api.playlist.
+"""
+import json
+import threading
+
+from backend.api.playlist import PlaylistStore
+
+
+def test_add_keeps_order_and_ignores_duplicates(tmp_path):
+    store = PlaylistStore(str(tmp_path / 'playlists.db'))
+    assert store.add('rock', 'a.wav')
+    assert store.add('jazz', 'b.wav')
+    assert store.add('rock', 'c.wav')
+    assert not store.add('rock', 'a.wav')
+    # The same file may be in several playlists
+    assert store.add('jazz', 'a.wav')
+
+    assert store.all() == {'rock': ['a.wav', 'c.wav'], 'jazz': ['b.wav', 'a.wav']}
+    assert list(store.all()) == ['rock', 'jazz']
+    assert store.songs('rock') == ['a.wav', 'c.wav']
+    assert store.songs('metal') == []
+
+
+def test_json_is_migrated_once(tmp_path):
+    legacy = tmp_path / 'playlists.json'
+    legacy.write_text(json.dumps({'classical': ['a.wav', 'b.wav'], 'pop': ['c.wav']}))
+    db_path = str(tmp_path / 'playlists.db')
+
+    store = PlaylistStore(db_path, legacy_json_path=str(legacy))
+    assert store.all() == {'classical': ['a.wav', 'b.wav'], 'pop': ['c.wav']}
+
+    # Edits to the JSON file after the migration are not imported again
+    legacy.write_text(json.dumps({'classical': ['x.wav']}))
+    store.add('pop', 'd.wav')
+    reopened = PlaylistStore(db_path, legacy_json_path=str(legacy))
+    assert reopened.all() == {'classical': ['a.wav', 'b.wav'], 'pop': ['c.wav', 'd.wav']}
+
+
+def test_concurrent_adds_are_not_lost(tmp_path):
+    store = PlaylistStore(str(tmp_path / 'playlists.db'))
+
+    def add_songs(worker):
+        for i in range(25):
+            store.add('rock', f'{worker}_{i}.wav')
+            store.add('rock', 'shared.wav')
+
+    threads = [threading.Thread(target=add_songs, args=(w,)) for w in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    songs = store.songs('rock')
+    assert len(songs) == 4 * 25 + 1
+    assert len(set(songs)) == len(songs)
+
+
+def test_snapshot_pages_with_per_genre_cursors(tmp_path):
+    store = PlaylistStore(str(tmp_path / 'playlists.db'))
+    for i in range(5):
+        store.add('rock', f'r{i}.wav')
+        store.add('jazz', f'j{i}.wav')
+    snapshot = store.snapshot()
+
+    first = snapshot.page('rock', limit=2)
+    assert first == {'songs': ['r0.wav', 'r1.wav'], 'total': 5, 'next_cursor': first['next_cursor']}
+    second = snapshot.page('rock', first['next_cursor'], limit=2)
+    assert second['songs'] == ['r2.wav', 'r3.wav']
+    last = snapshot.page('rock', second['next_cursor'], limit=2)
+    assert last == {'songs': ['r4.wav'], 'total': 5, 'next_cursor': None}
+    assert snapshot.page('metal', limit=2) == {'songs': [], 'total': 0, 'next_cursor': None}
+
+    # A cursor stays valid when songs are added in between
+    store.add('rock', 'r5.wav')
+    assert store.snapshot().page('rock', second['next_cursor'], limit=2)['songs'] == ['r4.wav', 'r5.wav']
+
+
+def test_snapshot_is_reused_until_the_store_changes(tmp_path):
+    db_path = str(tmp_path / 'playlists.db')
+    store = PlaylistStore(db_path)
+    store.add('rock', 'a.wav')
+    snapshot = store.snapshot()
+    assert store.snapshot() is snapshot
+
+    # Re-adding an existing song changes nothing
+    store.add('rock', 'a.wav')
+    assert store.snapshot() is snapshot
+
+    store.add('rock', 'b.wav')
+    changed = store.snapshot()
+    assert changed is not snapshot
+    assert changed.etag != snapshot.etag
+    assert changed.playlists == {'rock': ['a.wav', 'b.wav']}
+
+    # Writes through another connection (e.g. another process) are noticed
+    PlaylistStore(db_path).add('jazz', 'c.wav')
+    assert store.snapshot().playlists == {'rock': ['a.wav', 'b.wav'], 'jazz': ['c.wav']}
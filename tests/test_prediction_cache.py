@@ -0,0 +1,88 @@
+"""
+Tests for the content-addressed prediction cache in backend.utils.prediction_cache.
+"""
+import io
+import hashlib
+
+from backend.utils import prediction_cache
+from backend.utils.prediction_cache import (
+    PredictionCache, compute_model_fingerprint, preprocessing_settings, save_upload_with_hash,
+    read_upload_with_hash, write_upload
+)
+
+RESULT = {'genre': 'rock', 'confidence': {'rock': 0.9, 'pop': 0.1}, 'spectrogram': 'song_spectrogram.png'}
+
+
+def test_save_upload_with_hash(tmp_path):
+    content = b'RIFF' + bytes(range(256)) * 10000
+    path = tmp_path / 'song.wav'
+
+    digest = save_upload_with_hash(io.BytesIO(content), str(path))
+
+    assert digest == hashlib.sha256(content).hexdigest()
+    assert path.read_bytes() == content
+
+
+def test_read_upload_with_hash_then_write(tmp_path):
+    content = b'ID3' + bytes(range(256)) * 10000
+    path = tmp_path / 'song.mp3'
+
+    data, digest = read_upload_with_hash(io.BytesIO(content))
+    write_upload(data, str(path))
+
+    assert data == content
+    assert digest == hashlib.sha256(content).hexdigest()
+    assert path.read_bytes() == content
+    assert [p.name for p in tmp_path.iterdir()] == ['song.mp3']
+
+
+def test_cache_hits_memory_then_disk(tmp_path):
+    cache = PredictionCache(str(tmp_path), 'fingerprint')
+    assert cache.get('abc') is None
+    cache.put('abc', RESULT)
+    assert cache.get('abc') == RESULT
+
+    # A new instance only has the on-disk tier
+    reopened = PredictionCache(str(tmp_path), 'fingerprint')
+    assert reopened.get('abc') == RESULT
+    assert reopened.get('abc') == RESULT
+    assert reopened.stats()['disk_hits'] == 1
+    assert reopened.stats()['memory_hits'] == 1
+
+    assert cache.stats()['hits'] == 1
+    assert cache.stats()['misses'] == 1
+
+
+def test_fingerprint_change_misses(tmp_path):
+    PredictionCache(str(tmp_path), 'old-model').put('abc', RESULT)
+    assert PredictionCache(str(tmp_path), 'new-model').get('abc') is None
+
+
+def test_fingerprint_covers_early_exit(tmp_path, monkeypatch):
+    model_path = str(tmp_path / 'model.keras')
+    settings = preprocessing_settings()
+    fingerprint = compute_model_fingerprint(model_path)
+
+    monkeypatch.setattr(prediction_cache, 'EARLY_EXIT', not prediction_cache.EARLY_EXIT)
+    assert compute_model_fingerprint(model_path) != fingerprint
+    monkeypatch.undo()
+    monkeypatch.setattr(prediction_cache, 'EARLY_EXIT_MARGIN', prediction_cache.EARLY_EXIT_MARGIN + 0.1)
+    assert compute_model_fingerprint(model_path) != fingerprint
+    # Datasets validated against the preprocessing settings are unaffected
+    assert preprocessing_settings() == settings
+
+
+def test_cache_evicts_least_recently_used(tmp_path):
+    cache = PredictionCache(str(tmp_path), 'fingerprint', max_memory_entries=2, max_disk_entries=3)
+    for key in ['a', 'b', 'c']:
+        cache.put(key, RESULT)
+    cache.get('a')
+    cache.put('d', RESULT)
+
+    assert cache.stats()['memory_entries'] == 2
+    assert cache.stats()['disk_entries'] == 3
+    assert len(list(tmp_path.glob('*.json'))) == 3
+
+    reopened = PredictionCache(str(tmp_path), 'fingerprint')
+    assert reopened.get('b') is None
+    assert reopened.get('a') == RESULT
@@ -0,0 +1,79 @@
+"""
+Tests for the preprocessing helpers in backend.utils.spectrogram_generator.
+"""
+import librosa
+import numpy as np
+import pytest
+
+from backend.config import TARGET_SHAPE, SAMPLE_RATE, N_FFT, HOP_LENGTH, N_MELS, SAMPLES_PER_CHUNK
+from backend.utils import spectrogram_generator
+
+
+@pytest.mark.parametrize('source_shape', [(128, 173), (128, 128), (64, 300), (100, 60)])
+@pytest.mark.parametrize('target_shape', [TARGET_SHAPE, (200, 256)])
+def test_resize_matches_tf_bilinear(source_shape, target_shape):
+    spec = np.random.RandomState(0).uniform(-80.0, 0.0, size=source_shape).astype(np.float32)
+
+    expected = spectrogram_generator.resize_spectrogram_tf(spec, target_shape)
+    resized = spectrogram_generator.resize_spectrogram(spec, target_shape)
+
+    assert resized.shape == target_shape
+    np.testing.assert_allclose(resized, expected, atol=1e-4)
+
+
+def test_resize_spectrograms_batch_matches_single():
+    specs = np.random.RandomState(1).uniform(-80.0, 0.0, size=(5, 128, 173)).astype(np.float32)
+
+    batch = spectrogram_generator.resize_spectrograms(specs)
+    single = np.stack([spectrogram_generator.resize_spectrogram(s) for s in specs])
+
+    assert batch.shape == (5,) + TARGET_SHAPE
+    np.testing.assert_allclose(batch, single, atol=1e-5)
+
+
+def test_mel_frontend_matches_librosa():
+    chunks = (0.1 * np.random.RandomState(2).randn(3, SAMPLES_PER_CHUNK)).astype(np.float32)
+    frontend = spectrogram_generator.MelFrontend()
+
+    mel_power = frontend.mel_power(chunks)
+    mel_db = frontend.compute(chunks)
+
+    for chunk, power, db in zip(chunks, mel_power, mel_db):
+        expected_power = librosa.feature.melspectrogram(
+            y=chunk, sr=SAMPLE_RATE, n_fft=N_FFT, hop_length=HOP_LENGTH, n_mels=N_MELS
+        )
+        np.testing.assert_allclose(power, expected_power, rtol=1e-3, atol=1e-6)
+        np.testing.assert_allclose(db, librosa.power_to_db(expected_power, ref=np.max), atol=1e-3)
+
+
+def test_normalize_spectrograms_is_per_instance():
+    specs = np.random.RandomState(3).uniform(-80.0, 0.0, size=(4,) + TARGET_SHAPE).astype(np.float32)
+    specs[2] = -40.0  # flat spectrogram
+
+    normalized = spectrogram_generator.normalize_spectrograms(specs)
+
+    for spec, result in zip(specs, normalized):
+        np.testing.assert_allclose(result, spectrogram_generator.normalize_spectrogram(spec), atol=1e-6)
+    assert not np.any(normalized[2])
+
+
+def test_spectrogram_image_is_rendered_on_first_request(tmp_path):
+    audio = (0.1 * np.random.RandomState(4).randn(SAMPLE_RATE * 3)).astype(np.float32)
+    track_power = spectrogram_generator.compute_track_mel_power(audio)
+
+    name = spectrogram_generator.save_spectrogram_data(track_power, 'song.wav', str(tmp_path))
+
+    assert name == 'song_spectrogram.png'
+    assert not (tmp_path / name).exists()
+    stored = np.load(tmp_path / 'song_spectrogram.npy')
+    np.testing.assert_allclose(stored, librosa.power_to_db(track_power, ref=np.max), atol=0.05)
+
+    image_path = spectrogram_generator.render_spectrogram(name, str(tmp_path))
+    with open(image_path, 'rb') as f:
+        assert f.read(8) == b'\x89PNG\r\n\x1a\n'
+    mtime = (tmp_path / name).stat().st_mtime_ns
+    assert spectrogram_generator.render_spectrogram(name, str(tmp_path)) == image_path
+    assert (tmp_path / name).stat().st_mtime_ns == mtime
+
+    with pytest.raises(FileNotFoundError):
+        spectrogram_generator.render_spectrogram('missing_spectrogram.png', str(tmp_path))
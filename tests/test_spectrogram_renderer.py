@@ -0,0 +1,55 @@
+"""
+Tests for the matplotlib-free renderer in backend.utils.spectrogram_renderer.
+"""
+import io
+import threading
+
+import numpy as np
+import pytest
+from PIL import Image
+
+from backend.utils import spectrogram_renderer
+
+
+def test_colormap_lut_matches_matplotlib_magma():
+    matplotlib = pytest.importorskip('matplotlib')
+    lut = spectrogram_renderer.build_colormap_lut()
+    reference = matplotlib.colormaps['magma'](np.linspace(0.0, 1.0, len(lut)))[:, :3] * 255
+
+    assert lut.shape == (spectrogram_renderer.NUM_COLORS, 3)
+    assert np.max(np.abs(lut.astype(np.float64) - reference)) <= 4.0
+
+
+def test_color_indices_put_low_frequencies_at_the_bottom():
+    spec = np.full((128, 100), -80.0, dtype=np.float32)
+    spec[0] = 0.0  # lowest mel band at full level
+
+    indices = spectrogram_renderer.spectrogram_color_indices(spec, 50, 256)
+
+    assert indices.shape == (256, 50)
+    assert np.all(indices[-2:] == spectrogram_renderer.NUM_COLORS - 1)
+    assert np.all(indices[:-2] == 0)
+
+
+def test_render_is_a_png_and_identical_across_threads():
+    spec = np.random.RandomState(0).uniform(-80.0, 0.0, size=(128, 1292)).astype(np.float32)
+    outputs = {}
+
+    def render(i):
+        outputs[i] = spectrogram_renderer.encode_png(spectrogram_renderer.render_spectrogram_image(spec))
+
+    threads = [threading.Thread(target=render, args=(i,)) for i in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert len(set(outputs.values())) == 1
+    image = Image.open(io.BytesIO(outputs[0]))
+    assert image.format == 'PNG'
+    assert image.size == (spectrogram_renderer.IMAGE_WIDTH, spectrogram_renderer.IMAGE_HEIGHT)
+
+
+def test_render_handles_flat_spectrograms():
+    image = spectrogram_renderer.render_spectrogram_image(np.full((128, 10), -80.0, dtype=np.float32))
+    assert image.size == (spectrogram_renderer.IMAGE_WIDTH, spectrogram_renderer.IMAGE_HEIGHT)
@@ -0,0 +1,69 @@
+"""
+Tests for the packed spectrogram dataset in backend.utils.spectrogram_shards.
+"""
+import os
+
+import numpy as np
+import pytest
+
+from backend.utils.spectrogram_shards import ShardWriter, ShardReader
+
+
+def _arrays(count, seed=0):
+    rng = np.random.default_rng(seed)
+    return [rng.standard_normal((128, 40 + i)).astype(np.float32) for i in range(count)]
+
+
+@pytest.mark.parametrize('dtype', ['float32', 'float16'])
+def test_roundtrip_returns_memmap_views(tmp_path, dtype):
+    arrays = _arrays(5)
+    genres = ['blues', 'jazz', 'blues', 'rock', 'jazz']
+    with ShardWriter(tmp_path / 'dataset', dtype=dtype, metadata={'n_mels': 128}) as writer:
+        for i, (array, genre) in enumerate(zip(arrays, genres)):
+            assert writer.add(array, genre, key=f"{genre}/{i}.wav") == i
+
+    reader = ShardReader(tmp_path / 'dataset')
+    assert len(reader) == 5
+    assert reader.metadata == {'n_mels': 128}
+    assert reader.genres == ['blues', 'jazz', 'rock']
+    for i, array in enumerate(arrays):
+        item = reader[i]
+        assert isinstance(item, np.memmap)
+        assert item.dtype == np.dtype(dtype)
+        np.testing.assert_array_equal(item, array.astype(dtype))
+        assert reader.genre(i) == genres[i]
+    assert reader.keys[3] == 'rock/3.wav'
+    np.testing.assert_array_equal(reader.indices('jazz'), [1, 4])
+    np.testing.assert_array_equal(reader.by_genre('blues')[1], arrays[2].astype(dtype))
+    assert len(reader.indices('metal')) == 0
+    with pytest.raises(IndexError):
+        reader[5]
+
+
+def test_items_roll_over_to_new_shards(tmp_path):
+    arrays = _arrays(6)
+    with ShardWriter(tmp_path / 'dataset', shard_size_bytes=2 * arrays[-1].nbytes) as writer:
+        for array in arrays:
+            writer.add(array, 'pop')
+
+    shard_files = [name for name in os.listdir(tmp_path / 'dataset') if name.endswith('.bin')]
+    assert len(shard_files) == 3
+    reader = ShardReader(tmp_path / 'dataset')
+    for i, array in enumerate(arrays):
+        np.testing.assert_array_equal(reader[i], array)
+
+
+def test_failed_write_keeps_previous_dataset(tmp_path):
+    arrays = _arrays(2)
+    with ShardWriter(tmp_path / 'dataset') as writer:
+        writer.add(arrays[0], 'disco')
+
+    with pytest.raises(RuntimeError):
+        with ShardWriter(tmp_path / 'dataset') as writer:
+            writer.add(arrays[1], 'metal')
+            raise RuntimeError('interrupted')
+
+    reader = ShardReader(tmp_path / 'dataset')
+    assert len(reader) == 1
+    assert reader.genres == ['disco']
+    assert sorted(os.listdir(tmp_path)) == ['dataset']
@@ -0,0 +1,81 @@
+"""
+Tests for the multi-process pipeline in backend.utils.staged_pipeline.
+"""
+import numpy as np
+import pytest
+import soundfile as sf
+
+from backend.config import GENRES, SAMPLE_RATE, EARLY_EXIT_MIN_CHUNKS, EARLY_EXIT_STEP
+from backend.utils.audio_processor import process_audio, create_audio_chunks
+from backend.utils.spectrogram_generator import prepare_audio_chunks_for_model
+from backend.utils.staged_pipeline import SharedRingBuffer, StagedPipeline
+
+
+class RecordingPredictor:
+    """Stub predictor that keeps a copy of every batch it is given."""
+    def __init__(self):
+        self.batches = []
+
+    def predict(self, inputs, batch_size=None, verbose=0):
+        self.batches.append(np.array(inputs))
+        return np.full((len(inputs), len(GENRES)), 1.0 / len(GENRES), dtype=np.float32)
+
+
+def test_ring_buffer_slots_are_bounded():
+    ring = SharedRingBuffer(2, (4,))
+    try:
+        first, second = ring.acquire(), ring.acquire()
+        ring.array[first] = 1.0
+        assert {first, second} == {0, 1}
+        with pytest.raises(Exception):
+            ring.acquire(timeout=0.01)
+        ring.release(first)
+        assert ring.acquire(timeout=0.01) == first
+    finally:
+        ring.close()
+
+
+def test_pipeline_matches_in_process_preprocessing(tmp_path):
+    paths = []
+    for i in range(3):
+        path = tmp_path / f"track{i}.wav"
+        sf.write(str(path), (0.1 * np.random.RandomState(i).randn(SAMPLE_RATE * 12)).astype(np.float32), SAMPLE_RATE)
+        paths.append(str(path))
+
+    predictor = RecordingPredictor()
+    pipeline = StagedPipeline(predictor, decode_workers=1, mel_workers=1, max_in_flight=2)
+    try:
+        results = [future.result() for future in [pipeline.submit(path) for path in paths]]
+    finally:
+        pipeline.close()
+
+    assert [result['chunks'] for result in results] == [14, 14, 14]
+    assert all(result['genre'] in GENRES for result in results)
+
+    audio = process_audio(paths[0])
+    expected, _ = prepare_audio_chunks_for_model(audio, create_audio_chunks(audio))
+    assert any(np.allclose(batch, expected, atol=1e-6) for batch in predictor.batches)
+
+
+def test_pipeline_early_exit_evaluates_chunks_in_rounds(tmp_path):
+    class ConfidentPredictor(RecordingPredictor):
+        def predict(self, inputs, batch_size=None, verbose=0):
+            self.batches.append(np.array(inputs))
+            outputs = np.full((len(inputs), len(GENRES)), 0.01, dtype=np.float32)
+            outputs[:, GENRES.index('jazz')] = 1.0 - 0.01 * (len(GENRES) - 1)
+            return outputs
+
+    path = tmp_path / "track.wav"
+    sf.write(str(path), (0.1 * np.random.RandomState(0).randn(SAMPLE_RATE * 12)).astype(np.float32), SAMPLE_RATE)
+
+    predictor = ConfidentPredictor()
+    pipeline = StagedPipeline(predictor, decode_workers=1, mel_workers=1, max_in_flight=1, early_exit=True)
+    try:
+        result = pipeline.classify(str(path))
+    finally:
+        pipeline.close()
+
+    assert result['genre'] == 'jazz'
+    # EARLY_EXIT_MIN_CHUNKS chunks first, then one round of EARLY_EXIT_STEP settles it
+    assert [len(batch) for batch in predictor.batches] == [EARLY_EXIT_MIN_CHUNKS, EARLY_EXIT_STEP]
+    assert result['chunks'] == EARLY_EXIT_MIN_CHUNKS + EARLY_EXIT_STEP
@@ -0,0 +1,56 @@
+"""
+Tests for TFLite conversion and serving in backend.models.tflite_backend.
+"""
+import warnings
+
+import numpy as np
+import pytest
+
+tf = pytest.importorskip('tensorflow')
+
+from backend.models.tflite_backend import TFLiteModel, convert_to_tflite, tflite_model_path
+
+warnings.filterwarnings('ignore', message='.*tf.lite.Interpreter is deprecated.*')
+
+
+@pytest.fixture(scope='module')
+def small_model():
+    model = tf.keras.Sequential([
+        tf.keras.layers.Input(shape=(16, 16, 1)),
+        tf.keras.layers.Conv2D(4, (3, 3), activation='relu'),
+        tf.keras.layers.GlobalAveragePooling2D(),
+        tf.keras.layers.Dense(3, activation='softmax'),
+    ])
+    return model
+
+
+@pytest.fixture(scope='module')
+def inputs():
+    return np.random.RandomState(0).rand(6, 16, 16, 1).astype(np.float32)
+
+
+def test_float32_variant_matches_keras_for_any_batch_size(small_model, inputs):
+    tflite_model = TFLiteModel(model_content=convert_to_tflite(small_model, 'float32'))
+
+    assert tflite_model.input_shape == (None, 16, 16, 1)
+    assert tflite_model.output_shape == (None, 3)
+    for batch in (inputs, inputs[:1], inputs[:4]):
+        np.testing.assert_allclose(tflite_model.predict(batch), small_model.predict(batch, verbose=0), atol=1e-5)
+
+
+def test_int8_variant_quantizes_io_and_stays_close(small_model, inputs):
+    tflite_model = TFLiteModel(model_content=convert_to_tflite(small_model, 'int8', inputs))
+
+    assert tflite_model.input_dtype == np.int8
+    outputs = tflite_model.predict(inputs)
+    assert outputs.dtype == np.float32
+    np.testing.assert_allclose(outputs, small_model.predict(inputs, verbose=0), atol=0.05)
+
+
+def test_int8_requires_calibration_inputs(small_model):
+    with pytest.raises(ValueError):
+        convert_to_tflite(small_model, 'int8')
+
+
+def test_variant_paths_sit_next_to_the_keras_model():
+    assert tflite_model_path('/models/net.keras', 'float16') == '/models/net_float16.tflite'
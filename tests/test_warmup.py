@@ -0,0 +1,40 @@
+"""
+Tests for the startup warm-up in backend.utils.warmup and lazy heavy imports.
+"""
+import subprocess
+import sys
+
+import numpy as np
+
+from backend.config import GENRES, TARGET_SHAPE
+from backend.utils.warmup import warm_up
+
+
+class RecordingModel:
+    """Stub model that records the shape of every batch it is given."""
+    def __init__(self):
+        self.shapes = []
+
+    def predict(self, inputs, batch_size=None, verbose=0):
+        self.shapes.append(inputs.shape)
+        return np.full((len(inputs), len(GENRES)), 1.0 / len(GENRES), dtype=np.float32)
+
+
+def test_warm_up_runs_every_stage_on_model_shaped_input():
+    model = RecordingModel()
+
+    timings = warm_up(model)
+
+    assert set(timings) == {'decode', 'mel', 'prepare', 'predict', 'predict_single', 'render'}
+    assert model.shapes[0] == (14,) + TARGET_SHAPE + (1,)
+    assert model.shapes[1] == (1,) + TARGET_SHAPE + (1,)
+
+
+def test_backend_modules_do_not_import_heavy_libraries():
+    code = (
+        "import sys\n"
+        "import backend.models.model_loader, backend.utils.staged_pipeline, backend.utils.warmup\n"
+        "print(','.join(m for m in ('tensorflow', 'librosa', 'matplotlib') if m in sys.modules))\n"
+    )
+    result = subprocess.run([sys.executable, '-c', code], capture_output=True, text=True, check=True)
+    assert result.stdout.strip() == ''